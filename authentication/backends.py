@@ -0,0 +1,209 @@
+import atexit
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+AUTH_TOKEN_CACHE_SIZE = getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10000)
+AUTH_TOKEN_CACHE_TTL = getattr(settings, "AUTH_TOKEN_CACHE_TTL", 30)
+AUTH_TOKEN_SHARED_CACHE_ALIAS = getattr(settings, "AUTH_TOKEN_SHARED_CACHE_ALIAS", None)
+AUTH_TOKEN_SHARED_CACHE_TTL = getattr(settings, "AUTH_TOKEN_SHARED_CACHE_TTL", 300)
+
+
+class TokenCache:
+    """
+    Token key -> Token with its user, kept in process memory: at most
+    `max_size` entries, the least recently used are evicted first, each
+    lives `ttl` seconds. With `shared_alias` a Django cache (Redis,
+    memcached) is asked on a local miss, so processes don't each go to the
+    database.
+
+    Invalidation is immediate in this process and in the shared cache; the
+    copies held by other processes expire within `ttl`.
+    """
+
+    def __init__(self, max_size=10000, ttl=30, shared_alias=None, shared_ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared_key(key):
+        # сам токен в общий кэш не попадает
+        return f"auth-token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+    def _shared(self):
+        if self.shared_alias is None:
+            return None
+        return caches[self.shared_alias]
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                token, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return token
+                self._forget(key)
+
+        shared = self._shared()
+        if shared is None:
+            return None
+        token = shared.get(self._shared_key(key))
+        if token is not None:
+            self._remember(key, token)
+        return token
+
+    def set(self, key, token):
+        self._remember(key, token)
+        shared = self._shared()
+        if shared is not None:
+            shared.set(self._shared_key(key), token, self.shared_ttl)
+
+    def _remember(self, key, token):
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = (token, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(token.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._forget(next(iter(self._entries)))
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_id = entry[0].user_id
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+    def invalidate(self, keys=(), user_id=None):
+        """Drop the given token keys and, with `user_id`, all of the user's."""
+        keys = set(keys)
+        with self._lock:
+            if user_id is not None:
+                keys |= self._keys_by_user.get(user_id, set())
+            for key in keys:
+                self._forget(key)
+        shared = self._shared()
+        if shared is not None and keys:
+            shared.delete_many([self._shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+
+class ActivityBuffer:
+    """
+    Collects the ids of users seen in requests and writes their
+    last_activity with one UPDATE per `interval` seconds instead of a write
+    per request.
+    """
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def touch(self, user_id):
+        if self.interval <= 0:
+            UserProfile.objects.filter(pk=user_id).update(last_activity=timezone.now())
+            return
+        with self._lock:
+            self._pending.add(user_id)
+            self._schedule()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            return UserProfile.objects.filter(pk__in=pending).update(
+                last_activity=timezone.now()
+            )
+        except Exception:
+            logger.exception("Failed to write activity of %s users", len(pending))
+            with self._lock:
+                self._pending |= pending
+                self._schedule()
+            return 0
+
+    def _schedule(self):
+        if self._timer is None and self._pending:
+            self._timer = threading.Timer(self.interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+token_cache = TokenCache(
+    max_size=AUTH_TOKEN_CACHE_SIZE,
+    ttl=AUTH_TOKEN_CACHE_TTL,
+    shared_alias=AUTH_TOKEN_SHARED_CACHE_ALIAS,
+    shared_ttl=AUTH_TOKEN_SHARED_CACHE_TTL,
+)
+activity = ActivityBuffer(
+    interval=getattr(settings, "LAST_ACTIVITY_FLUSH_INTERVAL", 60)
+)
+atexit.register(activity.flush)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that looks tokens up in token_cache before the
+    database and records the user's activity in the activity buffer.
+    Tokens and users are dropped from the cache by the signals in
+    authentication.signals when they change.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related("user").get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if token.user.is_active:
+                token_cache.set(key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        activity.touch(token.user_id)
+        # копия: представления дописывают к request.user свои атрибуты
+        return (copy.copy(token.user), token)
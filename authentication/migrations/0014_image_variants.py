@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0013_alter_userprofile_avatar_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="avatar_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии аватара",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="banner_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии баннера",
+            ),
+        ),
+    ]
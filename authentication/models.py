@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 
@@ -14,7 +15,8 @@ class UserProfile(AbstractUser):
     description = models.TextField("Описание", blank=True)
     date_of_birth = models.DateField("Дата рождения", null=True)
     is_profile_private = models.BooleanField(default=False)
-    last_activity = models.DateTimeField(auto_now=True)
+    # обновляется пачками из backends.ActivityBuffer, а не при каждом save()
+    last_activity = models.DateTimeField(default=timezone.now, editable=False)
     avatar = models.ImageField(
         upload_to="avatars/profile/original/", null=True, blank=True
     )
@@ -27,6 +29,12 @@ class UserProfile(AbstractUser):
     banner_small = models.ImageField(
         upload_to="banners/profile/small/", null=True, blank=True
     )
+    avatar_variants = models.JSONField(
+        "Уменьшенные копии аватара", default=dict, blank=True, editable=False
+    )
+    banner_variants = models.JSONField(
+        "Уменьшенные копии баннера", default=dict, blank=True, editable=False
+    )
 
     def __str__(self):
         return self.username
@@ -4,7 +4,8 @@ from django.core.validators import RegexValidator
 from .validators import validate_first_name, validate_last_name
 from .models import UserProfile
 from social_net.models import Blog
-from social_net.serializers import BlogSerializer
+from social_net.querysets import with_blog_relations
+from social_net.serializers import BlogSerializer, ImageVariantsField
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -67,6 +68,8 @@ class LogoutSerializer(serializers.ModelSerializer):
 
 class UserSerializer(serializers.ModelSerializer):
     subscriptions = SubscriptionSerializer(many=True)
+    avatar_variants = ImageVariantsField()
+    banner_variants = ImageVariantsField()
 
     class Meta:
         model = UserProfile
@@ -90,6 +93,8 @@ class UserSerializer(serializers.ModelSerializer):
             "avatar_small",
             "banner",
             "banner_small",
+            "avatar_variants",
+            "banner_variants",
             "subscriptions",
         )
 
@@ -99,6 +104,8 @@ class UpdateUserProfileSerializer(serializers.ModelSerializer):
     banner_small = serializers.ImageField(allow_null=True)
     avatar = serializers.ImageField(allow_null=True)
     banner = serializers.ImageField(allow_null=True)
+    avatar_variants = ImageVariantsField()
+    banner_variants = ImageVariantsField()
     subscriptionList = serializers.IntegerField()
     subscriptions = serializers.SerializerMethodField()
 
@@ -109,6 +116,8 @@ class UpdateUserProfileSerializer(serializers.ModelSerializer):
             "avatar_small",
             "banner",
             "banner_small",
+            "avatar_variants",
+            "banner_variants",
             "first_name",
             "last_name",
             "date_of_birth",
@@ -123,7 +132,7 @@ class UpdateUserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_subscriptions(self, obj):
-        subscriptions = obj.subscriptions.all()[:5]
+        subscriptions = with_blog_relations(obj.subscriptions.all())[:5]
         return BlogSerializer(subscriptions, many=True).data
 
 
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .backends import token_cache
+from .models import UserProfile
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache.invalidate([instance.key])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def forget_user_tokens(sender, instance, **kwargs):
+    keys = ()
+    if token_cache.shared_alias is not None:
+        # токены пользователя могли попасть в общий кэш из других процессов
+        keys = Token.objects.filter(user_id=instance.pk).values_list("key", flat=True)
+    token_cache.invalidate(keys, user_id=instance.pk)
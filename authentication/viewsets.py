@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status, viewsets, permissions
 from django.contrib.auth import logout, authenticate
 from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
 from rest_framework.parsers import MultiPartParser, FormParser
 
 import requests
@@ -22,6 +23,10 @@ from .serializers import (
     SubscriptionList,
     ChangeAvatarSerializer,
 )
+from comments.signals import batched_comment_counters
+from social_net.models import Blog
+from social_net.querysets import with_blog_relations
+from social_net.uploads import StreamingUploadMixin
 
 
 from dotenv import dotenv_values, load_dotenv
@@ -33,11 +38,11 @@ config = dotenv_values(".env")
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authentication import TokenAuthentication
+from .backends import CachedTokenAuthentication
 
 
 class LoginView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     def post(self, request):
 
@@ -150,7 +155,7 @@ class IsEmailAvailable(viewsets.ModelViewSet):
             )
 
 
-class UserProfileView(viewsets.ModelViewSet):
+class UserProfileView(StreamingUploadMixin, viewsets.ModelViewSet):
     queryset = UserProfile.objects.all()
 
     def get_serializer_class(self):
@@ -180,7 +185,9 @@ class UserProfileView(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         user = get_object_or_404(UserProfile, username=self.kwargs["username"])
-        user.delete()
+        # вместе с пользователем удаляются его комментарии и ответы на них
+        with batched_comment_counters():
+            user.delete()
         return Response({"status: successful"}, status=status.HTTP_200_OK)
 
 
@@ -192,7 +199,9 @@ class SubscriptionListViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         user = get_object_or_404(UserProfile, username=self.kwargs["username"])
-        queryset = self.queryset.filter(username=user)
+        queryset = self.queryset.filter(username=user).prefetch_related(
+            Prefetch("subscriptions", queryset=with_blog_relations(Blog.objects.all()))
+        )
         if user:
             result = SubscriptionList(queryset, many=True)
             return Response(result.data, status=status.HTTP_200_OK)
@@ -205,10 +214,11 @@ class DeleteAvatarView(viewsets.ModelViewSet):
     #     user = get_object_or_404(UserProfile, username=self.kwargs['username'])
 
 
-class ChangeAvatarView(viewsets.ModelViewSet):
+class ChangeAvatarView(StreamingUploadMixin, viewsets.ModelViewSet):
     queryset = UserProfile.objects.all()
     serializer_class = ChangeAvatarSerializer
     parser_class = (MultiPartParser, FormParser)
+    upload_max_sizes = {"avatar": 4 * 1024 * 1024, "avatar_small": 2 * 1024 * 1024}
 
     def update(self, request, *args, **kwargs):
         user = get_object_or_404(UserProfile, username=self.kwargs["username"])
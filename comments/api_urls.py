@@ -1,7 +1,10 @@
 from django.urls import path
-from viewsets import (
+from social_net.async_views import read_view
+from .async_views import AsyncPostCommentList
+from .viewsets import (
     CommentaryPage,
     PostCommentListView,
+    PostCommentThreadView,
     PinCommentViewSet,
     SetCommentLikeByAuthorView,
     SetCommentLikeView,
@@ -12,7 +15,12 @@ create_commentary = CommentaryPage.as_view({"post": "create"})
 commentary = CommentaryPage.as_view(
     {"get": "retrieve", "delete": "destroy", "put": "update"}
 )
-post_comment_list = PostCommentListView.as_view({"get": "list"})
+post_comment_list = read_view(
+    "post_comment_list",
+    PostCommentListView.as_view({"get": "list"}),
+    AsyncPostCommentList,
+)
+post_comment_thread = PostCommentThreadView.as_view({"get": "list"})
 
 set_or_remove_comment_like = SetCommentLikeView.as_view({"post": "set_or_remove_like"})
 set_or_remove_comment_dislike = SetCommentLikeView.as_view(
@@ -38,6 +46,11 @@ urlpatterns = [
         post_comment_list,
         name="post_comment_list",
     ),
+    path(
+        "blog/<slug:slug>/post/<int:post_id>/comment/thread/",
+        post_comment_thread,
+        name="post_comment_thread",
+    ),
     path(
         "blog/<slug:slug>/post/<int:post_id>/comment/<int:comment_id>/like_by_author/",
         set_or_remove_like_by_author,
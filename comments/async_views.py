@@ -0,0 +1,58 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+
+from social_net.async_views import AsyncReadView
+from social_net.models import Post
+from social_net.response_cache import cache_anonymous_response, json_response
+from social_net.viewer_state import resolve_comment_state
+
+from .models import Commentary
+from .serializers import PostCommentaryListSerializer
+from .tree import without_hidden
+from .viewsets import ListSetPagination
+
+
+class AsyncPostCommentList(AsyncReadView):
+    pagination_class = ListSetPagination
+
+    @cache_anonymous_response("comments")
+    async def get(self, request, *args, **kwargs):
+        queryset = Commentary.objects.filter(
+            post__blog__slug=self.kwargs["slug"],
+            post__post_id=self.kwargs["post_id"],
+            is_hidden=False,
+        )
+
+        parent_id = request.query_params.get("parent_id", None)
+        sort_by = request.query_params.get("sort_by", None)
+
+        if sort_by:
+            if sort_by == "newest":
+                queryset = queryset.order_by("-is_pinned", "-created_at")
+            if sort_by == "oldest":
+                queryset = queryset.order_by("-is_pinned", "created_at")
+
+        lookups = [
+            aget_object_or_404(
+                Post, post_id=self.kwargs["post_id"], blog__slug=self.kwargs["slug"]
+            )
+        ]
+        if parent_id:
+            lookups.append(aget_object_or_404(queryset, comment_id=parent_id))
+        found = await asyncio.gather(*lookups)
+
+        if parent_id:
+            # ответы скрытой ветки скрыты вместе с ней
+            queryset = without_hidden(queryset.filter(reply_to=found[1]))
+        else:
+            queryset = queryset.filter(reply_to=None)
+
+        queryset = queryset.select_related("author", "pinned_by_user", "reply_to")
+
+        paginator = self.pagination_class()
+        comments = await paginator.apaginate_queryset(queryset, request)
+        comments = await sync_to_async(resolve_comment_state)(comments, request.user)
+        serializer = PostCommentaryListSerializer(comments, many=True)
+        return json_response(paginator.get_paginated_response(serializer.data).data)
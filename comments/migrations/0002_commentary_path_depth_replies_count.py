@@ -0,0 +1,70 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+PATH_STEP = 10
+
+
+def build_tree(apps, schema_editor):
+    Commentary = apps.get_model("comments", "Commentary")
+    level = list(Commentary.objects.filter(reply_to=None).only("id"))
+    for comment in level:
+        comment.path = str(comment.pk).zfill(PATH_STEP)
+        comment.depth = 0
+    depth = 0
+    while level:
+        Commentary.objects.bulk_update(level, ["path", "depth"], batch_size=500)
+        parents = {comment.pk: comment.path for comment in level}
+        depth += 1
+        level = list(
+            Commentary.objects.filter(reply_to_id__in=parents).only("id", "reply_to_id")
+        )
+        for comment in level:
+            comment.path = (
+                f"{parents[comment.reply_to_id]}.{str(comment.pk).zfill(PATH_STEP)}"
+            )
+            comment.depth = depth
+
+    Commentary.objects.update(
+        replies_count=Coalesce(
+            Subquery(
+                Commentary.objects.filter(reply_to=OuterRef("pk"))
+                .values("reply_to")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commentary",
+            name="depth",
+            field=models.PositiveSmallIntegerField(
+                default=0, verbose_name="Уровень вложенности"
+            ),
+        ),
+        migrations.AddField(
+            model_name="commentary",
+            name="path",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=1024, verbose_name="Путь в дереве"
+            ),
+        ),
+        migrations.AddField(
+            model_name="commentary",
+            name="replies_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Кол-во ответов"),
+        ),
+        migrations.RunPython(build_tree, migrations.RunPython.noop),
+    ]
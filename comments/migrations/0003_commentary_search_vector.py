@@ -0,0 +1,53 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:50
+
+import django.contrib.postgres.search
+from django.db import migrations
+from django.contrib.postgres.search import SearchVector
+
+# GIN-индексы и tsvector есть только в Postgres; на других БД поле остаётся
+# пустым и поиск идёт через LIKE (search.backends.LikeSearchBackend)
+SEARCH_FIELDS = {"Commentary": (("body", "B"),)}
+
+
+def build_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model("comments", model_name)
+        vector = None
+        for field, weight in fields:
+            for config in ("russian", "simple"):
+                part = SearchVector(field, config=config, weight=weight)
+                vector = part if vector is None else vector + part
+        model.objects.update(search_vector=vector)
+        table = model._meta.db_table
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_search_gin "
+            f"ON {table} USING gin (search_vector)"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name in SEARCH_FIELDS:
+        table = apps.get_model("comments", model_name)._meta.db_table
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_commentary_path_depth_replies_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commentary",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Поисковый вектор"
+            ),
+        ),
+        migrations.RunPython(build_search_vectors, drop_search_indexes),
+    ]
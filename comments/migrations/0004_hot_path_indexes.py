@@ -0,0 +1,57 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def renumber_duplicate_comments(apps, schema_editor):
+    # comment_id выдавался без блокировки: повторы внутри поста получают
+    # следующие свободные номера блога
+    Blog = apps.get_model("social_net", "Blog")
+    Commentary = apps.get_model("comments", "Commentary")
+    duplicates = (
+        Commentary.objects.exclude(comment_id=None)
+        .values("post_id", "post__blog_id", "comment_id")
+        .annotate(rows=Count("pk"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        blog = Blog.objects.get(slug=duplicate["post__blog_id"])
+        last = Commentary.objects.filter(post__blog_id=blog.slug).aggregate(
+            last=Max("comment_id")
+        )
+        next_id = max(last["last"], blog.count_of_commentaries)
+        extra = Commentary.objects.filter(
+            post_id=duplicate["post_id"], comment_id=duplicate["comment_id"]
+        ).order_by("pk")[1:]
+        for comment in extra:
+            next_id += 1
+            Commentary.objects.filter(pk=comment.pk).update(comment_id=next_id)
+        Blog.objects.filter(pk=blog.pk).update(count_of_commentaries=next_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0003_commentary_search_vector"),
+        ("social_net", "0092_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commentary",
+            index=models.Index(
+                fields=["post", "reply_to", "-is_pinned", "created_at"],
+                name="comment_thread_idx",
+            ),
+        ),
+        migrations.RunPython(renumber_duplicate_comments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="commentary",
+            constraint=models.UniqueConstraint(
+                fields=("post", "comment_id"), name="unique_post_comment_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0004_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commentary",
+            name="is_hidden",
+            field=models.BooleanField(default=False, verbose_name="Скрыт модератором"),
+        ),
+    ]
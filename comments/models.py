@@ -1,5 +1,7 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from authentication.models import UserProfile
+from search.managers import SearchableManager
 from social_net.models import Post
 
 
@@ -26,9 +28,13 @@ class Commentary(models.Model):
         blank=True,
         null=True,
     )
+    path = models.CharField("Путь в дереве", max_length=1024, blank=True, db_index=True)
+    depth = models.PositiveSmallIntegerField("Уровень вложенности", default=0)
+    replies_count = models.PositiveIntegerField("Кол-во ответов", default=0)
     is_edited = models.BooleanField(default=False)
     liked_by_author = models.BooleanField(default=False)
     is_pinned = models.BooleanField(default=False)
+    is_hidden = models.BooleanField("Скрыт модератором", default=False)
     pinned_by_user = models.ForeignKey(
         UserProfile,
         related_name="pinned_commentaries",
@@ -36,6 +42,24 @@ class Commentary(models.Model):
         null=True,
         on_delete=models.CASCADE,
     )
+    search_vector = SearchVectorField("Поисковый вектор", null=True, editable=False)
+
+    objects = SearchableManager()
+
+    class Meta:
+        # comment_id выдаётся по блогу, поэтому уникален и внутри поста
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "comment_id"], name="unique_post_comment_id"
+            )
+        ]
+        indexes = [
+            # ветка комментариев поста: закреплённые первыми, затем по дате
+            models.Index(
+                fields=["post", "reply_to", "-is_pinned", "created_at"],
+                name="comment_thread_idx",
+            )
+        ]
 
     def __str__(self):
         return str(self.comment_id)
@@ -1,4 +1,4 @@
-from models import Commentary
+from .models import Commentary
 from rest_framework import serializers
 from rest_framework.serializers import (
     CharField,
@@ -22,7 +22,6 @@ class CreateCommentarySerializer(serializers.ModelSerializer):
 
 class PostCommentaryListSerializer(serializers.ModelSerializer):
     reply_to = SerializerMethodField()
-    replies_count = SerializerMethodField()
     author = UserSerializer()
     isLiked = BooleanField()
     isDisliked = BooleanField()
@@ -41,6 +40,7 @@ class PostCommentaryListSerializer(serializers.ModelSerializer):
             "is_edited",
             "reply_to",
             "replies_count",
+            "depth",
             "liked_by_author",
             "isLiked",
             "isDisliked",
@@ -48,10 +48,6 @@ class PostCommentaryListSerializer(serializers.ModelSerializer):
             "pinned_by_user",
         )
 
-    def get_replies_count(self, obj):
-        replies = obj.replies.count()
-        return replies
-
     def get_reply_to(self, obj):
         if obj.reply_to is not None:
             return obj.reply_to.comment_id
@@ -59,7 +55,6 @@ class PostCommentaryListSerializer(serializers.ModelSerializer):
 
 class UpdateCommentarySerializer(serializers.ModelSerializer):
     author = UserSerializer()
-    replies_count = SerializerMethodField()
     isLiked = BooleanField()
     isDisliked = BooleanField()
     reply_to = SerializerMethodField()
@@ -84,10 +79,6 @@ class UpdateCommentarySerializer(serializers.ModelSerializer):
             "pinned_by_user",
         )
 
-    def get_replies_count(self, obj):
-        replies = obj.replies.count()
-        return replies
-
     def get_reply_to(self, obj):
         if obj.reply_to is not None:
             return obj.reply_to.comment_id
@@ -95,7 +86,6 @@ class UpdateCommentarySerializer(serializers.ModelSerializer):
 
 class PostCommentarySerializer(serializers.ModelSerializer):
     author = UserSerializer()
-    replies_count = SerializerMethodField()
     isLiked = BooleanField(default=False)
     isDisliked = BooleanField(default=False)
     reply_to = SerializerMethodField()
@@ -117,10 +107,6 @@ class PostCommentarySerializer(serializers.ModelSerializer):
             "isDisliked",
         )
 
-    def get_replies_count(self, obj):
-        replies = obj.replies.count()
-        return replies
-
     def get_reply_to(self, obj):
         if obj.reply_to is not None:
             return obj.reply_to.comment_id
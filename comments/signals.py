@@ -0,0 +1,113 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from social_net.counters import shift_counters, update_counters
+from social_net import response_cache
+from social_net.models import Blog, Post
+from social_net.realtime import post_group, push
+from social_net.signals import in_bulk_post_delete
+from .models import Commentary
+from .tree import attach, detach
+
+
+@receiver(post_save, sender=Commentary)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        update_counters(instance.post_id, comment_count=1)
+        Blog.objects.filter(posts=instance.post_id).update(
+            count_of_commentaries=F("count_of_commentaries") + 1
+        )
+        # счётчик виден в ответах о блогах, а UPDATE не отправляет post_save
+        response_cache.bump("blogs")
+        attach(instance)
+
+
+@receiver(post_save, sender=Commentary)
+def push_comment_counters(sender, instance, update_fields=None, **kwargs):
+    if update_fields and {"likes", "dislikes"} & set(update_fields):
+        push(
+            post_group(instance.post_id),
+            "comment.counters",
+            {
+                "post": instance.post_id,
+                "comment_id": instance.comment_id,
+                "likes": instance.likes,
+                "dislikes": instance.dislikes,
+            },
+        )
+
+
+class DeletedComments:
+    def __init__(self):
+        self.pks = set()
+        self.by_post = Counter()
+        self.by_parent = Counter()
+
+    def add(self, comment):
+        self.pks.add(comment.pk)
+        self.by_post[comment.post_id] += 1
+        if comment.reply_to_id:
+            self.by_parent[comment.reply_to_id] += 1
+
+    def apply(self):
+        shift_counters(
+            "comment_count", {post: -count for post, count in self.by_post.items()}
+        )
+        # родители, удалённые вместе с ответами, не обновляются
+        by_count = defaultdict(list)
+        for parent, count in self.by_parent.items():
+            if parent not in self.pks:
+                by_count[count].append(parent)
+        for count, parents in by_count.items():
+            Commentary.objects.filter(pk__in=parents).update(
+                replies_count=Greatest(F("replies_count") - count, 0)
+            )
+
+
+_deleted_comments = ContextVar("deleted_comments", default=None)
+
+
+@contextmanager
+def batched_comment_counters():
+    """
+    Within the block, deleted comments only are noted; comment_count of
+    their posts and replies_count of their surviving parents are shifted
+    at the end, one UPDATE per distinct delta, instead of two UPDATEs per
+    deleted comment. Wrap deletes that can cascade to many comments.
+    """
+    if _deleted_comments.get() is not None:
+        yield
+        return
+    deleted = DeletedComments()
+    with transaction.atomic():
+        token = _deleted_comments.set(deleted)
+        try:
+            yield
+        finally:
+            _deleted_comments.reset(token)
+        deleted.apply()
+
+
+@receiver(post_delete, sender=Commentary)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    # вместе с постом или блогом удаляются и счётчики
+    if isinstance(origin, (Blog, Post)) or in_bulk_post_delete():
+        return
+    deleted = _deleted_comments.get()
+    if deleted is not None:
+        deleted.add(instance)
+        return
+    update_counters(instance.post_id, comment_count=-1)
+    if not (
+        isinstance(origin, Commentary)
+        and origin.pk != instance.pk
+        and instance.path.startswith(origin.path)
+    ):
+        detach(instance)
@@ -0,0 +1,71 @@
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Concat
+from django.db.models.lookups import StartsWith
+
+from .models import Commentary
+
+PATH_STEP = 10
+PATH_SEPARATOR = "."
+# самый глубокий уровень, путь которого ещё помещается в поле path
+MAX_DEPTH = (Commentary._meta.get_field("path").max_length - PATH_STEP) // (
+    PATH_STEP + len(PATH_SEPARATOR)
+)
+
+
+def make_path(parent_path, pk):
+    """
+    Materialized path of a comment: the zero-padded ids of its ancestors and
+    of the comment itself, so ORDER BY path walks a thread depth-first with
+    replies in creation order.
+    """
+    segment = str(pk).zfill(PATH_STEP)
+    if not parent_path:
+        return segment
+    return f"{parent_path}{PATH_SEPARATOR}{segment}"
+
+
+def attach(comment):
+    parent = comment.reply_to if comment.reply_to_id else None
+    comment.path = make_path(parent.path if parent else "", comment.pk)
+    comment.depth = parent.depth + 1 if parent else 0
+    Commentary.objects.filter(pk=comment.pk).update(
+        path=comment.path, depth=comment.depth
+    )
+    if parent:
+        Commentary.objects.filter(pk=parent.pk).update(
+            replies_count=F("replies_count") + 1
+        )
+
+
+def detach(comment):
+    if comment.reply_to_id:
+        Commentary.objects.filter(pk=comment.reply_to_id, replies_count__gt=0).update(
+            replies_count=F("replies_count") - 1
+        )
+
+
+def subtree(queryset, root=None, levels=None):
+    """
+    A thread in depth-first order: root and its replies (or the whole post
+    when root is None), limited to `levels` levels below the root. Paths are
+    fixed-width, so the prefix match never picks up a sibling's subtree.
+    """
+    if root is not None:
+        queryset = queryset.filter(path__startswith=root.path)
+        base = root.depth
+    else:
+        base = 0
+    if levels is not None:
+        queryset = queryset.filter(depth__lte=base + levels)
+    return queryset.order_by("path")
+
+
+def without_hidden(queryset):
+    """
+    Drops comments hidden by moderation together with their replies at any
+    depth: a reply goes when the path of a hidden comment is its prefix.
+    """
+    hidden_ancestor = Commentary.objects.filter(
+        post_id=OuterRef("post_id"), is_hidden=True
+    ).filter(StartsWith(OuterRef("path"), Concat("path", Value(PATH_SEPARATOR))))
+    return queryset.filter(is_hidden=False).filter(~Exists(hidden_ancestor))
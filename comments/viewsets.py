@@ -1,81 +1,73 @@
-from serializers import CreateCommentarySerializer
+from .serializers import CreateCommentarySerializer
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import status, permissions, viewsets
 from django.shortcuts import get_object_or_404
-import re
-from django.db.models import (
-    Q,
-    When,
-    Value,
-    BooleanField,
-    Exists,
-    OuterRef,
-)
 from django.http import Http404
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from authentication.models import UserProfile
 from social_net.models import Blog, Post
+from social_net.pagination import AsyncPageNumberPagination
+from social_net.response_cache import cache_anonymous_response
+from social_net.sequences import next_comment_id
+from social_net.roles import (
+    comment_or_404,
+    post_or_404,
+    resolve_blog,
+    resolve_comment,
+    resolve_post,
+)
+from social_net.viewer_state import resolve_comment_state
 
 from .models import Commentary
-from notifications.models import Notification
-from serializers import PostCommentaryListSerializer, PostCommentarySerializer
+from .signals import batched_comment_counters
+from notifications.mentions import parse_mentions
+from notifications.tasks import deliver_mentions
+from .serializers import PostCommentaryListSerializer, PostCommentarySerializer
+from .tree import MAX_DEPTH, subtree, without_hidden
 
 
-class ListSetPagination(PageNumberPagination):
+class ListSetPagination(AsyncPageNumberPagination):
     page_size = 5
 
 
+class ThreadPagination(PageNumberPagination):
+    page_size = 50
+
+
 class CommentaryPermissions(permissions.BasePermission):
     def has_permission(self, request, view):
-        isAdmin = (
-            request.user and request.user.is_authenticated and request.user.is_admin
-        )
         if request.method in permissions.SAFE_METHODS:
             return True
+        if not request.user.is_authenticated:
+            return False
+        kwargs = view.kwargs
         if request.method == "POST":
-            IsPostAccessibleForComments = Post.objects.filter(
-                post_id=view.kwargs["post_id"], blog__slug=view.kwargs["slug"]
-            )
-            return bool(
-                IsPostAccessibleForComments
-                and request.user.id
-                and request.user.is_authenticated
-            )
-        else:
-            isBlogOwnerOrBlogAuthorOrAuthorOfComment = Commentary.objects.filter(
-                Q(comment_id=view.kwargs["comment_id"])
-                & Q(post__post_id=view.kwargs["post_id"])
-                & Q(post__blog__slug=view.kwargs["slug"])
-                & (
-                    Q(post__blog__owner=request.user.id)
-                    | Q(post__blog__authors__username__contains=request.user)
-                    | Q(author=request.user.id)
-                )
-            )
-            return bool(
-                (isBlogOwnerOrBlogAuthorOrAuthorOfComment or isAdmin)
-                and IsAuthenticated
-            )
+            post = resolve_post(request, kwargs["slug"], kwargs["post_id"])
+            return post is not None
+        comment = resolve_comment(
+            request, kwargs["slug"], kwargs["post_id"], kwargs["comment_id"]
+        )
+        if comment is None:
+            return request.user.is_admin
+        role = resolve_blog(request, kwargs["slug"])
+        return role.can_write or comment.author_id == request.user.pk
 
     def has_object_permission(self, request, view, obj):
-        isAdmin = IsAuthenticated and request.user.is_admin
-        isBlogOwner = IsAuthenticated and obj.post.blog.owner == request.user
-        isBlogAuthor = IsAuthenticated and obj.post.blog.authors.filter(
-            username__contains=request.user
-        )
-        isUserCommentAuthor = IsAuthenticated and obj.author == request.user
+        role = resolve_blog(request, obj.post.blog_id)
+        isUserCommentAuthor = obj.author_id == request.user.pk
         if request.method in permissions.SAFE_METHODS:
             if obj.post.is_published:
                 return True
-            if not ((isBlogAuthor or isBlogOwner or isAdmin) and IsAuthenticated):
+            if not role.can_write:
                 raise Http404
+            return True
         if request.method == "DELETE":
-            return bool(isUserCommentAuthor or isAdmin or isBlogOwner)
+            return bool(isUserCommentAuthor or role.is_admin or role.is_owner)
         if request.method == "PUT":
-            return bool(isUserCommentAuthor or isAdmin)
+            return bool(isUserCommentAuthor or role.is_admin)
 
 
 class PinCommentViewSet(viewsets.ModelViewSet):
@@ -138,9 +130,12 @@ class PostCommentListView(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
     pagination_class = ListSetPagination
 
+    @cache_anonymous_response("comments")
     def list(self, request, *args, **kwargs):
         queryset = self.queryset.filter(
-            post__blog__slug=self.kwargs["slug"], post__post_id=self.kwargs["post_id"]
+            post__blog__slug=self.kwargs["slug"],
+            post__post_id=self.kwargs["post_id"],
+            is_hidden=False,
         )
         blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
         post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
@@ -158,30 +153,54 @@ class PostCommentListView(viewsets.ModelViewSet):
             model = Commentary.objects.get(
                 comment_id=parent_id, post=post, post__blog=blog
             )
-            queryset = queryset.filter(reply_to=model)
+            # ответы скрытой ветки скрыты вместе с ней
+            queryset = without_hidden(queryset.filter(reply_to=model))
         else:
             queryset = queryset.filter(reply_to=None)
 
-        if request.user.is_authenticated:
-            queryset = queryset.annotate(
-                isLiked=Exists(
-                    Commentary.objects.filter(
-                        liked_users=request.user, id=OuterRef("pk")
-                    )
-                ),
-                isDisliked=Exists(
-                    Commentary.objects.filter(
-                        disliked_users=request.user, id=OuterRef("pk")
-                    )
-                ),
-            )
-        else:
-            queryset = queryset.annotate(
-                isLiked=Value(False, output_field=BooleanField()),
-                isDisliked=Value(False, output_field=BooleanField()),
-            )
+        queryset = queryset.select_related("author", "pinned_by_user", "reply_to")
 
-        paginate_queryset = self.paginate_queryset(queryset)
+        paginate_queryset = resolve_comment_state(
+            self.paginate_queryset(queryset), request.user
+        )
+        serializer = self.serializer_class(paginate_queryset, many=True)
+        response = self.get_paginated_response(serializer.data)
+        return Response(data=response.data, status=status.HTTP_200_OK)
+
+
+class PostCommentThreadView(viewsets.ModelViewSet):
+    queryset = Commentary.objects.all()
+    serializer_class = PostCommentaryListSerializer
+    permission_classes = [AllowAny]
+    pagination_class = ThreadPagination
+
+    @cache_anonymous_response("comments")
+    def list(self, request, *args, **kwargs):
+        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
+        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
+        # ответы скрытого комментария скрыты вместе с ним
+        queryset = without_hidden(self.queryset.filter(post=post))
+
+        root_id = self.request.query_params.get("comment_id", None)
+        levels = self.request.query_params.get("depth", None)
+        root = None
+        if root_id:
+            root = get_object_or_404(Commentary, comment_id=root_id, post=post)
+        if levels is not None:
+            try:
+                levels = int(levels)
+            except ValueError:
+                return Response(
+                    {"depth": "Must be an integer"}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        queryset = subtree(queryset, root, levels).select_related(
+            "author", "pinned_by_user", "reply_to"
+        )
+
+        paginate_queryset = resolve_comment_state(
+            self.paginate_queryset(queryset), request.user
+        )
         serializer = self.serializer_class(paginate_queryset, many=True)
         response = self.get_paginated_response(serializer.data)
         return Response(data=response.data, status=status.HTTP_200_OK)
@@ -202,24 +221,27 @@ class CommentaryPage(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         body = serializer.data["body"]
         reply_to = serializer.data["reply_to"]
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
+        post = post_or_404(request, self.kwargs["slug"], self.kwargs["post_id"])
+        blog = post.blog
+        parent_comment = None
         if reply_to:
             parent_comment = get_object_or_404(
                 Commentary, comment_id=reply_to, post=post
             )
-        blog.count_of_commentaries += 1
-        blog.save(update_fields=("count_of_commentaries",))
-        comment_id = blog.count_of_commentaries
+            if parent_comment.depth >= MAX_DEPTH:
+                return Response(
+                    {"reply_to": f"Replies are limited to {MAX_DEPTH} levels"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        comment_id = next_comment_id(blog)
 
         if reply_to:
-            commentary = get_object_or_404(Commentary, comment_id=reply_to, post=post)
             comm = Commentary(
                 body=body,
                 author=request.user,
                 post=post,
                 comment_id=comment_id,
-                reply_to=commentary,
+                reply_to=parent_comment,
             )
         else:
             comm = Commentary(
@@ -230,33 +252,36 @@ class CommentaryPage(viewsets.ModelViewSet):
             )
         comm.save()
 
-        addressee_regex = r"@\w+"
-        addressees = re.findall(addressee_regex, body)
-        new_addressees = " ".join(addressees).split("@")
-
-        for addressee in new_addressees:
-            message = f'Пользователь {addressee} оставил комментарий "{body}"'
-            if UserProfile.objects.filter(username=addressee).exists():
-                user = UserProfile.objects.get(username=addressee)
-                notification = Notification(
-                    parent_comment=parent_comment,
-                    replied_comment=comm,
-                    post=post,
-                    text=message,
-                    addressee=user,
-                    author=request.user,
-                    is_read=False,
-                )
-                notification.save()
+        if parse_mentions(comm.body):
+            deliver_mentions.enqueue(
+                comment_id=comm.pk, parent_id=parent_comment and parent_comment.pk
+            )
 
         serial = PostCommentarySerializer(comm, many=False)
         return Response(serial.data, status=status.HTTP_201_CREATED)
 
+    def retrieve(self, request, *args, **kwargs):
+        comment = comment_or_404(
+            request,
+            self.kwargs["slug"],
+            self.kwargs["post_id"],
+            self.kwargs["comment_id"],
+        )
+        self.check_object_permissions(request, comment)
+        if comment.is_hidden and not (
+            comment.author_id == request.user.pk
+            or resolve_blog(request, self.kwargs["slug"]).can_manage
+        ):
+            raise Http404
+        serializer = PostCommentarySerializer(comment)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     def update(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
-        comment = get_object_or_404(
-            Commentary, comment_id=self.kwargs["comment_id"], post=post
+        comment = comment_or_404(
+            request,
+            self.kwargs["slug"],
+            self.kwargs["post_id"],
+            self.kwargs["comment_id"],
         )
         comment.is_edited = True
         serializer = CreateCommentarySerializer(
@@ -267,12 +292,14 @@ class CommentaryPage(viewsets.ModelViewSet):
         return Response({"status: successful"}, status=status.HTTP_200_OK)
 
     def destroy(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
-        comment = get_object_or_404(
-            Commentary, comment_id=self.kwargs["comment_id"], post=post
+        comment = comment_or_404(
+            request,
+            self.kwargs["slug"],
+            self.kwargs["post_id"],
+            self.kwargs["comment_id"],
         )
-        comment.delete()
+        with batched_comment_counters():
+            comment.delete()
         return Response(status=status.HTTP_200_OK)
 
 
@@ -339,7 +366,9 @@ class PostCommentNotificationView(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.queryset.filter(
-            post__blog__slug=self.kwargs["slug"], post__post_id=self.kwargs["post_id"]
+            post__blog__slug=self.kwargs["slug"],
+            post__post_id=self.kwargs["post_id"],
+            is_hidden=False,
         )
 
         parent_id = self.request.query_params.get("parent_id", None)
@@ -355,18 +384,11 @@ class PostCommentNotificationView(viewsets.ModelViewSet):
         else:
             queryset = queryset.filter(reply_to=None)
 
-        queryset = queryset.annotate(
-            isLiked=Exists(
-                Commentary.objects.filter(liked_users=request.user, id=OuterRef("pk"))
-            ),
-            isDisliked=Exists(
-                Commentary.objects.filter(
-                    disliked_users=request.user, id=OuterRef("pk")
-                )
-            ),
-        )
+        queryset = queryset.select_related("author", "pinned_by_user", "reply_to")
 
-        paginate_queryset = self.paginate_queryset(queryset)
+        paginate_queryset = resolve_comment_state(
+            self.paginate_queryset(queryset), request.user
+        )
         serializer = self.serializer_class(paginate_queryset, many=True)
         response = self.get_paginated_response(serializer.data)
         return Response(data=response.data, status=status.HTTP_200_OK)
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invites", "0001_initial"),
+        ("social_net", "0092_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invite",
+            index=models.Index(
+                fields=["blog", "status"], name="invite_blog_status_idx"
+            ),
+        ),
+    ]
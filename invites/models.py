@@ -14,5 +14,10 @@ class Invite(models.Model):
     status = models.BooleanField("Статус приглашения", null=True)
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name="invites")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["blog", "status"], name="invite_blog_status_idx")
+        ]
+
     def __str__(self):
         return str(self.admin)
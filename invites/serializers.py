@@ -40,3 +40,12 @@ class InviteGetUsersSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ("id", "value", "email", "avatar_small")
+
+
+class InvitePushSerializer(serializers.ModelSerializer):
+    admin = UserSerializer()
+    blog = serializers.SlugRelatedField(slug_field="slug", read_only=True)
+
+    class Meta:
+        model = Invite
+        fields = ["pk", "admin", "description", "created_at", "blog"]
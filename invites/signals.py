@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from social_net.realtime import push, user_group
+from .models import Invite
+from .serializers import InvitePushSerializer
+
+
+@receiver(post_save, sender=Invite)
+def push_invite(sender, instance, created, **kwargs):
+    if created:
+        push(
+            user_group(instance.addressee_id),
+            "invite.created",
+            lambda: InvitePushSerializer(instance).data,
+        )
@@ -5,6 +5,7 @@ from rest_framework import status, viewsets
 from django.shortcuts import get_object_or_404
 
 from authentication.models import UserProfile
+from social_net.querysets import with_blog_relations
 from .models import Blog, Invite
 from .serializers import (
     InviteUserSerializer,
@@ -47,7 +48,12 @@ class InviteListView(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
 
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset.filter(addressee=request.user).order_by("status")
+        queryset = with_blog_relations(
+            self.queryset.filter(addressee=request.user)
+            .select_related("admin", "addressee")
+            .order_by("status"),
+            "blog__",
+        )
         paginated_result = self.paginate_queryset(queryset)
         if paginated_result is not None:
             serializer = self.serializer_class(paginated_result, many=True)
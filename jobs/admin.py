@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class AdminJobs(admin.ModelAdmin):
+    model = Job
+    list_display = (
+        "name",
+        "status",
+        "priority",
+        "attempts",
+        "run_at",
+        "locked_by",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "name")
+
+
+admin.site.register(Job, AdminJobs)
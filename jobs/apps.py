@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Фоновые задачи"
+
+    def ready(self):
+        # задачи регистрируются декоратором jobs.queue.task в модулях tasks.py
+        autodiscover_modules("tasks")
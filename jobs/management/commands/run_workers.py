@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs.queue import JOBS_POLL_INTERVAL, work, worker_name
+
+
+def run_worker(stop, burst, poll_interval):
+    try:
+        work(worker_name(), stop, burst, poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Запускает воркеры, которые выполняют фоновые задачи из таблицы Job"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Число процессов-воркеров (по умолчанию 1, в текущем процессе)",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Выйти, когда в очереди не останется готовых задач",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=JOBS_POLL_INTERVAL,
+            help="Пауза между опросами пустой очереди, секунды",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        args = (stop, options["burst"], options["poll_interval"])
+        if concurrency == 1:
+            run_worker(*args)
+            return
+
+        # соединения с БД не должны переходить в дочерние процессы
+        connections.close_all()
+        workers = [
+            context.Process(target=run_worker, args=args, daemon=True)
+            for _ in range(concurrency)
+        ]
+        for process in workers:
+            process.start()
+        self.stdout.write(f"Started {concurrency} workers")
+        for process in workers:
+            process.join()
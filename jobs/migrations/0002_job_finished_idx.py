@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("status__in", ["done", "failed"])),
+                fields=["status", "finished_at"],
+                name="job_finished_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField("Задача", max_length=200)
+    payload = models.JSONField("Аргументы", default=dict, blank=True)
+    priority = models.SmallIntegerField(
+        "Приоритет", default=0, help_text="Задачи с большим приоритетом берутся первыми"
+    )
+    status = models.CharField("Статус", max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField("Максимум попыток", default=5)
+    run_at = models.DateTimeField("Не раньше", default=timezone.now)
+    locked_by = models.CharField("Воркер", max_length=100, blank=True)
+    locked_at = models.DateTimeField("Взята в работу", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    finished_at = models.DateTimeField("Дата завершения", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_at"],
+                condition=Q(status="queued"),
+                name="job_claim_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=Q(status="running"),
+                name="job_running_idx",
+            ),
+            models.Index(
+                fields=["status", "finished_at"],
+                condition=Q(status__in=["done", "failed"]),
+                name="job_finished_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,273 @@
+import datetime
+import logging
+import os
+import socket
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS_MAX_ATTEMPTS = getattr(settings, "JOBS_MAX_ATTEMPTS", 5)
+JOBS_RETRY_BACKOFF = getattr(settings, "JOBS_RETRY_BACKOFF", 10)
+JOBS_MAX_BACKOFF = 3600
+JOBS_LOCK_TIMEOUT = getattr(settings, "JOBS_LOCK_TIMEOUT", 600)
+JOBS_POLL_INTERVAL = getattr(settings, "JOBS_POLL_INTERVAL", 1)
+JOBS_DONE_RETENTION = getattr(settings, "JOBS_DONE_RETENTION", 24 * 3600)
+JOBS_FAILED_RETENTION = getattr(settings, "JOBS_FAILED_RETENTION", 14 * 24 * 3600)
+JOBS_PRUNE_INTERVAL = 60
+JOBS_PRUNE_BATCH = 1000
+
+TASKS = {}
+
+
+def task(name=None, priority=0, max_attempts=None):
+    """
+    Register a function as a background task. The function gets an
+    .enqueue(**payload) helper and .enqueue_many([payload, ...]) for
+    batches; payloads must be JSON-serializable.
+    """
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        if task_name in TASKS and TASKS[task_name] is not func:
+            raise ValueError(f"Task {task_name} is already registered")
+        TASKS[task_name] = func
+
+        def enqueue_task(**payload):
+            return enqueue(
+                task_name, payload, priority=priority, max_attempts=max_attempts
+            )
+
+        def enqueue_many(payloads):
+            return enqueue_batch(
+                task_name, payloads, priority=priority, max_attempts=max_attempts
+            )
+
+        func.task_name = task_name
+        func.enqueue = enqueue_task
+        func.enqueue_many = enqueue_many
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, priority=0, delay=None, max_attempts=None):
+    """
+    Queue a task. The row is written in the caller's transaction, so a
+    worker never sees a job whose data was rolled back. With JOBS_EAGER the
+    task runs right away instead.
+    """
+    if name not in TASKS:
+        raise LookupError(f"Unknown task: {name}")
+    payload = payload or {}
+    if getattr(settings, "JOBS_EAGER", False):
+        TASKS[name](**payload)
+        return None
+
+    run_at = timezone.now()
+    if delay:
+        run_at += datetime.timedelta(seconds=delay)
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        priority=priority,
+        max_attempts=max_attempts or JOBS_MAX_ATTEMPTS,
+        run_at=run_at,
+    )
+
+
+def enqueue_batch(name, payloads, priority=0, max_attempts=None):
+    """Queue a task once per payload with a single INSERT."""
+    if name not in TASKS:
+        raise LookupError(f"Unknown task: {name}")
+    if getattr(settings, "JOBS_EAGER", False):
+        for payload in payloads:
+            TASKS[name](**payload)
+        return []
+
+    now = timezone.now()
+    return Job.objects.bulk_create(
+        [
+            Job(
+                name=name,
+                payload=payload,
+                priority=priority,
+                max_attempts=max_attempts or JOBS_MAX_ATTEMPTS,
+                run_at=now,
+            )
+            for payload in payloads
+        ]
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker):
+    """
+    Take the next due job: the highest priority first, then the oldest.
+    Rows locked by other workers are skipped (FOR UPDATE SKIP LOCKED); the
+    conditional UPDATE keeps claiming safe on databases without row locks.
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=Job.QUEUED, run_at__lte=now)
+                .order_by("-priority", "run_at", "pk")
+                .first()
+            )
+            if job is None:
+                return None
+            claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+                status=Job.RUNNING,
+                attempts=F("attempts") + 1,
+                locked_by=worker,
+                locked_at=now,
+            )
+        if claimed:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_at = now
+            return job
+
+
+def backoff(attempts):
+    return min(JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), JOBS_MAX_BACKOFF)
+
+
+def run_job(job):
+    """
+    Run a claimed job in a transaction. A failed job is queued again after
+    an exponential backoff until it runs out of attempts.
+    """
+    try:
+        func = TASKS.get(job.name)
+        if func is None:
+            raise LookupError(f"Unknown task: {job.name}")
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s failed (attempt %s)", job, job.attempts, exc_info=True)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            changes = {
+                "status": Job.QUEUED,
+                "run_at": now + datetime.timedelta(seconds=backoff(job.attempts)),
+            }
+        else:
+            changes = {"status": Job.FAILED, "finished_at": now}
+        Job.objects.filter(pk=job.pk).update(
+            last_error=error, locked_by="", locked_at=None, **changes
+        )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, finished_at=timezone.now(), locked_by="", locked_at=None
+    )
+    return True
+
+
+def requeue_stale(timeout=JOBS_LOCK_TIMEOUT):
+    """
+    Give back the jobs of workers that died mid-job: running longer than
+    `timeout` seconds. A job that has used up its attempts is failed.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - datetime.timedelta(seconds=timeout),
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        finished_at=timezone.now(),
+        last_error="Worker lost",
+        locked_by="",
+        locked_at=None,
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by="", locked_at=None)
+    return requeued + failed
+
+
+def prune(done=JOBS_DONE_RETENTION, failed=JOBS_FAILED_RETENTION):
+    """
+    Delete jobs that finished more than `done` seconds ago and jobs that
+    failed for good more than `failed` seconds ago, JOBS_PRUNE_BATCH rows
+    per DELETE so the table is never locked for long.
+    """
+    now = timezone.now()
+    finished = Job.objects.filter(
+        Q(status=Job.DONE, finished_at__lt=now - datetime.timedelta(seconds=done))
+        | Q(
+            status=Job.FAILED,
+            finished_at__lt=now - datetime.timedelta(seconds=failed),
+        )
+    )
+    deleted = 0
+    while True:
+        batch = list(finished.values_list("pk", flat=True)[:JOBS_PRUNE_BATCH])
+        if not batch:
+            return deleted
+        deleted += Job.objects.filter(pk__in=batch).delete()[0]
+
+
+def work(worker=None, stop=None, burst=False, poll_interval=JOBS_POLL_INTERVAL):
+    """
+    Worker loop: run jobs until `stop` (a threading/multiprocessing Event)
+    is set, or until the queue is empty when `burst` is true.
+    """
+    worker = worker or worker_name()
+    processed = 0
+    requeue_stale()
+    prune()
+    requeued_at = pruned_at = time.monotonic()
+    while stop is None or not stop.is_set():
+        try:
+            job = claim(worker)
+            # обслуживание не нужно на каждом опросе пустой очереди
+            if job is None and not burst:
+                if time.monotonic() - requeued_at >= JOBS_LOCK_TIMEOUT:
+                    requeue_stale()
+                    requeued_at = time.monotonic()
+                if time.monotonic() - pruned_at >= JOBS_PRUNE_INTERVAL:
+                    prune()
+                    pruned_at = time.monotonic()
+        except DatabaseError:
+            # база недоступна или заблокирована: переподключиться и подождать
+            logger.exception("Worker %s failed to claim a job", worker)
+            close_old_connections()
+            _wait(stop, poll_interval)
+            continue
+        if job is None:
+            if burst:
+                break
+            _wait(stop, poll_interval)
+            continue
+        try:
+            run_job(job)
+        except DatabaseError:
+            # статус не записан: задача останется RUNNING и вернётся
+            # в очередь через requeue_stale по истечении блокировки
+            logger.exception("Worker %s failed to finish job %s", worker, job)
+            close_old_connections()
+            _wait(stop, poll_interval)
+            continue
+        processed += 1
+    return processed
+
+
+def _wait(stop, seconds):
+    if stop is not None:
+        stop.wait(seconds)
+    else:
+        time.sleep(seconds)
@@ -0,0 +1,122 @@
+import datetime
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, prune, requeue_stale, run_job, task, work
+
+
+@task(name="jobs.tests.succeed")
+def succeed():
+    pass
+
+
+@task(name="jobs.tests.fail")
+def fail():
+    raise RuntimeError("boom")
+
+
+class PruneTests(TestCase):
+    def job(self, status, age):
+        finished_at = timezone.now() - datetime.timedelta(seconds=age)
+        return Job.objects.create(name="task", status=status, finished_at=finished_at)
+
+    def test_deletes_old_finished_jobs_only(self):
+        kept = [
+            self.job(Job.DONE, 10),
+            self.job(Job.FAILED, 200),
+            Job.objects.create(name="task"),
+            Job.objects.create(name="task", status=Job.RUNNING),
+        ]
+        self.job(Job.DONE, 200)
+        self.job(Job.FAILED, 2000)
+
+        self.assertEqual(prune(done=100, failed=1000), 2)
+        self.assertQuerySetEqual(Job.objects.order_by("pk"), kept)
+
+
+class ClaimTests(TestCase):
+    def test_takes_due_jobs_by_priority_once(self):
+        Job.objects.create(name="jobs.tests.succeed", priority=1)
+        urgent = Job.objects.create(name="jobs.tests.succeed", priority=5)
+        later = timezone.now() + datetime.timedelta(hours=1)
+        Job.objects.create(name="jobs.tests.succeed", priority=9, run_at=later)
+
+        job = claim("worker-1")
+        self.assertEqual(job.pk, urgent.pk)
+        urgent.refresh_from_db()
+        self.assertEqual(urgent.status, Job.RUNNING)
+        self.assertEqual((urgent.attempts, urgent.locked_by), (1, "worker-1"))
+
+        self.assertNotEqual(claim("worker-2").pk, urgent.pk)
+        self.assertIsNone(claim("worker-3"))
+
+
+class RunJobTests(TestCase):
+    def run_claimed(self, name, max_attempts=3):
+        Job.objects.create(name=name, max_attempts=max_attempts)
+        job = claim("worker")
+        result = run_job(job)
+        job.refresh_from_db()
+        return result, job
+
+    def test_success_marks_job_done(self):
+        result, job = self.run_claimed("jobs.tests.succeed")
+        self.assertTrue(result)
+        self.assertEqual(job.status, Job.DONE)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_is_retried_after_backoff(self):
+        started = timezone.now()
+        with self.assertLogs("jobs.queue", "WARNING"):
+            result, job = self.run_claimed("jobs.tests.fail")
+        self.assertFalse(result)
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, started + datetime.timedelta(seconds=5))
+        self.assertIn("boom", job.last_error)
+        self.assertEqual(job.locked_by, "")
+
+    def test_last_attempt_fails_job(self):
+        with self.assertLogs("jobs.queue", "WARNING"):
+            result, job = self.run_claimed("jobs.tests.fail", max_attempts=1)
+        self.assertFalse(result)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+
+class RequeueStaleTests(TestCase):
+    def test_returns_jobs_of_lost_workers(self):
+        old = timezone.now() - datetime.timedelta(seconds=120)
+        running = {"status": Job.RUNNING, "locked_by": "dead", "locked_at": old}
+        lost = Job.objects.create(name="task", attempts=1, **running)
+        spent = Job.objects.create(name="task", attempts=5, max_attempts=5, **running)
+        busy = Job.objects.create(
+            name="task", status=Job.RUNNING, locked_at=timezone.now()
+        )
+
+        self.assertEqual(requeue_stale(timeout=60), 2)
+        statuses = dict(Job.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[lost.pk], Job.QUEUED)
+        self.assertEqual(statuses[spent.pk], Job.FAILED)
+        self.assertEqual(statuses[busy.pk], Job.RUNNING)
+
+
+class WorkTests(TestCase):
+    def test_database_error_on_finish_keeps_worker_running(self):
+        first = Job.objects.create(name="jobs.tests.succeed", priority=1)
+        second = Job.objects.create(name="jobs.tests.succeed")
+        finish = mock.patch(
+            "jobs.queue.run_job", side_effect=[DatabaseError("gone"), True]
+        )
+        with finish, self.assertLogs("jobs.queue", "ERROR"):
+            processed = work(burst=True, poll_interval=0)
+
+        self.assertEqual(processed, 1)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        # статус не записан - задачу вернёт requeue_stale
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertEqual(second.attempts, 1)
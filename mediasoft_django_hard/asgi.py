@@ -9,16 +9,23 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-
-from social_net.routing import ws_urlpatterns
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mediasoft_django_hard.settings")
 
+# приложение Django создаётся до импорта consumers, которым нужны модели
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+
+from social_net.consumers import TokenAuthMiddleware  # noqa: E402
+from social_net.routing import ws_urlpatterns  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
-        "http": get_asgi_application(),
-        "websocket": AuthMiddlewareStack(URLRouter(ws_urlpatterns)),
+        "http": django_asgi_app,
+        "websocket": AuthMiddlewareStack(
+            TokenAuthMiddleware(URLRouter(ws_urlpatterns))
+        ),
     }
 )
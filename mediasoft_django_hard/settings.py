@@ -61,6 +61,8 @@ INSTALLED_APPS = [
     "invites.apps.InvitesConfig",
     "notifications.apps.NotificationsConfig",
     "comments.apps.CommentsConfig",
+    "search.apps.SearchConfig",
+    "jobs.apps.JobsConfig",
     "corsheaders",
 ]
 
@@ -68,18 +70,91 @@ AUTH_USER_MODEL = "authentication.UserProfile"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "authentication.backends.CachedTokenAuthentication",
     ],
 }
 
-# CHANNEL_LAYERS = {
-#     'default': {
-#         'BACKEND': 'channels_redis.core.RedisChannelLayer',
-#         'CONFIG': {
-#             "hosts": [('127.0.0.1', 6379)],
-#         },
-#     },
-# }
+# Токены проверяются через кэш в памяти процесса: не больше
+# AUTH_TOKEN_CACHE_SIZE записей по AUTH_TOKEN_CACHE_TTL секунд. Общий кэш
+# (AUTH_TOKEN_SHARED_CACHE_ALIAS, например "default" с Redis) спрашивается
+# до БД. last_activity пишется раз в LAST_ACTIVITY_FLUSH_INTERVAL секунд
+# (0 - на каждый запрос)
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 30
+AUTH_TOKEN_SHARED_CACHE_ALIAS = os.getenv("AUTH_TOKEN_SHARED_CACHE_ALIAS") or None
+AUTH_TOKEN_SHARED_CACHE_TTL = 300
+LAST_ACTIVITY_FLUSH_INTERVAL = int(os.getenv("LAST_ACTIVITY_FLUSH_INTERVAL", 60))
+
+# Просмотры постов копятся в памяти процесса и сбрасываются в БД пачками
+# раз в POST_VIEWS_FLUSH_INTERVAL секунд (0 - писать сразу)
+POST_VIEWS_FLUSH_INTERVAL = int(os.getenv("POST_VIEWS_FLUSH_INTERVAL", 10))
+POST_VIEWS_MAX_PENDING = 1000
+
+# Полнотекстовый поиск: по умолчанию Postgres (tsvector), на остальных БД -
+# поиск через LIKE; можно указать свой класс путём "module.Class"
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND") or None
+
+# Лента подписок: новые посты раскладываются по лентам подписчиков; блоги,
+# у которых подписчиков больше FEED_FANOUT_LIMIT, подмешиваются при чтении
+FEED_FANOUT_LIMIT = int(os.getenv("FEED_FANOUT_LIMIT", 5000))
+FEED_BACKFILL = 20
+
+# Уведомления об упоминаниях: не больше стольких @имён на комментарий
+MAX_MENTIONS_PER_COMMENT = 20
+
+# Фоновые задачи (приложение jobs, воркеры: manage.py run_workers). Упавшая
+# задача повторяется через JOBS_RETRY_BACKOFF * 2^(попытка-1) секунд, задача
+# воркера, который не отвечает дольше JOBS_LOCK_TIMEOUT секунд, возвращается
+# в очередь. Выполненные задачи удаляются через JOBS_DONE_RETENTION секунд,
+# упавшие - через JOBS_FAILED_RETENTION. JOBS_EAGER=1 выполняет задачи сразу,
+# без очереди (разработка)
+JOBS_EAGER = os.getenv("JOBS_EAGER", "0") == "1"
+JOBS_POLL_INTERVAL = 1
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 10
+JOBS_LOCK_TIMEOUT = 600
+JOBS_DONE_RETENTION = 24 * 3600
+JOBS_FAILED_RETENTION = 14 * 24 * 3600
+
+# Уменьшенные копии загруженных картинок (аватары, баннеры, картинки постов):
+# имя -> наибольшая сторона в пикселях, формат WebP. Строятся фоновой задачей
+IMAGE_VARIANTS = {"small": 200, "medium": 800, "large": 2048}
+IMAGE_VARIANTS_QUALITY = 80
+
+# Кэш: в разработке - память процесса (или файловый кэш через
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache),
+# в продакшене - общий, например django.core.cache.backends.redis.RedisCache
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "mediasoft"),
+    }
+}
+
+# Ответы GET-эндпоинтов для анонимных пользователей, секунды
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 60))
+
+# Маршруты, которые обслуживаются асинхронными представлениями (для A/B под
+# нагрузкой через ASGI), через запятую: post_list,blog_page,post_page,
+# post_comment_list
+ASYNC_READ_ROUTES = [
+    name.strip() for name in os.getenv("ASYNC_READ_ROUTES", "").split(",") if name
+]
+
+# Канальный слой для WebSocket-уведомлений: в памяти процесса (разработка,
+# тесты, один воркер) или Redis через channels_redis, если задан
+# CHANNEL_REDIS_URL, например redis://127.0.0.1:6379/1
+if os.getenv("CHANNEL_REDIS_URL"):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [os.getenv("CHANNEL_REDIS_URL")]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
@@ -100,6 +175,24 @@ ROOT_URLCONF = "mediasoft_django_hard.urls"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# Загрузки хранятся по SHA-256 содержимого (media/cas/), каждый файл - один
+# раз. Такие URL никогда не меняют содержимого, поэтому веб-сервер может
+# отдавать /media/cas/ с Cache-Control: public, max-age=31536000, immutable.
+# Файл без ссылок удаляется не раньше чем через MEDIA_SWEEP_DELAY секунд
+STORAGES = {
+    "default": {"BACKEND": "social_net.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_SWEEP_DELAY = 3600
+
+# Загрузка картинок (посты, аватары, баннеры) проверяется по мере приёма:
+# размер файла, формат и число пикселей из заголовка; файлы сразу пишутся
+# на диск, а не в память
+UPLOAD_IMAGE_TYPES = ("JPEG", "PNG", "GIF", "WEBP")
+UPLOAD_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+UPLOAD_IMAGE_MAX_PIXELS = 40_000_000
+UPLOAD_MAX_FILES = 10
+
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
@@ -14,15 +14,27 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from social_net.storage import CAS_DIR, serve_immutable
+
 urlpatterns = [
     path("api/v1/", include("authentication.api_urls")),
     path("admin/", admin.site.urls),
     path("api/v1/", include("social_net.api_urls")),
+    path("api/v1/", include("comments.api_urls")),
     path("api/v1/", include("notifications.api_urls")),
     path("api/v1/", include("invites.api_urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("api/v1/", include("search.api_urls")),
+]
+urlpatterns += static(
+    f"{settings.MEDIA_URL}{CAS_DIR}/",
+    view=serve_immutable,
+    document_root=os.path.join(settings.MEDIA_ROOT, CAS_DIR),
+)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
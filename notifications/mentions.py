@@ -0,0 +1,60 @@
+import re
+
+from django.conf import settings
+
+from authentication.models import UserProfile
+from .models import Notification
+from .signals import announce
+
+MENTION_RE = re.compile(r"@(\w+)")
+MAX_MENTIONS = getattr(settings, "MAX_MENTIONS_PER_COMMENT", 20)
+
+
+def parse_mentions(text, limit=MAX_MENTIONS):
+    """
+    "@bob, @alice и снова @bob" -> ["bob", "alice"]: distinct names in order
+    of first appearance, at most `limit` of them.
+    """
+    names = []
+    for name in MENTION_RE.findall(text or ""):
+        if name not in names:
+            names.append(name)
+            if len(names) == limit:
+                break
+    return names
+
+
+def notify_mentions(comment, parent_comment=None):
+    """
+    Notify the users mentioned in a comment: one username__in query and one
+    bulk INSERT however many mentions there are. The author is not notified
+    about mentioning themselves.
+    """
+    names = parse_mentions(comment.body)
+    if not names:
+        return []
+
+    addressees = UserProfile.objects.filter(username__in=names).exclude(
+        pk=comment.author_id
+    )
+    text = (
+        f'Пользователь {comment.author.username} оставил комментарий "{comment.body}"'
+    )
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                addressee_id=addressee_id,
+                parent_comment=parent_comment or comment,
+                replied_comment=comment,
+                post=comment.post,
+                text=text,
+                author=comment.author,
+                is_read=False,
+            )
+            for addressee_id in addressees.values_list("pk", flat=True)
+        ]
+    )
+    # bulk_create не отправляет post_save
+    for notification in notifications:
+        announce(notification)
+    return notifications
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0004_hot_path_indexes"),
+        ("notifications", "0002_alter_notification_parent_comment_and_more"),
+        ("social_net", "0092_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False)),
+                fields=["addressee", "-created_at", "-id"],
+                name="notification_visible_idx",
+            ),
+        ),
+    ]
@@ -25,5 +25,14 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     is_hidden = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["addressee", "-created_at", "-id"],
+                condition=models.Q(is_hidden=False),
+                name="notification_visible_idx",
+            )
+        ]
+
     def __str__(self):
         return str(self.addressee)
@@ -11,3 +11,13 @@ class UserNotificationsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ["id", "addressee", "text", "author", "created_at", "is_read", "post"]
+
+
+class NotificationPushSerializer(serializers.ModelSerializer):
+    author = UserSerializer()
+    post = serializers.IntegerField(source="post.post_id")
+    blog = serializers.CharField(source="post.blog_id")
+
+    class Meta:
+        model = Notification
+        fields = ["id", "text", "author", "created_at", "is_read", "post", "blog"]
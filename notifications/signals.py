@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from social_net.realtime import push, user_group
+from .models import Notification
+from .serializers import NotificationPushSerializer
+
+
+def announce(notification):
+    push(
+        user_group(notification.addressee_id),
+        "notification.created",
+        lambda: NotificationPushSerializer(notification).data,
+    )
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        announce(instance)
@@ -0,0 +1,20 @@
+from comments.models import Commentary
+from jobs.queue import task
+from .mentions import notify_mentions
+
+
+@task(priority=10)
+def deliver_mentions(comment_id, parent_id=None):
+    comment = (
+        Commentary.objects.select_related("author", "post")
+        .filter(pk=comment_id)
+        .first()
+    )
+    if comment is None:
+        return
+    parent_comment = None
+    if parent_id:
+        parent_comment = (
+            Commentary.objects.select_related("author").filter(pk=parent_id).first()
+        )
+    notify_mentions(comment, parent_comment)
@@ -2,7 +2,8 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status, viewsets
 from django.shortcuts import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
+from social_net.pagination import KeysetPagination
+from social_net.querysets import with_post_relations
 
 from .models import Notification
 from .serializers import (
@@ -10,7 +11,7 @@ from .serializers import (
 )
 
 
-class ListSetPagination(PageNumberPagination):
+class ListSetPagination(KeysetPagination):
     page_size = 5
 
 
@@ -21,9 +22,13 @@ class UserNotificationListView(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
 
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset.filter(addressee=request.user)
+        queryset = self.queryset.filter(addressee=request.user).order_by("-created_at")
 
-        paginate_queryset = self.paginate_queryset(queryset)
+        paginate_queryset = self.paginate_queryset(
+            with_post_relations(
+                queryset.select_related("addressee", "author"), "post__"
+            )
+        )
         if paginate_queryset:
             serializer = self.serializer_class(paginate_queryset, many=True)
             result = self.get_paginated_response(serializer.data)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .viewsets import SearchView
+
+full_text_search = SearchView.as_view({"get": "list"})
+
+urlpatterns = [
+    path("search/", full_text_search, name="full_text_search"),
+]
@@ -0,0 +1,182 @@
+import functools
+import html
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .targets import TARGETS
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# ts_headline не экранирует текст документа, поэтому он отмечает совпадения
+# символами из области частного использования, а <mark> подставляется
+# после экранирования
+PLACEHOLDER_START = "\ue000"
+PLACEHOLDER_STOP = "\ue001"
+# веса по умолчанию для ts_rank: {D, C, B, A}
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+
+class PostgresSearchBackend:
+    """
+    Full-text search over the maintained search_vector columns. Documents and
+    queries are parsed with both the Russian (stemmed) and the simple
+    configuration, so exact tokens such as names or English words still match.
+    """
+
+    configs = ("russian", "simple")
+    headline_words = 35
+
+    def vector(self, target):
+        vector = None
+        for field, weight in target.fields:
+            for config in self.configs:
+                part = SearchVector(field, config=config, weight=weight)
+                vector = part if vector is None else vector + part
+        return vector
+
+    def update_vector(self, target, pk):
+        target.model.objects.filter(pk=pk).update(search_vector=self.vector(target))
+
+    def rebuild(self, target, queryset=None):
+        if queryset is None:
+            queryset = target.model.objects.all()
+        return queryset.update(search_vector=self.vector(target))
+
+    def query(self, text):
+        query = None
+        for config in self.configs:
+            part = SearchQuery(text, config=config, search_type="websearch")
+            query = part if query is None else query | part
+        return query
+
+    def filter(self, queryset, target, text):
+        return queryset.filter(search_vector=self.query(text))
+
+    def search(self, queryset, target, text):
+        query = self.query(text)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                headline=SearchHeadline(
+                    target.headline,
+                    query,
+                    config=self.configs[0],
+                    start_sel=PLACEHOLDER_START,
+                    stop_sel=PLACEHOLDER_STOP,
+                    max_words=self.headline_words,
+                ),
+            )
+            .order_by("-rank", "-pk")
+        )
+
+    def highlight(self, rows, target, text):
+        for row in rows:
+            row.headline = (
+                html.escape(row.headline or "")
+                .replace(PLACEHOLDER_START, HIGHLIGHT_START)
+                .replace(PLACEHOLDER_STOP, HIGHLIGHT_STOP)
+            )
+        return rows
+
+
+class LikeSearchBackend:
+    """
+    Fallback for databases without full-text search (SQLite in development):
+    every word of the query must occur in one of the target fields, rank is
+    the sum of the weights of the matching fields and highlights are built
+    in Python for the rows of the current page.
+    """
+
+    max_terms = 10
+    headline_chars = 200
+
+    def terms(self, text):
+        terms = []
+        for word in re.findall(r"\w+", text.lower()):
+            if word not in terms:
+                terms.append(word)
+        return terms[: self.max_terms]
+
+    def update_vector(self, target, pk):
+        pass
+
+    def rebuild(self, target, queryset=None):
+        return 0
+
+    def filter(self, queryset, target, text):
+        terms = self.terms(text)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            condition = Q()
+            for field, _ in target.fields:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def search(self, queryset, target, text):
+        rank = Value(0.0)
+        for term in self.terms(text):
+            for field, weight in target.fields:
+                rank = rank + Case(
+                    When(**{f"{field}__icontains": term}, then=Value(WEIGHTS[weight])),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+        return (
+            self.filter(queryset, target, text)
+            .annotate(rank=rank, headline=F(target.headline))
+            .order_by("-rank", "-pk")
+        )
+
+    def highlight(self, rows, target, text):
+        pattern = re.compile(
+            "|".join(re.escape(term) for term in self.terms(text)), re.IGNORECASE
+        )
+        for row in rows:
+            row.headline = self.headline(row.headline or "", pattern)
+        return rows
+
+    def headline(self, document, pattern):
+        match = pattern.search(document)
+        start = 0
+        if match and match.start() > self.headline_chars // 2:
+            start = document.rfind(" ", 0, match.start() - self.headline_chars // 4) + 1
+        fragment = document[start : start + self.headline_chars]
+        # экранируется каждый кусок отдельно, чтобы совпадения искались
+        # в исходном тексте, а не в сущностях вроде &amp;
+        parts = []
+        position = 0
+        for found in pattern.finditer(fragment):
+            parts.append(html.escape(fragment[position : found.start()]))
+            parts.append(
+                f"{HIGHLIGHT_START}{html.escape(found.group(0))}{HIGHLIGHT_STOP}"
+            )
+            position = found.end()
+        parts.append(html.escape(fragment[position:]))
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, "SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return LikeSearchBackend()
+
+
+def search_filter(queryset, name, text):
+    return get_backend().filter(queryset, TARGETS[name], text)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.backends import get_backend
+from search.targets import TARGETS
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает поисковые векторы постов, блогов и комментариев"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            action="append",
+            dest="types",
+            help="Раздел для пересчёта: posts, blogs или comments",
+        )
+
+    def handle(self, *args, **options):
+        types = options["types"] or list(TARGETS)
+        unknown = set(types) - set(TARGETS)
+        if unknown:
+            raise CommandError(f"Unknown search types: {', '.join(sorted(unknown))}")
+
+        backend = get_backend()
+        for name in types:
+            updated = backend.rebuild(TARGETS[name])
+            self.stdout.write(f"{name}: {updated} updated")
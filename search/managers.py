@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class SearchableManager(models.Manager):
+    """
+    Leaves search_vector out of regular SELECTs: it is only read by the
+    database itself (in WHERE / ts_rank) and is maintained by UPDATE.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
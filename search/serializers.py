@@ -0,0 +1,68 @@
+from rest_framework import serializers
+
+from comments.models import Commentary
+from social_net.models import Blog, Post
+from social_net.serializers import UserSerializer
+
+
+class SearchPostSerializer(serializers.ModelSerializer):
+    author = serializers.SerializerMethodField()
+    blog = serializers.CharField(source="blog.slug", read_only=True)
+    blog_title = serializers.CharField(source="blog.title", read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            "post_id",
+            "title",
+            "blog",
+            "blog_title",
+            "author",
+            "created_at",
+            "rank",
+            "headline",
+        )
+
+    def get_author(self, obj):
+        if obj.author_is_hidden:
+            return None
+        return UserSerializer(obj.author).data
+
+
+class SearchBlogSerializer(serializers.ModelSerializer):
+    owner = UserSerializer()
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Blog
+        fields = ("slug", "title", "avatar_small", "owner", "rank", "headline")
+
+
+class SearchCommentSerializer(serializers.ModelSerializer):
+    author = UserSerializer()
+    post_id = serializers.IntegerField(source="post.post_id", read_only=True)
+    blog = serializers.CharField(source="post.blog_id", read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Commentary
+        fields = (
+            "comment_id",
+            "post_id",
+            "blog",
+            "author",
+            "created_at",
+            "rank",
+            "headline",
+        )
+
+
+SERIALIZERS = {
+    "posts": SearchPostSerializer,
+    "blogs": SearchBlogSerializer,
+    "comments": SearchCommentSerializer,
+}
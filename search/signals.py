@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save
+
+from .backends import get_backend
+from .targets import TARGETS, target_for
+
+
+def update_search_vector(sender, instance, update_fields=None, **kwargs):
+    target = target_for(sender)
+    if update_fields is not None:
+        if not {field for field, _ in target.fields} & set(update_fields):
+            return
+    get_backend().update_vector(target, instance.pk)
+
+
+for name, target in TARGETS.items():
+    post_save.connect(
+        update_search_vector, sender=target.model, dispatch_uid=f"search_{name}"
+    )
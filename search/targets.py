@@ -0,0 +1,38 @@
+from collections import namedtuple
+
+from comments.models import Commentary
+from comments.tree import without_hidden
+from social_net.models import Blog, Post
+
+# fields: (поле, вес) — заголовок весит больше тела
+SearchTarget = namedtuple("SearchTarget", ["model", "fields", "headline", "queryset"])
+
+TARGETS = {
+    "posts": SearchTarget(
+        Post,
+        (("title", "A"), ("body", "B")),
+        "body",
+        lambda: Post.objects.filter(is_published=True).select_related("author", "blog"),
+    ),
+    "blogs": SearchTarget(
+        Blog,
+        (("title", "A"), ("description", "B")),
+        "description",
+        lambda: Blog.objects.select_related("owner"),
+    ),
+    "comments": SearchTarget(
+        Commentary,
+        (("body", "B"),),
+        "body",
+        lambda: without_hidden(
+            Commentary.objects.filter(post__is_published=True)
+        ).select_related("author", "post"),
+    ),
+}
+
+
+def target_for(model):
+    for target in TARGETS.values():
+        if target.model is model:
+            return target
+    return None
@@ -0,0 +1,36 @@
+import re
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from .backends import (
+    PLACEHOLDER_START,
+    PLACEHOLDER_STOP,
+    LikeSearchBackend,
+    PostgresSearchBackend,
+)
+
+
+class HighlightEscapingTests(SimpleTestCase):
+    def test_like_headline_escapes_document(self):
+        pattern = re.compile("script", re.IGNORECASE)
+        headline = LikeSearchBackend().headline("<script>alert(1)</script>", pattern)
+        self.assertEqual(
+            headline,
+            "&lt;<mark>script</mark>&gt;alert(1)&lt;/<mark>script</mark>&gt;",
+        )
+
+    def test_like_headline_matches_raw_text_not_entities(self):
+        pattern = re.compile("amp", re.IGNORECASE)
+        headline = LikeSearchBackend().headline("a & b", pattern)
+        self.assertEqual(headline, "a &amp; b")
+
+    def test_postgres_highlight_escapes_document(self):
+        row = SimpleNamespace(
+            headline=f"<img src=x onerror=alert(1)> {PLACEHOLDER_START}post"
+            f"{PLACEHOLDER_STOP}"
+        )
+        PostgresSearchBackend().highlight([row], None, "post")
+        self.assertEqual(
+            row.headline, "&lt;img src=x onerror=alert(1)&gt; <mark>post</mark>"
+        )
@@ -0,0 +1,53 @@
+from rest_framework import permissions, status, viewsets
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from social_net.response_cache import cache_anonymous_response
+from .backends import get_backend
+from .serializers import SERIALIZERS
+from .targets import TARGETS
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 10
+
+
+class SearchView(viewsets.ModelViewSet):
+    permission_classes = [permissions.AllowAny]
+    pagination_class = SearchPagination
+
+    @cache_anonymous_response("posts", "blogs", "comments")
+    def list(self, request, *args, **kwargs):
+        text = self.request.query_params.get("q", "").strip()
+        search_type = self.request.query_params.get("type", None)
+        if not text:
+            return Response(
+                {"q": "Search query is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if search_type and search_type not in TARGETS:
+            return Response(
+                {"type": f"Expected one of: {', '.join(TARGETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        backend = get_backend()
+        if search_type:
+            target = TARGETS[search_type]
+            rows = self.paginate_queryset(
+                backend.search(target.queryset(), target, text)
+            )
+            rows = backend.highlight(rows, target, text)
+            serializer = SERIALIZERS[search_type](rows, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        # без type — первые результаты по каждому разделу
+        data = {}
+        for name, target in TARGETS.items():
+            rows = list(
+                backend.search(target.queryset(), target, text)[
+                    : self.paginator.page_size
+                ]
+            )
+            rows = backend.highlight(rows, target, text)
+            data[name] = SERIALIZERS[name](rows, many=True).data
+        return Response(data, status=status.HTTP_200_OK)
@@ -5,6 +5,7 @@ from .models import (
     UserProfile,
     Tag,
     PostImage,
+    StoredFile,
 )
 
 
@@ -29,7 +30,7 @@ class AdminBlog(admin.ModelAdmin):
 
 class AdminTags(admin.ModelAdmin):
     model = Tag
-    list_display = ("name",)
+    list_display = ("name", "post_count", "blog_count")
 
 
 class AdminPostImages(admin.ModelAdmin):
@@ -37,7 +38,14 @@ class AdminPostImages(admin.ModelAdmin):
     list_display = ("id", "image")
 
 
+class AdminStoredFiles(admin.ModelAdmin):
+    model = StoredFile
+    list_display = ("name", "size", "refs", "uploaded_at")
+    readonly_fields = ("name", "size", "refs", "uploaded_at")
+
+
 admin.site.register(Post, AdminPosts)
 admin.site.register(Blog, AdminBlog)
 admin.site.register(Tag, AdminTags)
 admin.site.register(PostImage, AdminPostImages)
+admin.site.register(StoredFile, AdminStoredFiles)
@@ -1,4 +1,5 @@
 from django.urls import path
+from .async_views import AsyncBlogPage, AsyncPostList, AsyncPostPage, read_view
 from .viewsets import (
     BlogList,
     BlogPage,
@@ -28,11 +29,16 @@ from .viewsets import (
     BlogCommentsDeleteView,
     BlogDeletePostsView,
     BlogPublicationsView,
+    ViewCounterStatsView,
 )
 
 blog_list = BlogList.as_view({"get": "list"})
-blog_page = BlogPage.as_view(
-    {"post": "create", "put": "update", "get": "retrieve", "delete": "destroy"}
+blog_page = read_view(
+    "blog_page",
+    BlogPage.as_view(
+        {"post": "create", "put": "update", "get": "retrieve", "delete": "destroy"}
+    ),
+    AsyncBlogPage,
 )
 blog_create = BlogPage.as_view({"post": "create"})
 blog_posts = BlogPosts.as_view({"get": "list"})
@@ -41,9 +47,13 @@ blog_comments = BlogComments.as_view({"get": "list"})
 
 blog_subscription = BlogSubscription.as_view({"post": "toggle_subscription"})
 
-post_list = PostList.as_view({"get": "list"})
+post_list = read_view("post_list", PostList.as_view({"get": "list"}), AsyncPostList)
 my_posts = MyPosts.as_view({"get": "list"})
-post_page = PostPage.as_view({"put": "update", "get": "retrieve", "delete": "destroy"})
+post_page = read_view(
+    "post_page",
+    PostPage.as_view({"put": "update", "get": "retrieve", "delete": "destroy"}),
+    AsyncPostPage,
+)
 post_create = PostPage.as_view({"post": "create"})
 
 pin_post = PinPostViewSet.as_view({"post": "pin_post"})
@@ -82,6 +92,10 @@ add_or_remove_bookmark = BookmarkView.as_view({"post": "add_or_remove_bookmark"}
 
 blog_delete_posts = BlogDeletePostsView.as_view({"delete": "delete_posts"})
 blog_delete_comments = BlogCommentsDeleteView.as_view({"delete": "delete_comments"})
+blog_moderate_posts = BlogDeletePostsView.as_view({"post": "moderate_posts"})
+blog_moderate_comments = BlogCommentsDeleteView.as_view({"post": "moderate_comments"})
+
+view_counter_stats = ViewCounterStatsView.as_view({"get": "stats"})
 
 urlpatterns = [
     path("blog/list/", blog_list, name="blog_list"),
@@ -90,6 +104,21 @@ urlpatterns = [
     path("blog/<slug:slug>/subscription/", blog_subscription, name="blog_subscription"),
     path("blog/<slug:slug>/authors/", blog_authors, name="blog_authors"),
     path("blog/<slug:slug>/posts/delete/", blog_delete_posts, name="blog_delete_posts"),
+    path(
+        "blog/<slug:slug>/posts/moderate/",
+        blog_moderate_posts,
+        name="blog_moderate_posts",
+    ),
+    path(
+        "blog/<slug:slug>/comments/delete/",
+        blog_delete_comments,
+        name="blog_delete_comments",
+    ),
+    path(
+        "blog/<slug:slug>/comments/moderate/",
+        blog_moderate_comments,
+        name="blog_moderate_comments",
+    ),
     path(
         "blog/<slug:slug>/post/<int:post_id>/like/",
         set_or_remove_like,
@@ -133,6 +162,7 @@ urlpatterns = [
     path("post/list/", post_list, name="post_list"),
     path("posts/my/", my_posts, name="my_posts"),
     path("posts/search/<str:hashtag>/", search, name="search"),
+    path("metrics/post_views/", view_counter_stats, name="view_counter_stats"),
     path(
         "<slug:username>/blogs/owner/",
         username_blogs_owner,
@@ -5,6 +5,9 @@ class SocialNetConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "social_net"
 
+    def ready(self):
+        from . import signals  # noqa: F401
+
 
 def users():
     return None
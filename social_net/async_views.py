@@ -0,0 +1,155 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Sum
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from . import conditional
+from .models import Blog, Post
+from .querysets import with_post_relations
+from .response_cache import cache_anonymous_response, json_response
+from .serializers import BlogSerializer, PostSerializer
+from .view_counter import view_counter
+from .viewer_state import resolve_blog_state, resolve_post_state
+from .viewsets import ListSetPagination, PostList
+
+
+def read_view(name, view, async_view):
+    """
+    The view to route `name` to: the async implementation when the route is
+    listed in ASYNC_READ_ROUTES, the sync one otherwise. Requests other than
+    GET always go to the sync view.
+    """
+    # настройка читается при построении маршрутов, а не при импорте модуля
+    if name not in getattr(settings, "ASYNC_READ_ROUTES", ()):
+        return view
+    return async_view.as_view(fallback=view)
+
+
+class AsyncReadView(View):
+    """
+    Base for async GET handlers. The request is wrapped in a DRF Request and
+    authenticated with the configured authentication classes, API exceptions
+    are rendered the way DRF renders them.
+    """
+
+    fallback = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.fallback is not None and request.method not in ("GET", "HEAD"):
+            return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+        request = Request(request)
+        try:
+            await sync_to_async(self.authenticate)(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(request, exc)
+
+    def authenticate(self, request):
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            authenticator = authentication_class()
+            try:
+                user_auth_tuple = authenticator.authenticate(request)
+            except exceptions.AuthenticationFailed as exc:
+                exc.auth_header = authenticator.authenticate_header(request)
+                raise
+            if user_auth_tuple is not None:
+                request.user, request.auth = user_auth_tuple
+                return
+        request.user = api_settings.UNAUTHENTICATED_USER()
+        request.auth = None
+
+    def handle_exception(self, request, exc):
+        response = exception_handler(exc, {"request": request, "view": self})
+        if response is None:
+            raise exc
+        headers = {
+            name: value
+            for name, value in response.items()
+            if name.lower() != "content-type"
+        }
+        return json_response(
+            response.data, status=response.status_code, headers=headers
+        )
+
+
+class AsyncPostList(AsyncReadView):
+    pagination_class = ListSetPagination
+
+    @cache_anonymous_response("posts", "blogs", "comments")
+    async def get(self, request, *args, **kwargs):
+        queryset = PostList.filter_by_params(PostList.queryset, request.query_params)
+        paginator = self.pagination_class()
+        posts = await paginator.apaginate_queryset(
+            with_post_relations(queryset), request
+        )
+        version = await conditional.apage_version(
+            request, posts, conditional.POST_LIST_FIELDS, ("posts", "blogs", "comments")
+        )
+        not_modified = version.not_modified(request)
+        if not_modified:
+            return not_modified
+        posts = await sync_to_async(resolve_post_state)(posts, request.user)
+        serializer = PostSerializer(posts, many=True)
+        return version.apply(
+            json_response(paginator.get_paginated_response(serializer.data).data)
+        )
+
+
+class AsyncBlogPage(AsyncReadView):
+    @cache_anonymous_response("blogs")
+    async def get(self, request, *args, **kwargs):
+        version = await conditional.ablog_version(self.kwargs["slug"], request.user)
+        if version is None:
+            return json_response(None, status=status.HTTP_404_NOT_FOUND)
+        not_modified = version.not_modified(request)
+        if not_modified:
+            return not_modified
+        queryset = Blog.objects.select_related("owner").prefetch_related("authors")
+        try:
+            blog = await queryset.aget(slug=self.kwargs["slug"])
+        except Blog.DoesNotExist:
+            return json_response(None, status=status.HTTP_404_NOT_FOUND)
+
+        blog.subscriberList, views, _ = await asyncio.gather(
+            blog.subscribers.acount(),
+            blog.posts.aaggregate(views=Sum("views")),
+            sync_to_async(resolve_blog_state)([blog], request.user),
+        )
+        blog.views = views["views"] or 0
+        return version.apply(json_response(BlogSerializer(blog).data))
+
+
+class AsyncPostPage(AsyncReadView):
+    async def get(self, request, *args, **kwargs):
+        version = await conditional.apost_version(
+            self.kwargs["slug"], self.kwargs["post_id"], request.user
+        )
+        if version is None:
+            raise Http404
+        not_modified = version.not_modified(request)
+        if not_modified:
+            await sync_to_async(view_counter.add)(version.pk)
+            return not_modified
+        blog = await aget_object_or_404(Blog, slug=self.kwargs["slug"])
+        post = await aget_object_or_404(
+            with_post_relations(Post.objects.all()),
+            post_id=self.kwargs["post_id"],
+            blog=blog,
+        )
+
+        post.subscribers, _, views = await asyncio.gather(
+            blog.subscribers.acount(),
+            sync_to_async(resolve_post_state)([post], request.user),
+            sync_to_async(view_counter.add)(post.pk),
+        )
+        post.views += views
+        return version.apply(json_response(PostSerializer(post).data))
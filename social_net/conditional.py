@@ -0,0 +1,170 @@
+import hashlib
+
+from django.utils.http import http_date
+from rest_framework import status
+
+from . import response_cache
+from .models import Blog, Post
+
+
+def viewer_scope(user_id):
+    return f"viewer:{user_id}"
+
+
+def bump_viewers(*user_ids):
+    """
+    Invalidate the validators of responses personalized for these users:
+    call it when their likes or bookmarks change.
+    """
+    response_cache.bump(*(viewer_scope(user_id) for user_id in user_ids))
+
+
+def viewer_scopes(user, scopes=()):
+    if user.is_authenticated:
+        return [*scopes, viewer_scope(user.pk)]
+    return list(scopes)
+
+
+def make_etag(*parts):
+    # все валидаторы слабые: просмотры в них не входят
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode())
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+class Version:
+    """
+    Validators of a resource representation: a weak ETag and, when known,
+    Last-Modified. Only If-None-Match is evaluated: counters change without
+    touching updated_at, so If-Modified-Since could produce a stale 304.
+    """
+
+    def __init__(self, pk, etag, last_modified=None):
+        self.pk = pk
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def apply(self, response):
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in self.validators().items():
+                response[header] = value
+        return response
+
+    def validators(self):
+        validators = {"ETag": self.etag}
+        if self.last_modified is not None:
+            validators["Last-Modified"] = http_date(self.last_modified.timestamp())
+        return validators
+
+    def not_modified(self, request):
+        """304 when the client already has this version, None otherwise."""
+        return response_cache.not_modified(request, self.validators())
+
+
+BLOG_FIELDS = ("pk", "updated_at", "count_of_posts", "count_of_commentaries")
+POST_FIELDS = (
+    "pk",
+    "updated_at",
+    "likes",
+    "dislikes",
+    "comment_count",
+    "bookmark_count",
+    "blog__updated_at",
+)
+
+
+def _blog(row, user, versions):
+    return Version(row[0], make_etag("blog", *row, user.pk, *versions), row[1])
+
+
+def _post(row, user, versions):
+    # Last-Modified поста учитывает и изменения его блога
+    etag = make_etag("post", *row, user.pk, *versions)
+    return Version(row[0], etag, max(row[1], row[6]))
+
+
+def blog_version(slug, user):
+    """
+    Version of the blog page from one lookup by the unique slug, or None
+    when there is no such blog.
+    """
+    row = Blog.objects.filter(slug=slug).values_list(*BLOG_FIELDS).first()
+    if row is None:
+        return None
+    return _blog(row, user, response_cache.get_versions(viewer_scopes(user, ["blogs"])))
+
+
+async def ablog_version(slug, user):
+    row = await Blog.objects.filter(slug=slug).values_list(*BLOG_FIELDS).afirst()
+    if row is None:
+        return None
+    versions = await response_cache.aget_versions(viewer_scopes(user, ["blogs"]))
+    return _blog(row, user, versions)
+
+
+def post_version(slug, post_id, user):
+    """
+    Version of the post page from one lookup by (blog, post_id): the post,
+    its counters and its blog.
+    """
+    row = (
+        Post.objects.filter(blog_id=slug, post_id=post_id)
+        .values_list(*POST_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    return _post(row, user, response_cache.get_versions(viewer_scopes(user, ["blogs"])))
+
+
+async def apost_version(slug, post_id, user):
+    row = await (
+        Post.objects.filter(blog_id=slug, post_id=post_id)
+        .values_list(*POST_FIELDS)
+        .afirst()
+    )
+    if row is None:
+        return None
+    versions = await response_cache.aget_versions(viewer_scopes(user, ["blogs"]))
+    return _post(row, user, versions)
+
+
+# поля строк списков, от которых зависит их представление
+BLOG_LIST_FIELDS = (
+    "pk",
+    "updated_at",
+    "count_of_posts",
+    "count_of_commentaries",
+    "subscriberList",
+)
+POST_LIST_FIELDS = (
+    "pk",
+    "updated_at",
+    "likes",
+    "dislikes",
+    "comment_count",
+    "bookmark_count",
+)
+
+
+def _page(request, rows, fields, versions):
+    parts = [request.path, response_cache.normalize_query(request.query_params)]
+    for row in rows:
+        parts.extend(getattr(row, field) for field in fields)
+    last_modified = max((row.updated_at for row in rows), default=None)
+    etag = make_etag("page", *parts, request.user.pk, *versions)
+    return Version(None, etag, last_modified)
+
+
+def page_version(request, rows, fields, scopes):
+    """
+    Weak version of a list page: the query, the `fields` (updated_at and
+    counters) of its rows and the versions of the cache `scopes` it
+    depends on. Last-Modified is the latest updated_at on the page.
+    """
+    versions = response_cache.get_versions(viewer_scopes(request.user, scopes))
+    return _page(request, rows, fields, versions)
+
+
+async def apage_version(request, rows, fields, scopes):
+    versions = await response_cache.aget_versions(viewer_scopes(request.user, scopes))
+    return _page(request, rows, fields, versions)
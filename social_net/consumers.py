@@ -1,36 +1,87 @@
-# from .models import *
-# from .serializers import *
-# from djangochannelsrestframework.generics import GenericAsyncAPIConsumer
-#
-# import json
-#
-# from channels.generic.websocket import WebsocketConsumer
-#
-# class WSConsumer(WebsocketConsumer):
-#     def connect(self):
-#         self.accept()
-#
-#     def disconnect(self, close_code):
-#         pass
-#
-#     def receive(self, text_data):
-#         text_data_json = json.loads(text_data)
-#         message = text_data_json['message']
-#
-#         self.send(text_data=json.dumps({
-#             'message': f'Hello, you sent -> {message}'
-#         }))
-#
-#
-# class BlogSubscribeConsumer(WebsocketConsumer):
-#     async def connect(self):
-#         await self.accept()
-#
-#     async def disconnect(self, close_code):
-#         pass
-#
-#     async def receive(self, text_data):
-#         data = json.loads(text_data)
-#         await self.send(text_data=json.dumps({
-#             'message': 'Вы подписались!'
-#         }))
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+
+from authentication.backends import CachedTokenAuthentication
+from .realtime import post_group, user_group
+from .roles import can_view_post
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates a WebSocket by ?token=<DRF token>, since browsers cannot
+    set the Authorization header on a WebSocket handshake. Without a token
+    the user set by the session middleware is kept.
+    """
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token")
+        if token:
+            scope = dict(scope, user=await self.get_user(token[0]))
+        return await super().__call__(scope, receive, send)
+
+    @database_sync_to_async
+    def get_user(self, key):
+        try:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+        except AuthenticationFailed:
+            return AnonymousUser()
+        return user
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes the user's new notifications and invites, and the counters of the
+    posts the client subscribed to with {"action": "subscribe", "post": id}
+    (only posts the user may see, so drafts stay private). Groups in
+    self.groups are left by the base class on disconnect.
+    """
+
+    max_post_subscriptions = 50
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.groups = [user_group(user.pk)]
+        await self.channel_layer.group_add(self.groups[0], self.channel_name)
+        await self.accept()
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get("action") if isinstance(content, dict) else None
+        if action not in ("subscribe", "unsubscribe"):
+            await self.send_json({"type": "error", "data": "Unknown action"})
+            return
+        try:
+            post_id = int(content.get("post"))
+        except (TypeError, ValueError):
+            await self.send_json({"type": "error", "data": "Invalid post"})
+            return
+        group = post_group(post_id)
+
+        if action == "subscribe" and group not in self.groups:
+            if len(self.groups) > self.max_post_subscriptions:
+                await self.send_json({"type": "error", "data": "Too many posts"})
+                return
+            # черновики и несуществующие посты отвечают одинаково
+            if not await self.can_view(post_id):
+                await self.send_json({"type": "error", "data": "Post not found"})
+                return
+            self.groups.append(group)
+            await self.channel_layer.group_add(group, self.channel_name)
+        elif action == "unsubscribe" and group in self.groups[1:]:
+            self.groups.remove(group)
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    @database_sync_to_async
+    def can_view(self, post_id):
+        return can_view_post(self.scope["user"], post_id)
+
+    async def push(self, event):
+        await self.send_json({"type": event["event"], "data": event["data"]})
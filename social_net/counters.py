@@ -0,0 +1,133 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from .conditional import bump_viewers
+from .models import Post
+from .realtime import post_group, push
+
+COUNTER_FIELDS = ("likes", "dislikes", "comment_count", "bookmark_count", "views")
+
+REACTIONS = {
+    "like": ("liked_users", "likes"),
+    "dislike": ("disliked_users", "dislikes"),
+}
+
+
+def update_counters(post_id, **deltas):
+    """
+    Atomically shift Post counters in a single UPDATE, e.g.
+    update_counters(post.pk, likes=1, dislikes=-1). Subscribed WebSocket
+    clients get the deltas once the transaction commits.
+    """
+    changes = {}
+    for field, delta in deltas.items():
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown post counter: {field}")
+        if delta:
+            changes[field] = F(field) + delta
+    if not changes:
+        return 0
+    updated = Post.objects.filter(pk=post_id).update(**changes)
+    if updated:
+        push(post_group(post_id), "post.counters", {"post": post_id, **deltas})
+    return updated
+
+
+def shift_counters(field, deltas):
+    """
+    Shift one Post counter by a different delta per post, {post pk: delta},
+    with one UPDATE per distinct delta instead of one per post.
+    """
+    if field not in COUNTER_FIELDS:
+        raise ValueError(f"Unknown post counter: {field}")
+    by_delta = defaultdict(list)
+    for post_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(post_id)
+    for delta, post_ids in by_delta.items():
+        Post.objects.filter(pk__in=post_ids).update(**{field: F(field) + delta})
+        for post_id in post_ids:
+            push(post_group(post_id), "post.counters", {"post": post_id, field: delta})
+
+
+def _toggle_relation(through, post_id, user_id, user_field="userprofile_id"):
+    lookup = {"post_id": post_id, user_field: user_id}
+    removed, _ = through.objects.filter(**lookup).delete()
+    if removed:
+        return -1
+    _, created = through.objects.get_or_create(**lookup)
+    return 1 if created else 0
+
+
+@transaction.atomic
+def toggle_reaction(post, user, reaction):
+    opposite = "dislike" if reaction == "like" else "like"
+    deltas = {}
+
+    relation, field = REACTIONS[opposite]
+    through = getattr(Post, relation).through
+    removed, _ = through.objects.filter(
+        post_id=post.pk, userprofile_id=user.pk
+    ).delete()
+    if removed:
+        deltas[field] = -1
+
+    relation, field = REACTIONS[reaction]
+    through = getattr(Post, relation).through
+    deltas[field] = _toggle_relation(through, post.pk, user.pk)
+
+    update_counters(post.pk, **deltas)
+    bump_viewers(user.pk)
+    return deltas[field] > 0
+
+
+@transaction.atomic
+def toggle_bookmark(post, user):
+    delta = _toggle_relation(UserProfile.bookmarks.through, post.pk, user.pk)
+    update_counters(post.pk, bookmark_count=delta)
+    bump_viewers(user.pk)
+    return delta > 0
+
+
+def _relation_count(through):
+    return Coalesce(
+        Subquery(
+            through.objects.filter(post_id=OuterRef("pk"))
+            .values("post_id")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def counter_sources():
+    return {
+        "likes": _relation_count(Post.liked_users.through),
+        "dislikes": _relation_count(Post.disliked_users.through),
+        "comment_count": _relation_count(Commentary),
+        "bookmark_count": _relation_count(UserProfile.bookmarks.through),
+    }
+
+
+def reconcile_counters(queryset=None, fields=None):
+    """
+    Recompute denormalized counters from their source tables. Only rows whose
+    stored value drifted are rewritten; returns {field: rows_fixed}.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    sources = counter_sources()
+    fixed = {}
+    for field in fields or sources:
+        actual = sources[field]
+        drifted = queryset.annotate(actual=actual).exclude(**{field: F("actual")})
+        fixed[field] = Post.objects.filter(pk__in=drifted.values("pk")).update(
+            **{field: actual}
+        )
+    return fixed
@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.db.models import Q
+
+from authentication.models import UserProfile
+from .models import Blog, FeedEntry, Post
+
+FEED_FANOUT_LIMIT = getattr(settings, "FEED_FANOUT_LIMIT", 5000)
+FEED_BACKFILL = getattr(settings, "FEED_BACKFILL", 20)
+FEED_BATCH_SIZE = 1000
+
+Subscription = UserProfile.subscriptions.through
+
+
+def _entry(user_id, post):
+    return FeedEntry(
+        user_id=user_id,
+        post_id=post.pk,
+        blog_id=post.blog_id,
+        created_at=post.created_at,
+    )
+
+
+def fan_out(post):
+    """
+    Push a published post into the feeds of its blog's subscribers. Blogs
+    with more than FEED_FANOUT_LIMIT subscribers are switched to
+    feed_on_read once and from then on are merged into feeds at read time.
+    """
+    blog = Blog.objects.filter(slug=post.blog_id).values("pk", "feed_on_read").first()
+    if blog is None or blog["feed_on_read"]:
+        return 0
+    subscribers = Subscription.objects.filter(blog_id=blog["pk"])
+    if subscribers.count() > FEED_FANOUT_LIMIT:
+        Blog.objects.filter(pk=blog["pk"]).update(feed_on_read=True)
+        return 0
+
+    user_ids = subscribers.order_by("userprofile_id").values_list(
+        "userprofile_id", flat=True
+    )
+    created = 0
+    last_id = 0
+    while True:
+        batch = list(user_ids.filter(userprofile_id__gt=last_id)[:FEED_BATCH_SIZE])
+        if not batch:
+            return created
+        FeedEntry.objects.bulk_create(
+            [_entry(user_id, post) for user_id in batch], ignore_conflicts=True
+        )
+        created += len(batch)
+        last_id = batch[-1]
+
+
+def retract(post):
+    return FeedEntry.objects.filter(post=post).delete()[0]
+
+
+def retract_many(post_ids):
+    return FeedEntry.objects.filter(post_id__in=post_ids).delete()[0]
+
+
+def backfill(user_ids, blog_ids):
+    """
+    Copy the latest FEED_BACKFILL posts of newly subscribed blogs into the
+    subscribers' feeds.
+    """
+    blogs = Blog.objects.filter(pk__in=blog_ids, feed_on_read=False)
+    entries = []
+    for slug in blogs.values_list("slug", flat=True):
+        posts = Post.objects.filter(blog_id=slug, is_published=True).order_by(
+            "-created_at"
+        )[:FEED_BACKFILL]
+        for post in posts.only("pk", "blog_id", "created_at"):
+            entries.extend(_entry(user_id, post) for user_id in user_ids)
+    FeedEntry.objects.bulk_create(
+        entries, ignore_conflicts=True, batch_size=FEED_BATCH_SIZE
+    )
+    return len(entries)
+
+
+def drop(user_ids=None, blog_ids=None):
+    entries = FeedEntry.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    if blog_ids is not None:
+        entries = entries.filter(
+            blog_id__in=Blog.objects.filter(pk__in=blog_ids).values("slug")
+        )
+    return entries.delete()[0]
+
+
+def _before(created_at, post_id, id_field):
+    return Q(created_at__lt=created_at) | Q(
+        created_at=created_at, **{f"{id_field}__lt": post_id}
+    )
+
+
+def _pulled_blogs(user):
+    return Blog.objects.filter(subscribers=user, feed_on_read=True).values("slug")
+
+
+def feed_posts(user, queryset):
+    """
+    The user's feed as a queryset of posts, newest first, for page-number
+    pagination: the same items feed_slice returns, with COUNT and OFFSET.
+    """
+    return queryset.filter(
+        Q(pk__in=FeedEntry.objects.filter(user=user).values("post_id"))
+        | Q(blog__in=_pulled_blogs(user), is_published=True)
+    ).order_by("-created_at", "-id")
+
+
+def feed_slice(user, limit, after=None):
+    """
+    (created_at, post_id) of the user's next `limit` feed items after the
+    given position, newest first: precomputed entries merged with the posts
+    of subscribed feed_on_read blogs.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    pulled = Post.objects.filter(blog__in=_pulled_blogs(user), is_published=True)
+    if after is not None:
+        entries = entries.filter(_before(*after, "post_id"))
+        pulled = pulled.filter(_before(*after, "id"))
+
+    rows = set(
+        entries.order_by("-created_at", "-post_id").values_list(
+            "created_at", "post_id"
+        )[:limit]
+    )
+    rows.update(
+        pulled.order_by("-created_at", "-id").values_list("created_at", "id")[:limit]
+    )
+    return sorted(rows, reverse=True)[:limit]
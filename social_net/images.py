@@ -0,0 +1,172 @@
+import io
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import response_cache, storage
+
+logger = logging.getLogger(__name__)
+
+# имя варианта -> наибольшая сторона в пикселях; все варианты сохраняются в WebP
+IMAGE_VARIANTS = getattr(
+    settings, "IMAGE_VARIANTS", {"small": 200, "medium": 800, "large": 2048}
+)
+IMAGE_VARIANTS_QUALITY = getattr(settings, "IMAGE_VARIANTS_QUALITY", 80)
+IMAGE_VARIANTS_DIR = "variants"
+
+# модель -> {поле с оригиналом: поле с вариантами} и области кэша ответов,
+# в которых эти картинки отдаются
+IMAGE_FIELDS = {
+    "social_net.PostImage": ({"image": "variants"}, ("posts",)),
+    "social_net.Blog": (
+        {"avatar": "avatar_variants", "banner": "banner_variants"},
+        ("blogs", "posts"),
+    ),
+    "authentication.UserProfile": (
+        {"avatar": "avatar_variants", "banner": "banner_variants"},
+        ("blogs", "posts", "comments"),
+    ),
+}
+
+
+def stale_fields(instance):
+    """
+    Image fields of `instance` whose variants were built from another file
+    (or not built yet).
+    """
+    fields, _ = IMAGE_FIELDS[instance._meta.label]
+    return [
+        field
+        for field, variants_field in fields.items()
+        if (getattr(instance, field).name or None)
+        != getattr(instance, variants_field).get("source")
+    ]
+
+
+def _open(field_file):
+    field_file.open("rb")
+    try:
+        image = Image.open(field_file)
+        image.load()
+    finally:
+        field_file.close()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _save_variant(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=IMAGE_VARIANTS_QUALITY, method=4)
+    # хранилище само раскладывает файлы по хэшу содержимого
+    return default_storage.save(
+        f"{IMAGE_VARIANTS_DIR}/variant.webp", ContentFile(buffer.getvalue())
+    )
+
+
+def make_variants(field_file):
+    """
+    Downscaled WebP copies of an uploaded image, one per IMAGE_VARIANTS
+    entry. Images are never upscaled, so for a small original several
+    variants share one file.
+    """
+    original = _open(field_file)
+    variants = {"source": field_file.name}
+    for variant, side in sorted(IMAGE_VARIANTS.items(), key=lambda item: item[1]):
+        image = original.copy()
+        image.thumbnail((side, side), Image.LANCZOS)
+        variants[variant] = {
+            "name": _save_variant(image),
+            "width": image.width,
+            "height": image.height,
+        }
+    return variants
+
+
+def build_variants(label, pk, field):
+    """
+    Build the variants of `field` for the row `pk` of model `label`. The
+    result is written with UPDATE, so no save signals fire; the response
+    cache is invalidated explicitly.
+    """
+    fields, scopes = IMAGE_FIELDS[label]
+    variants_field = fields[field]
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field)
+    previous = getattr(instance, variants_field)
+    if (field_file.name or None) == previous.get("source"):
+        return
+
+    if not field_file:
+        variants = {}
+    else:
+        try:
+            variants = make_variants(field_file)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # битый файл не станет лучше от повторов - запоминаем и выходим
+            logger.warning(
+                "Cannot build variants of %s", field_file.name, exc_info=True
+            )
+            variants = {"source": field_file.name}
+
+    # клиенты, которые не прислали уменьшенную копию сами, получают
+    # сгенерированную, и она меняется вместе с оригиналом
+    changes = {}
+    small_field = f"{field}_small"
+    if hasattr(instance, small_field):
+        small = getattr(instance, small_field)
+        if not small or small.name == previous.get("small", {}).get("name"):
+            changes[small_field] = variants.get("small", {}).get("name")
+
+    # файл могли заменить, пока задача ждала в очереди
+    queryset = model.objects.filter(pk=pk)
+    if field_file:
+        queryset = queryset.filter(**{field: field_file.name})
+    else:
+        queryset = queryset.filter(Q(**{f"{field}__isnull": True}) | Q(**{field: ""}))
+    if queryset.update(**{variants_field: variants}, **changes):
+        # UPDATE не отправляет сигналы: ссылки на файлы учитываются здесь
+        old_files = storage.references(instance)
+        setattr(instance, variants_field, variants)
+        for name, value in changes.items():
+            setattr(instance, name, value)
+        new_files = storage.references(instance)
+        storage.retain(new_files - old_files)
+        storage.release(old_files - new_files)
+        if label == "social_net.PostImage":
+            # новые копии меняют представление поста, а с ним и его ETag
+            Post = apps.get_model("social_net.Post")
+            Post.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+        response_cache.bump(*scopes)
+
+
+def variant_urls(variants, request=None):
+    """
+    {"srcset": "<url> 200w, <url> 800w", "small": "<url>", ...} for the
+    stored variants, or None when there are none yet.
+    """
+    urls = {}
+    widths = {}
+    for variant, data in variants.items():
+        if variant == "source":
+            continue
+        url = default_storage.url(data["name"])
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        urls[variant] = url
+        widths[url] = data["width"]
+    if not urls:
+        return None
+    srcset = sorted(widths.items(), key=lambda item: item[1])
+    return {"srcset": ", ".join(f"{url} {width}w" for url, width in srcset), **urls}
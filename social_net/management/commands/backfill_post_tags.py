@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_net.models import Post, PostTag
+from social_net.tags import get_or_create_tags, parse_tags, refresh_tag_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит строки Post.tags в индекс тэгов (Tag <-> Post) пачками "
+        "и пересчитывает счётчики тэгов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Постов в одной пачке"
+        )
+        parser.add_argument("--blog", help="Slug блога, посты которого перенести")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Post.objects.only("pk", "blog_id", "tags").order_by("pk")
+        if options["blog"]:
+            queryset = queryset.filter(blog__slug=options["blog"])
+
+        last_pk = 0
+        processed = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            self.index_batch(batch)
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            self.stdout.write(f"{processed} posts indexed")
+
+        tags = refresh_tag_counters()
+        self.stdout.write(f"{tags} tag counters refreshed")
+
+    @transaction.atomic
+    def index_batch(self, posts):
+        names = {post.pk: parse_tags(post.tags) for post in posts}
+        tag_ids = get_or_create_tags(
+            sorted({name for post_names in names.values() for name in post_names})
+        )
+        PostTag.objects.filter(post__in=posts).delete()
+        PostTag.objects.bulk_create(
+            [
+                PostTag(post=post, tag_id=tag_ids[name], blog_id=post.blog_id)
+                for post in posts
+                for name in names[post.pk]
+            ]
+        )
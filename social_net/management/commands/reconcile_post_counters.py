@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from social_net.counters import counter_sources, reconcile_counters
+from social_net.models import Post
+from social_net.tasks import reconcile_post_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованные счётчики постов по исходным таблицам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--field",
+            action="append",
+            dest="fields",
+            help="Счётчик для пересчёта (можно указать несколько раз)",
+        )
+        parser.add_argument("--blog", help="Slug блога, посты которого пересчитать")
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Поставить пересчёт в очередь фоновых задач вместо выполнения",
+        )
+
+    def handle(self, *args, **options):
+        fields = options["fields"]
+        unknown = set(fields or ()) - set(counter_sources())
+        if unknown:
+            raise CommandError(f"Unknown counters: {', '.join(sorted(unknown))}")
+
+        if options["enqueue"]:
+            reconcile_post_counters.enqueue(fields=fields, blog=options["blog"])
+            self.stdout.write("Reconciliation queued")
+            return
+
+        queryset = Post.objects.all()
+        if options["blog"]:
+            queryset = queryset.filter(blog__slug=options["blog"])
+
+        fixed = reconcile_counters(queryset, fields)
+        for field, count in fixed.items():
+            self.stdout.write(f"{field}: {count} fixed")
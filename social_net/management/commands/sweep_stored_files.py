@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from social_net.storage import MEDIA_SWEEP_DELAY, sweep
+
+
+class Command(BaseCommand):
+    help = "Удаляет из хранилища файлы, на которые не ссылается ни одна запись"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=MEDIA_SWEEP_DELAY,
+            help="Не трогать файлы, загруженные меньше стольких секунд назад",
+        )
+
+    def handle(self, *args, **options):
+        deleted = sweep(grace=options["grace"])
+        self.stdout.write(f"{deleted} files deleted")
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model("social_net", "Post")
+    Commentary = apps.get_model("comments", "Commentary")
+    UserProfile = apps.get_model("authentication", "UserProfile")
+    Bookmark = UserProfile.bookmarks.through
+
+    comments = (
+        Commentary.objects.filter(post=OuterRef("pk"))
+        .values("post")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    bookmarks = (
+        Bookmark.objects.filter(post=OuterRef("pk"))
+        .values("post")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Post.objects.update(
+        comment_count=Coalesce(Subquery(comments), 0),
+        bookmark_count=Coalesce(Subquery(bookmarks), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0013_alter_userprofile_avatar_and_more"),
+        ("comments", "0001_initial"),
+        ("social_net", "0083_delete_commentary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="bookmark_count",
+            field=models.IntegerField(default=0, verbose_name="Счётчик закладок"),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.IntegerField(default=0, verbose_name="Счётчик комментариев"),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
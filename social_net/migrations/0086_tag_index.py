@@ -0,0 +1,84 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0085_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="blog_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Кол-во блогов"),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Кол-во постов"),
+        ),
+        migrations.CreateModel(
+            name="PostTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "blog",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_links",
+                        to="social_net.blog",
+                        to_field="slug",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_links",
+                        to="social_net.post",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_links",
+                        to="social_net.tag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="hashtags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="posts",
+                through="social_net.PostTag",
+                to="social_net.tag",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="posttag",
+            index=models.Index(fields=["tag", "blog"], name="post_tag_blog_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="posttag",
+            constraint=models.UniqueConstraint(
+                fields=("tag", "post"), name="unique_post_tag"
+            ),
+        ),
+    ]
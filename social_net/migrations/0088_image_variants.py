@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0087_feed_entry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="avatar_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии аватара",
+            ),
+        ),
+        migrations.AddField(
+            model_name="blog",
+            name="banner_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии баннера",
+            ),
+        ),
+        migrations.AddField(
+            model_name="postimage",
+            name="variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии",
+            ),
+        ),
+    ]
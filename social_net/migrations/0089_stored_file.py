@@ -0,0 +1,62 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0088_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Путь в хранилище"
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Размер, байт"
+                    ),
+                ),
+                (
+                    "refs",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Сколько записей ссылаются на файл",
+                        verbose_name="Кол-во ссылок",
+                    ),
+                ),
+                (
+                    "uploaded_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Дата последней загрузки"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("refs__lte", 0)),
+                        fields=["uploaded_at"],
+                        name="stored_file_unused_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+
+def touch_blogs(apps, schema_editor):
+    # раньше updated_at сдвигался только при первой публикации поста
+    Blog = apps.get_model("social_net", "Blog")
+    Post = apps.get_model("social_net", "Post")
+    last_post = (
+        Post.objects.filter(blog_id=models.OuterRef("slug"))
+        .order_by("-updated_at")
+        .values("updated_at")[:1]
+    )
+    Blog.objects.update(
+        updated_at=Greatest(
+            "updated_at", Coalesce(models.Subquery(last_post), "updated_at")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0090_post_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="blog",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Дата последнего обновления"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blog",
+            index=models.Index(
+                fields=["-updated_at", "-id"], name="blog_updated_at_idx"
+            ),
+        ),
+        migrations.RunPython(touch_blogs, migrations.RunPython.noop),
+    ]
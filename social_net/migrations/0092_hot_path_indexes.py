@@ -0,0 +1,55 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def renumber_duplicate_posts(apps, schema_editor):
+    # post_id выдавался без блокировки, и параллельные запросы могли получить
+    # один номер: у повторов он заменяется на следующий свободный номер блога
+    Blog = apps.get_model("social_net", "Blog")
+    Post = apps.get_model("social_net", "Post")
+    duplicates = (
+        Post.objects.exclude(post_id=None)
+        .values("blog_id", "post_id")
+        .annotate(rows=Count("pk"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        blog = Blog.objects.get(slug=duplicate["blog_id"])
+        last = Post.objects.filter(blog_id=blog.slug).aggregate(last=Max("post_id"))
+        next_id = max(last["last"], blog.count_of_posts)
+        extra = Post.objects.filter(
+            blog_id=blog.slug, post_id=duplicate["post_id"]
+        ).order_by("pk")[1:]
+        for post in extra:
+            next_id += 1
+            Post.objects.filter(pk=post.pk).update(post_id=next_id)
+        Blog.objects.filter(pk=blog.pk).update(count_of_posts=next_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0091_blog_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-created_at", "-id"],
+                name="post_published_idx",
+            ),
+        ),
+        migrations.RunPython(renumber_duplicate_posts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="post",
+            constraint=models.UniqueConstraint(
+                fields=("blog", "post_id"), name="unique_blog_post_id"
+            ),
+        ),
+    ]
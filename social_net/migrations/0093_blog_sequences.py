@@ -0,0 +1,60 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:41
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+
+def start_sequences(apps, schema_editor):
+    # раньше номера выдавались из счётчиков: продолжаем с большего из
+    # счётчика и уже занятых номеров
+    Blog = apps.get_model("social_net", "Blog")
+    Post = apps.get_model("social_net", "Post")
+    Commentary = apps.get_model("comments", "Commentary")
+    max_post_id = (
+        Post.objects.filter(blog_id=models.OuterRef("slug"))
+        .values("blog_id")
+        .annotate(value=models.Max("post_id"))
+        .values("value")
+    )
+    max_comment_id = (
+        Commentary.objects.filter(post__blog_id=models.OuterRef("slug"))
+        .values("post__blog_id")
+        .annotate(value=models.Max("comment_id"))
+        .values("value")
+    )
+    Blog.objects.update(
+        last_post_id=Greatest(
+            "count_of_posts", Coalesce(models.Subquery(max_post_id), 0)
+        ),
+        last_comment_id=Greatest(
+            "count_of_commentaries", Coalesce(models.Subquery(max_comment_id), 0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0092_hot_path_indexes"),
+        ("comments", "0004_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="last_comment_id",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name="Последний выданный номер комментария",
+            ),
+        ),
+        migrations.AddField(
+            model_name="blog",
+            name="last_post_id",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Последний выданный номер поста"
+            ),
+        ),
+        migrations.RunPython(start_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_feeds(apps, schema_editor):
+    # ленты до 0087 собирались запросом по подпискам: раскладываем по ним
+    # все опубликованные посты, чтобы после перехода ничего не пропало
+    app_label, model_name = settings.AUTH_USER_MODEL.split(".")
+    Subscription = apps.get_model(app_label, model_name).subscriptions.through
+    Blog = apps.get_model("social_net", "Blog")
+    Post = apps.get_model("social_net", "Post")
+    FeedEntry = apps.get_model("social_net", "FeedEntry")
+    fanout_limit = getattr(settings, "FEED_FANOUT_LIMIT", 5000)
+
+    blogs = Blog.objects.filter(feed_on_read=False).order_by("pk")
+    for blog_pk, slug in blogs.values_list("pk", "slug").iterator():
+        user_ids = list(
+            Subscription.objects.filter(blog_id=blog_pk).values_list(
+                "userprofile_id", flat=True
+            )
+        )
+        if not user_ids:
+            continue
+        # такие блоги подмешиваются в ленты при чтении, как и после fan_out
+        if len(user_ids) > fanout_limit:
+            Blog.objects.filter(pk=blog_pk).update(feed_on_read=True)
+            continue
+
+        posts = Post.objects.filter(blog_id=slug, is_published=True).order_by("pk")
+        entries = []
+        for post_pk, created_at in posts.values_list("pk", "created_at").iterator():
+            entries.extend(
+                FeedEntry(
+                    user_id=user_id,
+                    post_id=post_pk,
+                    blog_id=slug,
+                    created_at=created_at,
+                )
+                for user_id in user_ids
+            )
+            if len(entries) >= BATCH_SIZE:
+                FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+                entries = []
+        FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_net", "0093_blog_sequences"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
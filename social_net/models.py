@@ -1,6 +1,7 @@
-import datetime
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from authentication.models import UserProfile
+from search.managers import SearchableManager
 
 
 class Blog(models.Model):
@@ -16,13 +17,19 @@ class Blog(models.Model):
     banner_small = models.ImageField(
         upload_to="blog/banners/small/", null=True, blank=True
     )
+    avatar_variants = models.JSONField(
+        "Уменьшенные копии аватара", default=dict, blank=True, editable=False
+    )
+    banner_variants = models.JSONField(
+        "Уменьшенные копии баннера", default=dict, blank=True, editable=False
+    )
     title = models.CharField("Заголовок", max_length=255)
     email = models.CharField("Email", max_length=255, blank=True)
     phone_number = models.CharField("Номер телефона", max_length=255, blank=True)
     description = models.TextField("Тематика", null=True, blank=True)
     slug = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField("Дата создания", auto_now_add=True)
-    updated_at = models.DateTimeField("Дата последнего обновления", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата последнего обновления", auto_now=True)
     owner = models.ForeignKey(
         UserProfile, related_name="blogs", on_delete=models.CASCADE
     )
@@ -31,19 +38,70 @@ class Blog(models.Model):
     count_of_commentaries = models.PositiveIntegerField(
         "Кол-во комментариев блога", default=0
     )
+    # последовательности номеров постов и комментариев блога: выдаются
+    # social_net.sequences и не зависят от счётчиков выше
+    last_post_id = models.PositiveIntegerField(
+        "Последний выданный номер поста", default=0, editable=False
+    )
+    last_comment_id = models.PositiveIntegerField(
+        "Последний выданный номер комментария", default=0, editable=False
+    )
     authors = models.ManyToManyField(UserProfile, related_name="blog_list", blank=True)
     vk_link = models.CharField("Ссылка на ВК", max_length=255, blank=True)
     telegram_link = models.CharField("Ссылка на Telegram", max_length=255, blank=True)
     youtube_link = models.CharField("Ссылка на YouTube", max_length=255, blank=True)
     dzen_link = models.CharField("Ссылка на Дзен", max_length=255, blank=True)
     site_link = models.CharField("Cсылка на свой сайт", max_length=255, blank=True)
+    search_vector = SearchVectorField("Поисковый вектор", null=True, editable=False)
+    feed_on_read = models.BooleanField(
+        "Лента собирается при чтении",
+        default=False,
+        help_text="Слишком много подписчиков для рассылки постов по лентам",
+    )
+
+    objects = SearchableManager()
+
+    # меняются только атомарными UPDATE (social_net.sequences, сигналы):
+    # полное сохранение экземпляра, загруженного раньше, их не перезаписывает
+    SEQUENCE_FIELDS = (
+        "count_of_posts",
+        "count_of_commentaries",
+        "last_post_id",
+        "last_comment_id",
+    )
+
+    class Meta:
+        # порядок каталога блогов (-updated_at, -id) и фильтры before/after
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="blog_updated_at_idx")
+        ]
 
     def __str__(self):
         return self.slug
 
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            # отложенные поля не пишутся, как и в обычном save()
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.SEQUENCE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Tag(models.Model):
     name = models.CharField("Имя", unique=True, max_length=255, blank=True)
+    post_count = models.PositiveIntegerField("Кол-во постов", default=0)
+    blog_count = models.PositiveIntegerField("Кол-во блогов", default=0)
 
     def __str__(self):
         return self.name
@@ -61,6 +119,7 @@ class Post(models.Model):
     post_id = models.PositiveIntegerField("ID поста", null=True)
     body = models.TextField("Тело поста")
     created_at = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата последнего изменения", auto_now=True)
     likes = models.IntegerField("Счётчик оценок", default=0)
     liked_users = models.ManyToManyField(
         "authentication.UserProfile", related_name="alex", blank=True
@@ -70,10 +129,15 @@ class Post(models.Model):
         "authentication.UserProfile", related_name="disliked", blank=True
     )
     views = models.IntegerField("Счётчик просмотров", default=0)
+    comment_count = models.IntegerField("Счётчик комментариев", default=0)
+    bookmark_count = models.IntegerField("Счётчик закладок", default=0)
     blog = models.ForeignKey(
         Blog, to_field="slug", related_name="posts", on_delete=models.CASCADE
     )
     tags = models.TextField("Тэги", null=True)
+    hashtags = models.ManyToManyField(
+        Tag, through="PostTag", related_name="posts", blank=True
+    )
     map_type = models.CharField(
         "Тип карты", max_length=50, choices=MAP_TYPES, default="null"
     )
@@ -82,22 +146,108 @@ class Post(models.Model):
     is_published = models.BooleanField("Опубликован ли", default=False)
     author_is_hidden = models.BooleanField("Автор скрыт", default=False)
     comments_allowed = models.BooleanField("Разрешены ли комментарии", default=True)
+    search_vector = SearchVectorField("Поисковый вектор", null=True, editable=False)
+
+    objects = SearchableManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["blog", "post_id"], name="unique_blog_post_id"
+            )
+        ]
+        indexes = [
+            # общая лента опубликованных постов (PostList)
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="post_published_idx",
+            )
+        ]
 
     def __str__(self):
         return str(self.title)
 
-    def save(self, *args, **kwargs):
-        if self.is_published:
-            if self.created_at is None:
-                self.created_at = datetime.datetime.now()
-                self.blog.updated_at = self.created_at
-                self.blog.save()
-        super(Post, self).save(*args, **kwargs)
+
+class PostTag(models.Model):
+    post = models.ForeignKey(Post, related_name="tag_links", on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, related_name="post_links", on_delete=models.CASCADE)
+    blog = models.ForeignKey(
+        Blog,
+        to_field="slug",
+        related_name="tag_links",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "post"], name="unique_post_tag")
+        ]
+        indexes = [models.Index(fields=["tag", "blog"], name="post_tag_blog_idx")]
+
+    def __str__(self):
+        return f"{self.tag_id}:{self.post_id}"
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        UserProfile, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    blog = models.ForeignKey(
+        Blog,
+        to_field="slug",
+        related_name="feed_entries",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    created_at = models.DateTimeField("Дата публикации поста")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_feed_entry")
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-post"], name="feed_entry_order_idx"
+            ),
+            models.Index(fields=["user", "blog"], name="feed_entry_blog_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.post_id}"
 
 
 class PostImage(models.Model):
     post = models.ForeignKey(Post, related_name="images", on_delete=models.CASCADE)
     image = models.ImageField(upload_to="post_images/", null=True, blank=True)
+    variants = models.JSONField(
+        "Уменьшенные копии", default=dict, blank=True, editable=False
+    )
 
     def __str__(self):
         return str(self.image)
+
+
+class StoredFile(models.Model):
+    name = models.CharField("Путь в хранилище", max_length=255, unique=True)
+    size = models.PositiveBigIntegerField("Размер, байт", default=0)
+    refs = models.IntegerField(
+        "Кол-во ссылок", default=0, help_text="Сколько записей ссылаются на файл"
+    )
+    uploaded_at = models.DateTimeField("Дата последней загрузки", auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["uploaded_at"],
+                condition=models.Q(refs__lte=0),
+                name="stored_file_unused_idx",
+            )
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,146 @@
+from django.db import transaction
+from django.utils import timezone
+
+from comments.models import Commentary
+from comments.signals import batched_comment_counters
+from comments.tree import PATH_SEPARATOR
+from . import feed, response_cache
+from .models import Post, PostTag
+from .signals import bulk_post_delete, touch_blogs
+from .tags import refresh_tag_counters
+from .tasks import fan_out_post
+
+# результат по каждому запрошенному номеру
+DELETED = "deleted"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+POST_ACTIONS = {
+    "publish": ("is_published", True),
+    "unpublish": ("is_published", False),
+    "pin": ("is_pinned", True),
+    "unpin": ("is_pinned", False),
+}
+COMMENT_ACTIONS = {
+    "hide": ("is_hidden", True),
+    "unhide": ("is_hidden", False),
+}
+
+
+def _results(ids, found, changed, done):
+    return {
+        id: done if id in changed else UNCHANGED if id in found else NOT_FOUND
+        for id in ids
+    }
+
+
+def _set_flag(queryset, number_field, numbers, field, value, **extra):
+    """
+    Set `field` to `value` on the rows of `queryset` numbered `numbers` with
+    one locking SELECT and one UPDATE. Returns ({number: pk} of the rows
+    found, {number: pk} of those changed).
+    """
+    rows = list(
+        queryset.select_for_update(of=("self",))
+        .filter(**{f"{number_field}__in": numbers})
+        .values_list(number_field, "pk", field)
+    )
+    found = {number: pk for number, pk, _ in rows}
+    changed = {number: pk for number, pk, current in rows if current != value}
+    if changed:
+        queryset.model.objects.filter(pk__in=changed.values()).update(
+            **{field: value}, **extra
+        )
+    return found, changed
+
+
+def delete_posts(blog, post_ids):
+    """
+    Delete the blog's posts numbered `post_ids`. Tag counters and the blog
+    are updated once for all of them rather than once per post.
+    """
+    with transaction.atomic():
+        found = dict(
+            Post.objects.filter(blog=blog, post_id__in=post_ids).values_list(
+                "post_id", "pk"
+            )
+        )
+        if found:
+            tag_ids = list(
+                PostTag.objects.filter(post_id__in=found.values())
+                .values_list("tag_id", flat=True)
+                .distinct()
+            )
+            with bulk_post_delete():
+                Post.objects.filter(pk__in=found.values()).delete()
+            if tag_ids:
+                refresh_tag_counters(tag_ids)
+            touch_blogs(slug=blog.slug)
+    return _results(post_ids, found, found, DELETED)
+
+
+def moderate_posts(blog, post_ids, action):
+    """Publish, unpublish, pin or unpin the blog's posts numbered `post_ids`."""
+    field, value = POST_ACTIONS[action]
+    with transaction.atomic():
+        found, changed = _set_flag(
+            Post.objects.filter(blog=blog),
+            "post_id",
+            post_ids,
+            field,
+            value,
+            updated_at=timezone.now(),
+        )
+        if changed:
+            if field == "is_published" and value:
+                fan_out_post.enqueue_many([{"post_id": pk} for pk in changed.values()])
+            elif field == "is_published":
+                feed.retract_many(changed.values())
+            touch_blogs(slug=blog.slug)
+            # UPDATE не отправляет post_save
+            response_cache.bump("posts")
+    return _results(post_ids, found, changed, UPDATED)
+
+
+def delete_comments(blog, comment_ids):
+    """
+    Delete the blog's comments numbered `comment_ids` with their replies.
+    Comment counters of the posts and reply counters of the surviving
+    parents are shifted with one UPDATE per distinct delta.
+    """
+    with batched_comment_counters():
+        comments = list(
+            Commentary.objects.filter(
+                post__blog=blog, comment_id__in=comment_ids
+            ).values_list("comment_id", "pk", "path")
+        )
+        found = {comment_id: pk for comment_id, pk, _ in comments}
+        # ответы на выбранные комментарии удаляются вместе с ними
+        roots = [
+            pk
+            for _, pk, path in comments
+            if not any(
+                other and path.startswith(f"{other}{PATH_SEPARATOR}")
+                for _, _, other in comments
+            )
+        ]
+        if roots:
+            Commentary.objects.filter(pk__in=roots).delete()
+    return _results(comment_ids, found, found, DELETED)
+
+
+def moderate_comments(blog, comment_ids, action):
+    """Hide or show again the blog's comments numbered `comment_ids`."""
+    field, value = COMMENT_ACTIONS[action]
+    with transaction.atomic():
+        found, changed = _set_flag(
+            Commentary.objects.filter(post__blog=blog),
+            "comment_id",
+            comment_ids,
+            field,
+            value,
+        )
+        if changed:
+            response_cache.bump("comments")
+    return _results(comment_ids, found, changed, UPDATED)
@@ -0,0 +1,172 @@
+import asyncio
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+async def alist(queryset):
+    return [row async for row in queryset]
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination with an awaitable paginate_queryset for async views:
+    the COUNT and the rows of a numbered page are fetched concurrently.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            number = int(page_number)
+        except (TypeError, ValueError):
+            number = 0
+
+        rows = None
+        if number > 0:
+            bottom = (number - 1) * page_size
+            paginator.count, rows = await asyncio.gather(
+                queryset.acount(), alist(queryset[bottom : bottom + page_size])
+            )
+        else:
+            paginator.count = await queryset.acount()
+            if page_number in self.last_page_strings:
+                page_number = paginator.num_pages
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if rows is None:
+            rows = await alist(self.page.object_list)
+        self.page.object_list = rows
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+
+class KeysetPagination(AsyncPageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode: when the request has a
+    ?cursor= parameter, the page is selected with a WHERE on the queryset's
+    ordering keys (plus id as a tie-breaker) instead of OFFSET, and no COUNT
+    query is issued. An empty ?cursor= starts from the first page.
+    """
+
+    cursor_query_param = "cursor"
+    default_ordering = ("-created_at",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset, page_size = self.get_cursor_queryset(queryset, request)
+        return self.set_cursor_page(list(queryset[: page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return await super().apaginate_queryset(queryset, request, view)
+
+        queryset, page_size = self.get_cursor_queryset(queryset, request)
+        rows = await alist(queryset[: page_size + 1])
+        return self.set_cursor_page(rows, page_size)
+
+    def get_cursor_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        queryset = queryset.order_by(*self.keys)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(queryset.model, cursor)
+            queryset = queryset.filter(self.get_keyset_filter(values))
+        return queryset, page_size
+
+    def set_cursor_page(self, rows, page_size):
+        self.has_next = len(rows) > page_size
+        self.page_rows = rows[:page_size]
+        return self.page_rows
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict([("next", self.get_next_cursor_link()), ("results", data)])
+        )
+
+    def get_keys(self, queryset):
+        ordering = queryset.query.order_by or self.default_ordering
+        if not all(isinstance(key, str) and "__" not in key for key in ordering):
+            ordering = self.default_ordering
+        descending = ordering[-1].startswith("-")
+        keys = [key for key in ordering if key.lstrip("-") not in ("pk", "id")]
+        return keys + ["-id" if descending else "id"]
+
+    def get_keyset_filter(self, values):
+        condition = Q()
+        for index, key in enumerate(self.keys):
+            field = key.lstrip("-")
+            lookup = "lt" if key.startswith("-") else "gt"
+            step = Q(**{f"{field}__{lookup}": values[index]})
+            for previous, value in zip(self.keys[:index], values):
+                step &= Q(**{previous.lstrip("-"): value})
+            condition |= step
+        return condition
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        last = self.page_rows[-1]
+        values = [getattr(last, key.lstrip("-")) for key in self.keys]
+        cursor = self.encode_cursor(values)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, values):
+        payload = json.dumps(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in values
+            ]
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError
+            return [
+                self.to_python(model, key.lstrip("-"), value)
+                for key, value in zip(self.keys, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, model, field_name, value):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
@@ -0,0 +1,35 @@
+from django.db.models import Prefetch
+
+from authentication.models import UserProfile
+
+LIKED_USERS_PREVIEW = 5
+
+
+def with_post_relations(queryset, prefix=""):
+    """
+    Loads everything PostSerializer touches for a page of posts in a fixed
+    number of queries. prefix is the lookup path to the post when the
+    queryset is of another model, e.g. "post__" for notifications.
+    """
+    return queryset.select_related(
+        f"{prefix}author", f"{prefix}blog__owner"
+    ).prefetch_related(
+        f"{prefix}blog__authors",
+        f"{prefix}images",
+        Prefetch(f"{prefix}disliked_users", queryset=UserProfile.objects.only("id")),
+        Prefetch(
+            f"{prefix}liked_users",
+            queryset=UserProfile.objects.order_by("id")[:LIKED_USERS_PREVIEW],
+            to_attr="liked_users_preview",
+        ),
+    )
+
+
+def with_blog_relations(queryset, prefix=""):
+    """
+    Loads the owner and authors BlogSerializer and its variants show for a
+    page of blogs: two queries whatever the page size.
+    """
+    return queryset.select_related(f"{prefix}owner").prefetch_related(
+        f"{prefix}authors"
+    )
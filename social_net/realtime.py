@@ -0,0 +1,38 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    return f"user.{user_id}"
+
+
+def post_group(post_id):
+    return f"post.{post_id}"
+
+
+def push(group, event, data):
+    """
+    Send `event` to the WebSocket consumers in `group` after the current
+    transaction commits. `data` is the payload or a callable building it, so
+    nothing is serialized when no channel layer is configured. Delivery
+    errors are logged and never break the request that caused the event.
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    def send():
+        try:
+            payload = data() if callable(data) else data
+            async_to_sync(layer.group_send)(
+                group, {"type": "push", "event": event, "data": payload}
+            )
+        except Exception:
+            logger.exception("Failed to push %s to %s", event, group)
+
+    transaction.on_commit(send)
@@ -0,0 +1,175 @@
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+RESPONSE_CACHE_ALIAS = getattr(settings, "RESPONSE_CACHE_ALIAS", "default")
+RESPONSE_CACHE_TIMEOUT = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+
+SCOPES = ("blogs", "posts", "comments")
+# заголовки-валидаторы, которые хранятся в кэше вместе с ответом
+VALIDATORS = ("ETag", "Last-Modified")
+
+
+def get_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"response-cache:version:{scope}"
+
+
+def get_versions(scopes):
+    stored = get_cache().get_many([_version_key(scope) for scope in scopes])
+    return [stored.get(_version_key(scope), 0) for scope in scopes]
+
+
+async def aget_versions(scopes):
+    stored = await get_cache().aget_many([_version_key(scope) for scope in scopes])
+    return [stored.get(_version_key(scope), 0) for scope in scopes]
+
+
+def bump(*scopes):
+    """
+    Invalidate every cached response that depends on the given scopes. Old
+    entries are not deleted: they stop being addressed and expire.
+    """
+    cache = get_cache()
+    for scope in scopes:
+        key = _version_key(scope)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def normalize_query(query_params):
+    items = []
+    for name in sorted(query_params):
+        values = sorted(value for value in query_params.getlist(name) if value != "")
+        items.extend(f"{name}={value}" for value in values)
+    return "&".join(items)
+
+
+def cache_key(request, scopes, versions=None):
+    if versions is None:
+        versions = get_versions(scopes)
+    versions = ".".join(str(version) for version in versions)
+    raw = f"{request.path}?{normalize_query(request.query_params)}"
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"response-cache:v2:{versions}:{digest}"
+
+
+def etag_matches(request, etag):
+    """
+    Whether If-None-Match of a GET/HEAD request names `etag`, compared
+    weakly (W/ prefixes are ignored), or is "*".
+    """
+    header = request.headers.get("If-None-Match")
+    if not etag or not header or request.method not in ("GET", "HEAD"):
+        return False
+    if header.strip() == "*":
+        return True
+    etags = {value.removeprefix("W/") for value in parse_etags(header)}
+    return etag.removeprefix("W/") in etags
+
+
+def not_modified(request, validators):
+    """
+    304 with the given validator headers when If-None-Match names the ETag
+    among them, None otherwise.
+    """
+    if etag_matches(request, validators.get("ETag")):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=validators)
+    return None
+
+
+def _entry(response):
+    validators = {
+        header: response[header] for header in VALIDATORS if response.has_header(header)
+    }
+    return response.data, validators
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    """
+    Rendered JSON response for views that bypass DRF's response machinery
+    (async views); .data is kept for callers that cache or inspect it.
+    """
+    content = JSONRenderer().render(data)
+    response = HttpResponse(
+        content, status=status, headers=headers, content_type="application/json"
+    )
+    response.data = data
+    return response
+
+
+def cache_anonymous_response(*scopes):
+    """
+    Cache 200 responses of a GET handler for anonymous users, keyed by path,
+    normalized query params and the current versions of `scopes`. Counters
+    changed with UPDATE (likes, views) may lag by RESPONSE_CACHE_TIMEOUT.
+    ETag and Last-Modified are cached with the data, so a matching
+    If-None-Match gets 304 straight from the cache.
+    """
+    unknown = set(scopes) - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown cache scopes: {', '.join(sorted(unknown))}")
+
+    def decorator(method):
+        if iscoroutinefunction(method):
+            return _async_wrapper(method, scopes)
+
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != "GET" or request.user.is_authenticated:
+                return method(self, request, *args, **kwargs)
+
+            key = cache_key(request, scopes)
+            entry = get_cache().get(key)
+            if entry is not None:
+                data, validators = entry
+                return not_modified(request, validators) or Response(
+                    data, headers={"X-Cache": "HIT", **validators}
+                )
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                get_cache().set(key, _entry(response), RESPONSE_CACHE_TIMEOUT)
+                response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _async_wrapper(method, scopes):
+    @functools.wraps(method)
+    async def wrapper(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return await method(self, request, *args, **kwargs)
+
+        key = cache_key(request, scopes, await aget_versions(scopes))
+        entry = await get_cache().aget(key)
+        if entry is not None:
+            data, validators = entry
+            return not_modified(request, validators) or json_response(
+                data, headers={"X-Cache": "HIT", **validators}
+            )
+
+        response = await method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await get_cache().aset(key, _entry(response), RESPONSE_CACHE_TIMEOUT)
+            response["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
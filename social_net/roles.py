@@ -0,0 +1,154 @@
+from django.db.models import Exists, OuterRef, Value
+from django.http import Http404
+
+from comments.models import Commentary
+from .models import Blog, Post
+
+BlogAuthor = Blog.authors.through
+
+
+class BlogRole:
+    """
+    What the requesting user is in a blog: its owner, one of its authors
+    and/or a site admin. Built from the blog row itself plus an EXISTS on
+    the authors table, see resolve_blog().
+    """
+
+    def __init__(self, blog, user):
+        self.blog = blog
+        authenticated = bool(user and user.is_authenticated)
+        self.is_owner = authenticated and blog.owner_id == user.pk
+        self.is_author = authenticated and bool(blog.user_is_author)
+        self.is_admin = authenticated and bool(user.is_admin)
+
+    @property
+    def can_manage(self):
+        """Edit or delete the blog itself."""
+        return self.is_owner or self.is_admin
+
+    @property
+    def can_write(self):
+        """Create, edit and delete the blog's posts."""
+        return self.is_owner or self.is_author or self.is_admin
+
+
+def _is_author(user, blog_pk="pk"):
+    if not user.is_authenticated:
+        return Value(False)
+    return Exists(
+        BlogAuthor.objects.filter(blog_id=OuterRef(blog_pk), userprofile_id=user.pk)
+    )
+
+
+def _cache(request):
+    # объекты живут до конца запроса: разрешения и представление
+    # получают одни и те же экземпляры
+    cache = getattr(request, "_resolved_objects", None)
+    if cache is None:
+        cache = request._resolved_objects = {}
+    return cache
+
+
+def _remember_blog(request, blog):
+    role = BlogRole(blog, request.user)
+    _cache(request)[("blog", blog.slug)] = role
+    return role
+
+
+def resolve_blog(request, slug):
+    """
+    The BlogRole of the user in the blog `slug`, or None when there is no
+    such blog. One query, made once per request.
+    """
+    cache = _cache(request)
+    key = ("blog", slug)
+    if key not in cache:
+        blog = (
+            Blog.objects.annotate(user_is_author=_is_author(request.user))
+            .filter(slug=slug)
+            .first()
+        )
+        cache[key] = blog and BlogRole(blog, request.user)
+    return cache[key]
+
+
+def resolve_post(request, slug, post_id):
+    """
+    The post `post_id` of the blog `slug` with its blog joined in, or None.
+    The blog's role is resolved by the same query.
+    """
+    cache = _cache(request)
+    key = ("post", slug, post_id)
+    if key not in cache:
+        post = (
+            Post.objects.select_related("blog")
+            .annotate(user_is_author=_is_author(request.user, "blog__pk"))
+            .filter(blog_id=slug, post_id=post_id)
+            .first()
+        )
+        if post is not None:
+            post.blog.user_is_author = post.user_is_author
+            _remember_blog(request, post.blog)
+        cache[key] = post
+    return cache[key]
+
+
+def resolve_comment(request, slug, post_id, comment_id):
+    """
+    The comment `comment_id` under the post with its post and blog joined
+    in, or None. Resolves the post and the blog's role as well.
+    """
+    cache = _cache(request)
+    key = ("comment", slug, post_id, comment_id)
+    if key not in cache:
+        comment = (
+            Commentary.objects.select_related("post__blog")
+            .annotate(user_is_author=_is_author(request.user, "post__blog__pk"))
+            .filter(post__blog_id=slug, post__post_id=post_id, comment_id=comment_id)
+            .first()
+        )
+        if comment is not None:
+            comment.post.blog.user_is_author = comment.user_is_author
+            cache[("post", slug, post_id)] = comment.post
+            _remember_blog(request, comment.post.blog)
+        cache[key] = comment
+    return cache[key]
+
+
+def can_view_post(user, pk):
+    """
+    Whether `user` may see the post with primary key `pk`: published posts
+    are public, drafts only to those who can write to the blog. False when
+    there is no such post. One query, for callers without a request.
+    """
+    post = (
+        Post.objects.select_related("blog")
+        .annotate(user_is_author=_is_author(user, "blog__pk"))
+        .filter(pk=pk)
+        .first()
+    )
+    if post is None:
+        return False
+    post.blog.user_is_author = post.user_is_author
+    return bool(post.is_published) or BlogRole(post.blog, user).can_write
+
+
+def blog_role_or_404(request, slug):
+    role = resolve_blog(request, slug)
+    if role is None:
+        raise Http404
+    return role
+
+
+def post_or_404(request, slug, post_id):
+    post = resolve_post(request, slug, post_id)
+    if post is None:
+        raise Http404
+    return post
+
+
+def comment_or_404(request, slug, post_id, comment_id):
+    comment = resolve_comment(request, slug, post_id, comment_id)
+    if comment is None:
+        raise Http404
+    return comment
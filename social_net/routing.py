@@ -1,8 +1,7 @@
-# from django.urls import path
-#
-# from .consumers import WSConsumer, BlogSubscribeConsumer
+from django.urls import path
+
+from .consumers import NotificationConsumer
 
 ws_urlpatterns = [
-    #     path('ws/some-url/', WSConsumer.as_asgi()),
-    #     path('/blog/<slug:slug>/subscribe/', BlogSubscribeConsumer.as_asgi())
+    path("ws/notifications/", NotificationConsumer.as_asgi()),
 ]
@@ -0,0 +1,73 @@
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Blog
+
+# последовательности номеров; счётчики для отображения (count_of_posts,
+# count_of_commentaries) растут в post_save созданных постов и комментариев,
+# поэтому номер, взятый для несохранённой записи, их не сдвигает
+POSTS = "last_post_id"
+COMMENTS = "last_comment_id"
+
+
+def _update_returning():
+    # UPDATE ... RETURNING есть в PostgreSQL и в SQLite с 3.35
+    # (там же, где RETURNING у INSERT); у MySQL и MariaDB его нет
+    return connection.vendor == "postgresql" or (
+        connection.vendor == "sqlite"
+        and connection.features.can_return_columns_from_insert
+    )
+
+
+def _allocate_returning(blog_pk, sequence, count):
+    quote = connection.ops.quote_name
+    table = quote(Blog._meta.db_table)
+    column = quote(Blog._meta.get_field(sequence).column)
+    pk_column = quote(Blog._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {column} = {column} + %s "
+            f"WHERE {pk_column} = %s RETURNING {column}",
+            [count, blog_pk],
+        )
+        return cursor.fetchone()
+
+
+def _allocate_locked(blog_pk, sequence, count):
+    # UPDATE блокирует строку до конца транзакции: чтение после него
+    # видит только свои номера
+    with transaction.atomic():
+        updated = Blog.objects.filter(pk=blog_pk).update(
+            **{sequence: F(sequence) + count}
+        )
+        if not updated:
+            return None
+        return Blog.objects.filter(pk=blog_pk).values_list(sequence).get()
+
+
+def allocate(blog, sequence, count=1):
+    """
+    Reserve `count` consecutive numbers of the blog's `sequence` (POSTS or
+    COMMENTS) with a single atomic UPDATE. Returns the range of reserved
+    numbers.
+
+    Concurrent writers only wait for each other's UPDATE of the blog row,
+    never get the same number, and a number is never reused even when the
+    post or comment it was taken for is not saved or is deleted later.
+    """
+    allocate_on = _allocate_returning if _update_returning() else _allocate_locked
+    row = allocate_on(blog.pk, sequence, count)
+    if row is None:
+        raise Blog.DoesNotExist
+    (last,) = row
+    # экземпляр блога сразу показывает новое значение
+    setattr(blog, sequence, last)
+    return range(last - count + 1, last + 1)
+
+
+def next_post_id(blog):
+    return allocate(blog, POSTS)[0]
+
+
+def next_comment_id(blog):
+    return allocate(blog, COMMENTS)[0]
@@ -18,6 +18,15 @@ from .models import (
 from comments.models import Commentary
 
 from .validators import validate_avatar_small, validate_avatar
+from .querysets import LIKED_USERS_PREVIEW
+from .images import variant_urls
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Variants built by the image pipeline as a srcset-style map of URLs."""
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get("request"))
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -27,9 +36,11 @@ class TagSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar_variants = ImageVariantsField()
+
     class Meta:
         model = UserProfile
-        fields = ("id", "username", "avatar", "avatar_small")
+        fields = ("id", "username", "avatar", "avatar_small", "avatar_variants")
 
 
 class BlogMiniListSerializer(serializers.ModelSerializer):
@@ -38,6 +49,7 @@ class BlogMiniListSerializer(serializers.ModelSerializer):
     subscriberList = serializers.IntegerField(read_only=True)
     isSubscribed = serializers.BooleanField(read_only=True)
     views = serializers.IntegerField(read_only=True)
+    avatar_variants = ImageVariantsField()
     isBlogAuthor = serializers.BooleanField(read_only=True)
 
     class Meta:
@@ -58,6 +70,7 @@ class BlogMiniListSerializer(serializers.ModelSerializer):
             "count_of_commentaries",
             "avatar",
             "avatar_small",
+            "avatar_variants",
             "email",
             "phone_number",
             "site_link",
@@ -74,6 +87,8 @@ class BlogSerializerPinned(serializers.ModelSerializer):
     subscriberList = serializers.IntegerField(read_only=True)
     isSubscribed = serializers.BooleanField(read_only=True)
     views = serializers.IntegerField(read_only=True)
+    avatar_variants = ImageVariantsField()
+    banner_variants = ImageVariantsField()
 
     class Meta:
         model = Blog
@@ -93,8 +108,10 @@ class BlogSerializerPinned(serializers.ModelSerializer):
             "count_of_commentaries",
             "avatar",
             "avatar_small",
+            "avatar_variants",
             "banner",
             "banner_small",
+            "banner_variants",
             "email",
             "phone_number",
             "site_link",
@@ -109,12 +126,12 @@ class BlogPinnedPostSerializer(serializers.ModelSerializer):
     blog = BlogSerializerPinned()
     author = UserSerializer()
     # isLiked = serializers.BooleanField(read_only=True)
-    likedUsersCount = serializers.IntegerField(read_only=True)
+    likedUsersCount = serializers.IntegerField(source="likes", read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     subscribers = serializers.IntegerField(read_only=True)
     isSubscribed = serializers.BooleanField(read_only=True)
     isBookmarked = serializers.BooleanField(read_only=True)
-    comments = serializers.IntegerField(read_only=True)
+    comments = serializers.IntegerField(source="comment_count", read_only=True)
     liked_users = serializers.SerializerMethodField()
 
     class Meta:
@@ -161,6 +178,8 @@ class BlogSerializer(serializers.ModelSerializer):
     subscriberList = serializers.IntegerField(read_only=True)
     isSubscribed = serializers.BooleanField(read_only=True)
     views = serializers.IntegerField(read_only=True)
+    avatar_variants = ImageVariantsField()
+    banner_variants = ImageVariantsField()
 
     class Meta:
         model = Blog
@@ -180,8 +199,10 @@ class BlogSerializer(serializers.ModelSerializer):
             "count_of_commentaries",
             "avatar",
             "avatar_small",
+            "avatar_variants",
             "banner",
             "banner_small",
+            "banner_variants",
             "email",
             "phone_number",
             "site_link",
@@ -255,9 +276,11 @@ class UpdateBlogSerializer(serializers.ModelSerializer):
 
 
 class PostImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = PostImage
-        fields = ("id", "image")  # Adjust fields as necessary
+        fields = ("id", "image", "variants")  # Adjust fields as necessary
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -268,10 +291,10 @@ class PostSerializer(serializers.ModelSerializer):
     isSubscribed = serializers.BooleanField(read_only=True)
     isBookmarked = serializers.BooleanField(read_only=True)
 
-    likedUsersCount = serializers.IntegerField(read_only=True)
+    likedUsersCount = serializers.IntegerField(source="likes", read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     subscribers = serializers.IntegerField(read_only=True)
-    comments = serializers.IntegerField(read_only=True)
+    comments = serializers.IntegerField(source="comment_count", read_only=True)
     liked_users = serializers.SerializerMethodField()
     images1 = serializers.SerializerMethodField()
 
@@ -301,6 +324,7 @@ class PostSerializer(serializers.ModelSerializer):
             "isSubscribed",
             "isBookmarked",
             "comments",
+            "bookmark_count",
             "map",
             "author_is_hidden",
             "comments_allowed",
@@ -315,7 +339,9 @@ class PostSerializer(serializers.ModelSerializer):
         )
 
     def get_liked_users(self, obj):
-        users = obj.liked_users.all()[:5]
+        users = getattr(obj, "liked_users_preview", None)
+        if users is None:
+            users = obj.liked_users.all()[:LIKED_USERS_PREVIEW]
         return UserSerializer(users, many=True).data
 
     def get_images1(self, obj):
@@ -393,7 +419,6 @@ class UpdatePostSerializer(serializers.ModelSerializer):
 class BlogCommentListSerializer(serializers.ModelSerializer):
     post = PostSerializer()
     author = UserSerializer()
-    replies_count = serializers.SerializerMethodField()
     isLiked = serializers.BooleanField()
     isDisliked = serializers.BooleanField()
 
@@ -413,12 +438,9 @@ class BlogCommentListSerializer(serializers.ModelSerializer):
             "isDisliked",
             "replies_count",
             "liked_by_author",
+            "is_hidden",
         )
 
-    def get_replies_count(self, obj):
-        replies = obj.replies.count()
-        return replies
-
 
 class IsBlogOwnerSerializer(serializers.ModelSerializer):
     value = serializers.CharField(source="slug")
@@ -487,10 +509,12 @@ class SubscriptionListMiniSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "avatar_small", "slug"]
 
 
-class BlogCommentListDeleteSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Commentary
-        fields = [""]
+class CommentIdSerializer(serializers.Serializer):
+    comment_id = serializers.IntegerField()
+
+
+class BlogCommentListDeleteSerializer(serializers.Serializer):
+    comment_list = serializers.ListField(child=CommentIdSerializer(), allow_empty=False)
 
 
 class PostIdSerializer(serializers.Serializer):
@@ -505,6 +529,14 @@ class BlogDeletePostListSerializer(serializers.Serializer):
         fields = ["selectedPosts"]
 
 
+class BlogModeratePostListSerializer(BlogDeletePostListSerializer):
+    action = serializers.ChoiceField(choices=["publish", "unpublish", "pin", "unpin"])
+
+
+class BlogModerateCommentListSerializer(BlogCommentListDeleteSerializer):
+    action = serializers.ChoiceField(choices=["hide", "unhide"])
+
+
 class InviteGetUsersSerializer(serializers.ModelSerializer):
     value = serializers.CharField(source="username")
 
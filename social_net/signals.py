@@ -0,0 +1,255 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from . import feed, images, response_cache, storage
+from .models import Blog, Post, PostImage, PostTag
+from .tags import refresh_tag_counters, sync_post_tags
+from .tasks import build_image_variants, fan_out_post
+
+
+@receiver(post_save, sender=Post)
+def index_post_tags(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is None or "tags" in update_fields:
+        sync_post_tags(instance, created)
+
+
+_bulk_post_delete = ContextVar("bulk_post_delete", default=False)
+
+
+@contextmanager
+def bulk_post_delete():
+    """
+    Within the block, deleted posts neither refresh their tag counters nor
+    touch their blog one by one: the caller does both once for all of them
+    (see moderation.delete_posts).
+    """
+    token = _bulk_post_delete.set(True)
+    try:
+        yield
+    finally:
+        _bulk_post_delete.reset(token)
+
+
+def in_bulk_post_delete():
+    return _bulk_post_delete.get()
+
+
+def _skip_post_delete(origin):
+    return isinstance(origin, Blog) or in_bulk_post_delete()
+
+
+# при каскадном удалении ссылки на тэги удаляются без сигналов, поэтому
+# тэги запоминаются заранее, а счётчики пересчитываются после удаления
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, origin=None, **kwargs):
+    if _skip_post_delete(origin):
+        return
+    instance._tag_ids = list(
+        PostTag.objects.filter(post=instance).values_list("tag_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def release_post_tags(sender, instance, **kwargs):
+    if getattr(instance, "_tag_ids", None):
+        refresh_tag_counters(instance._tag_ids)
+
+
+@receiver(pre_delete, sender=Blog)
+def remember_blog_tags(sender, instance, **kwargs):
+    instance._tag_ids = list(
+        PostTag.objects.filter(blog=instance)
+        .values_list("tag_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_delete, sender=Blog)
+def release_blog_tags(sender, instance, **kwargs):
+    if getattr(instance, "_tag_ids", None):
+        refresh_tag_counters(instance._tag_ids)
+
+
+# состояние публикации поста на момент загрузки: по нему сохранение узнаёт,
+# опубликован ли пост или снят с публикации
+@receiver(post_init, sender=Post)
+def remember_publication(sender, instance, **kwargs):
+    # отложенное поле не читается, чтобы не делать запрос: состояние неизвестно
+    instance._was_published = instance.__dict__.get("is_published")
+
+
+@receiver(pre_save, sender=Post)
+def note_publication_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "is_published" not in update_fields:
+        instance._publication_changed = False
+        return
+    was_published = False if instance._state.adding else instance._was_published
+    instance._publication_changed = was_published != instance.is_published
+    instance._was_published = instance.is_published
+
+
+@receiver(post_save, sender=Post)
+def publish_to_feeds(sender, instance, created, **kwargs):
+    if not instance._publication_changed:
+        return
+    if instance.is_published:
+        # раскладка по лентам может занять много запросов - в фоне
+        fan_out_post.enqueue(post_id=instance.pk)
+    elif not created:
+        feed.retract(instance)
+
+
+# уменьшенные копии картинок строятся воркерами, а не в запросе загрузки
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=PostImage)
+@receiver(post_save, sender=UserProfile)
+def queue_image_variants(sender, instance, update_fields=None, **kwargs):
+    for field in images.stale_fields(instance):
+        if update_fields is None or field in update_fields:
+            build_image_variants.enqueue(
+                model=sender._meta.label, pk=instance.pk, field=field
+            )
+
+
+# счётчики ссылок на файлы в хранилище: запоминаем файлы загруженной записи
+# и после сохранения или удаления учитываем разницу
+@receiver(post_init, sender=Blog)
+@receiver(post_init, sender=PostImage)
+@receiver(post_init, sender=UserProfile)
+def remember_stored_files(sender, instance, **kwargs):
+    instance._stored_files = storage.references(instance)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=PostImage)
+@receiver(post_save, sender=UserProfile)
+def count_stored_files(sender, instance, **kwargs):
+    files = storage.references(instance)
+    storage.retain(files - instance._stored_files)
+    storage.release(instance._stored_files - files)
+    instance._stored_files = files
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=PostImage)
+@receiver(post_delete, sender=UserProfile)
+def release_stored_files(sender, instance, **kwargs):
+    storage.release(storage.references(instance))
+
+
+@receiver(m2m_changed, sender=UserProfile.subscriptions.through)
+def sync_feed_subscriptions(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        user_ids, blog_ids = pk_set, [instance.pk]
+    else:
+        user_ids, blog_ids = [instance.pk], pk_set
+    if action == "post_add":
+        feed.backfill(user_ids, blog_ids)
+    elif action == "post_remove":
+        feed.drop(user_ids, blog_ids)
+    elif action == "post_clear":
+        if reverse:
+            feed.drop(blog_ids=blog_ids)
+        else:
+            feed.drop(user_ids=user_ids)
+
+
+# версии кэша ответов: любое изменение блогов, постов, комментариев или
+# подписок делает устаревшими закэшированные ответы, которые от них зависят
+CACHE_SCOPES = {Blog: ("blogs",), Post: ("posts",), Commentary: ("comments",)}
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Commentary)
+@receiver(post_delete, sender=Commentary)
+def invalidate_cached_responses(sender, **kwargs):
+    response_cache.bump(*CACHE_SCOPES[sender])
+
+
+@receiver(m2m_changed, sender=UserProfile.subscriptions.through)
+def invalidate_cached_blogs(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        response_cache.bump("blogs")
+
+
+# Blog.updated_at - время последнего видимого изменения блога: его полей
+# (auto_now), опубликованных постов и состава авторов. По нему упорядочен
+# каталог блогов и строятся валидаторы ответов; подписки и счётчики его не
+# сдвигают
+def update_blogs(changes, **lookup):
+    Blog.objects.filter(**lookup).update(**changes)
+    # UPDATE не отправляет post_save
+    response_cache.bump("blogs")
+
+
+def touch_blogs(**lookup):
+    update_blogs({"updated_at": timezone.now()}, **lookup)
+
+
+# поля поста, которые не видны ни в каталоге блогов, ни в ленте блога
+QUIET_POST_FIELDS = frozenset(
+    (
+        "likes",
+        "dislikes",
+        "views",
+        "comment_count",
+        "bookmark_count",
+        "search_vector",
+        "updated_at",
+    )
+)
+
+
+def _post_change_is_visible(post, update_fields):
+    if post._publication_changed:
+        return True
+    # черновик видят только авторы блога
+    if not post.is_published:
+        return False
+    return update_fields is None or not QUIET_POST_FIELDS.issuperset(update_fields)
+
+
+@receiver(post_save, sender=Post)
+def touch_saved_post_blog(sender, instance, created, update_fields=None, **kwargs):
+    changes = {}
+    # созданный пост учитывается в счётчике блога тем же UPDATE
+    if created:
+        changes["count_of_posts"] = F("count_of_posts") + 1
+    if _post_change_is_visible(instance, update_fields):
+        changes["updated_at"] = timezone.now()
+    if changes:
+        update_blogs(changes, slug=instance.blog_id)
+
+
+@receiver(post_delete, sender=Post)
+def touch_deleted_post_blog(sender, instance, origin=None, **kwargs):
+    if _skip_post_delete(origin) or not instance.is_published:
+        return
+    touch_blogs(slug=instance.blog_id)
+
+
+@receiver(m2m_changed, sender=Blog.authors.through)
+def touch_author_blogs(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        touch_blogs(pk=instance.pk)
+    elif pk_set:
+        touch_blogs(pk__in=pk_set)
@@ -0,0 +1,173 @@
+import datetime
+import functools
+import hashlib
+import os
+import tempfile
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F, FileField
+from django.utils import timezone
+from django.views.static import serve
+
+from jobs.queue import enqueue
+from . import images
+from .models import StoredFile
+
+CAS_DIR = "cas"
+MEDIA_SWEEP_DELAY = getattr(settings, "MEDIA_SWEEP_DELAY", 3600)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload once under the SHA-256 of its content:
+    cas/ab/cd/abcd...ef.jpg. The digest is computed while the upload is
+    copied, so the file is read only once. Identical uploads map to the
+    same name, and since a name never changes its content, the URLs can be
+    cached forever. Stored files are listed in StoredFile with reference
+    counts, see retain() and release().
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # имя всё равно заменяется дайджестом в _save
+        return name
+
+    def _save(self, name, content):
+        if getattr(content, "sha256", None) and hasattr(content, "temporary_file_path"):
+            # загрузка уже лежит на диске, а хэш посчитан при приёме
+            # (uploads.StreamingImageUploadHandler): файл просто переносится
+            name = self._register(name, content.sha256, content.size)
+            self._move(content.temporary_file_path(), name)
+            return name
+
+        directory = self.path(CAS_DIR)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            name = self._register(name, digest.hexdigest(), size)
+            self._move(tmp_path, name)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return name
+
+    def _register(self, name, digest, size):
+        extension = os.path.splitext(name)[1].lower()
+        name = f"{CAS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+        # запись о файле обновляется до проверки на диске: свежая дата
+        # загрузки не даёт sweep() удалить файл, который сейчас
+        # переиспользуется, а если он уже удалён, он будет записан снова
+        StoredFile.objects.bulk_create(
+            [StoredFile(name=name, size=size)],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["uploaded_at"],
+        )
+        return name
+
+    def _move(self, source, name):
+        path = self.path(name)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_move_safe(source, path, allow_overwrite=True)
+        os.chmod(path, self.file_permissions_mode or 0o644)
+
+
+def serve_immutable(request, path, document_root=None, show_indexes=False):
+    """django.views.static.serve for content-addressed files (DEBUG only)."""
+    response = serve(request, path, document_root, show_indexes)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@functools.cache
+def _tracked_fields(model):
+    files = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField)
+    ]
+    variants, _ = images.IMAGE_FIELDS.get(model._meta.label, ({}, ()))
+    return files, list(variants.values())
+
+
+def references(instance):
+    """
+    Names of the content-addressed files a model instance points to. Only
+    loaded fields are looked at, so deferred fields are never fetched.
+    """
+    files, variants_fields = _tracked_fields(type(instance))
+    values = instance.__dict__
+    names = {
+        getattr(values.get(attname), "name", values.get(attname)) for attname in files
+    }
+    # уменьшенные копии картинок хранятся в JSON-полях, см. images.py
+    for variants_field in variants_fields:
+        for variant in (values.get(variants_field) or {}).values():
+            if isinstance(variant, dict):
+                names.add(variant.get("name"))
+    return {
+        name
+        for name in names
+        if isinstance(name, str) and name.startswith(f"{CAS_DIR}/")
+    }
+
+
+def _add_refs(names, sign):
+    # имя может встретиться несколько раз (одна картинка в двух записях):
+    # по одному UPDATE на каждое встретившееся число ссылок
+    by_count = defaultdict(list)
+    for name, count in Counter(names).items():
+        by_count[count].append(name)
+    return sum(
+        StoredFile.objects.filter(name__in=group).update(refs=F("refs") + sign * count)
+        for count, group in by_count.items()
+    )
+
+
+def retain(names):
+    _add_refs(names, 1)
+
+
+def release(names):
+    """
+    Drop a reference to each of `names`. Files left without references
+    are deleted by a delayed sweep_stored_files job.
+    """
+    if _add_refs(names, -1):
+        enqueue(
+            "social_net.tasks.sweep_stored_files",
+            {"names": sorted(set(names))},
+            priority=-10,
+            delay=MEDIA_SWEEP_DELAY,
+        )
+
+
+def sweep(names=None, grace=MEDIA_SWEEP_DELAY):
+    """
+    Delete the stored files nobody references, leaving alone those uploaded
+    less than `grace` seconds ago (the rows using them may not be saved yet).
+    """
+    unused = StoredFile.objects.select_for_update(skip_locked=True).filter(
+        refs__lte=0,
+        uploaded_at__lt=timezone.now() - datetime.timedelta(seconds=grace),
+    )
+    if names is not None:
+        unused = unused.filter(name__in=names)
+    with transaction.atomic():
+        files = list(unused.values_list("pk", "name"))
+        for _, name in files:
+            default_storage.delete(name)
+        StoredFile.objects.filter(pk__in=[pk for pk, _ in files]).delete()
+    return len(files)
@@ -0,0 +1,94 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import PostTag, Tag
+
+TAG_RE = re.compile(r"[\w-]+")
+TAG_MAX_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def parse_tags(text):
+    """
+    "#Django #orm, python" -> ["django", "orm", "python"]: lowercase, without
+    the leading #, in order of first appearance.
+    """
+    names = []
+    for name in TAG_RE.findall((text or "").lower()):
+        name = name.strip("-")[:TAG_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def normalize_tag(name):
+    names = parse_tags(name)
+    return names[0] if names else ""
+
+
+def _distinct_count(field):
+    return Coalesce(
+        Subquery(
+            PostTag.objects.filter(tag=OuterRef("pk"))
+            .values("tag")
+            .annotate(count=Count(field, distinct=True))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def refresh_tag_counters(tag_ids=None, fields=("post_count", "blog_count")):
+    sources = {
+        "post_count": _distinct_count("post"),
+        "blog_count": _distinct_count("blog"),
+    }
+    queryset = (
+        Tag.objects.all() if tag_ids is None else Tag.objects.filter(pk__in=tag_ids)
+    )
+    return queryset.update(**{field: sources[field] for field in fields})
+
+
+def get_or_create_tags(names):
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+
+
+def sync_post_tags(post, created=False):
+    """
+    Bring the Tag<->Post index in line with post.tags. Post counters are
+    shifted by the number of added/removed links; blog counters are
+    recounted for the touched tags only.
+    """
+    names = parse_tags(post.tags)
+    if created and not names:
+        return names
+    current = {}
+    if not created:
+        current = dict(
+            PostTag.objects.filter(post=post).values_list("tag__name", "tag_id")
+        )
+    removed = [tag_id for name, tag_id in current.items() if name not in names]
+    added = [name for name in names if name not in current]
+    if not (removed or added):
+        return names
+
+    with transaction.atomic():
+        if removed:
+            PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+            Tag.objects.filter(pk__in=removed).update(post_count=F("post_count") - 1)
+        added = list(get_or_create_tags(added).values())
+        if added:
+            PostTag.objects.bulk_create(
+                [
+                    PostTag(post=post, tag_id=tag_id, blog_id=post.blog_id)
+                    for tag_id in added
+                ]
+            )
+            Tag.objects.filter(pk__in=added).update(post_count=F("post_count") + 1)
+        refresh_tag_counters(removed + added, fields=("blog_count",))
+    return names
@@ -0,0 +1,30 @@
+from jobs.queue import task
+from . import feed, images, storage
+from .counters import reconcile_counters
+from .models import Post
+
+
+@task(priority=5)
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id, is_published=True).first()
+    # пост могли снять с публикации, пока задача ждала в очереди
+    if post is not None:
+        feed.fan_out(post)
+
+
+@task(priority=-10)
+def reconcile_post_counters(fields=None, blog=None):
+    queryset = Post.objects.all()
+    if blog:
+        queryset = queryset.filter(blog__slug=blog)
+    reconcile_counters(queryset, fields)
+
+
+@task()
+def build_image_variants(model, pk, field):
+    images.build_variants(model, pk, field)
+
+
+@task(priority=-10)
+def sweep_stored_files(names=None):
+    storage.sweep(names)
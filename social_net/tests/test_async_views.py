@@ -0,0 +1,73 @@
+import importlib
+from contextlib import contextmanager
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import override_settings
+from django.urls import clear_url_caches, resolve, reverse
+from rest_framework.test import APIClient
+
+from social_net.async_views import AsyncReadView
+
+from .budgets import BLOG, POST, SMALL_SCALE, SeededTestCase
+
+ASYNC_ROUTES = {
+    "post_list": None,
+    "blog_page": BLOG,
+    "post_page": POST,
+    "post_comment_list": POST,
+}
+
+
+def reload_urls():
+    # read_view выбирает представление при построении маршрутов, а корневой
+    # URLconf держит разобранные маршруты включённых модулей
+    for module in ("social_net.api_urls", "comments.api_urls", settings.ROOT_URLCONF):
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+@contextmanager
+def async_routes(*names):
+    try:
+        with override_settings(ASYNC_READ_ROUTES=list(names)):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+class AsyncReadViewTests(SeededTestCase):
+    scale = SMALL_SCALE
+
+    def responses(self, route):
+        url = reverse(route, kwargs=ASYNC_ROUTES[route])
+        expected = APIClient().get(url)
+        with async_routes(route):
+            actual = async_to_sync(self.async_client.get)(url)
+        return expected, actual
+
+    def assertSameResponse(self, expected, actual, ignore=()):
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual["Content-Type"], expected["Content-Type"])
+        expected, actual = expected.json(), actual.json()
+        for field in ignore:
+            expected.pop(field, None)
+            actual.pop(field, None)
+        self.assertEqual(actual, expected)
+
+    def test_async_views_are_routed(self):
+        with async_routes(*ASYNC_ROUTES):
+            for route, kwargs in ASYNC_ROUTES.items():
+                with self.subTest(route=route):
+                    url = reverse(route, kwargs=kwargs)
+                    view = resolve(url).func
+                    self.assertTrue(issubclass(view.view_class, AsyncReadView))
+                    response = async_to_sync(self.async_client.get)(url)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_async_views_match_sync_views(self):
+        for route in ASYNC_ROUTES:
+            with self.subTest(route=route):
+                # просмотр поста, прочитанного синхронно, уже учтён
+                self.assertSameResponse(*self.responses(route), ignore=("views",))
@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from social_net.models import Blog, Post
+
+
+class BlogPublicationsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "pub")
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "pub"
+        )
+        blog = Blog.objects.create(title="Pub", slug="pub", owner=cls.owner, map="")
+        other = Blog.objects.create(
+            title="Other", slug="other", owner=cls.owner, map=""
+        )
+        for post_id, is_published in ((1, True), (2, False)):
+            Post.objects.create(
+                author=cls.owner,
+                blog=blog,
+                post_id=post_id,
+                title="Post",
+                body="Body",
+                is_published=is_published,
+            )
+        Post.objects.create(
+            author=cls.owner,
+            blog=other,
+            post_id=1,
+            title="Other",
+            body="Body",
+            is_published=True,
+        )
+
+    def post_ids(self, user, slug="pub", **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(
+            reverse("blog_publications", kwargs={"slug": slug}), params
+        )
+        if response.status_code != 200:
+            return response.status_code
+        return sorted(post["post_id"] for post in response.data)
+
+    def test_writer_sees_posts_by_state(self):
+        self.assertEqual(self.post_ids(self.owner), [1, 2])
+        self.assertEqual(self.post_ids(self.owner, state="published"), [1])
+        self.assertEqual(self.post_ids(self.owner, state="pending"), [2])
+
+    def test_reader_sees_only_published_posts(self):
+        self.assertEqual(self.post_ids(self.reader), [1])
+        self.assertEqual(self.post_ids(self.reader, state="pending"), [1])
+
+    def test_unknown_blog(self):
+        self.assertEqual(self.post_ids(self.owner, slug="missing"), 404)
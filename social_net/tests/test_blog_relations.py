@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from invites.models import Invite
+from social_net.models import Blog
+
+UNCACHED = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+@override_settings(CACHES=UNCACHED)
+class BlogRelationsQueryTests(TestCase):
+    """Blog lists load owners and authors in the same queries for any page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "rel")
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "rel"
+        )
+        cls.authors = [
+            UserProfile.objects.create_user(f"author{i}", f"a{i}@example.com", "rel")
+            for i in range(2)
+        ]
+
+    def add_blogs(self, count):
+        start = Blog.objects.count()
+        for i in range(start, start + count):
+            blog = Blog.objects.create(
+                title=f"Blog {i}", slug=f"blog-{i}", owner=self.owner, map=""
+            )
+            blog.authors.add(*self.authors)
+            blog.subscribers.add(self.reader)
+            Invite.objects.create(
+                admin=self.owner, addressee=self.reader, blog=blog, description="Join"
+            )
+
+    def count_queries(self, url, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_blogs(self):
+        requests = [
+            (reverse("blog_list"), self.reader),
+            (reverse("username_blogs_owner", args=["owner"]), self.owner),
+            (reverse("username_blogs_author", args=["author0"]), self.authors[0]),
+            (reverse("invite_list"), self.reader),
+            (reverse("profile", args=["reader"]), self.reader),
+            (reverse("user_subscriptions", args=["reader"]), self.reader),
+        ]
+        self.add_blogs(1)
+        single = [self.count_queries(url, user) for url, user in requests]
+        self.add_blogs(3)
+        several = [self.count_queries(url, user) for url, user in requests]
+        self.assertEqual(several, single)
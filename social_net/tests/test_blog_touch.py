@@ -0,0 +1,56 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from social_net.models import Blog, Post
+
+LONG_AGO = timezone.now() - datetime.timedelta(days=30)
+
+
+class TouchPostBlogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "tb")
+        cls.blog = Blog.objects.create(
+            title="Tb", slug="touch", owner=cls.owner, map=""
+        )
+
+    def create_post(self, **fields):
+        return Post.objects.create(
+            author=self.owner,
+            blog=self.blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            **fields,
+        )
+
+    def assertTouches(self, change, touched=True):
+        Blog.objects.filter(pk=self.blog.pk).update(updated_at=LONG_AGO)
+        change()
+        updated_at = Blog.objects.get(pk=self.blog.pk).updated_at
+        self.assertEqual(updated_at != LONG_AGO, touched)
+
+    def test_drafts_do_not_touch_blog(self):
+        post = self.create_post()
+        self.assertEqual(Blog.objects.get(pk=self.blog.pk).count_of_posts, 1)
+        self.assertTouches(post.save, touched=False)
+        self.assertTouches(post.delete, touched=False)
+
+    def test_publishing_touches_blog(self):
+        post = self.create_post()
+        post.is_published = True
+        self.assertTouches(post.save)
+        post.is_published = False
+        self.assertTouches(lambda: post.save(update_fields=("is_published",)))
+
+    def test_published_post_touches_blog_on_visible_change(self):
+        self.assertTouches(lambda: self.create_post(is_published=True))
+        post = Post.objects.get(blog=self.blog)
+        post.title = "Edited"
+        self.assertTouches(post.save)
+        post.views = 10
+        self.assertTouches(lambda: post.save(update_fields=("views",)), touched=False)
+        self.assertTouches(post.delete)
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.db.models import Max
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from social_net.models import Blog, Post
+
+
+class CommentDeleteCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "cnt")
+        cls.writer = UserProfile.objects.create_user(
+            "writer", "writer@example.com", "cnt"
+        )
+        blog = Blog.objects.create(title="Cnt", slug="cnt", owner=cls.owner, map="")
+        cls.post = Post.objects.create(
+            author=cls.owner,
+            blog=blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            is_published=True,
+        )
+        cls.root = cls.comment(cls.owner)
+        cls.kept = cls.comment(cls.owner)
+
+    @classmethod
+    def comment(cls, author, reply_to=None):
+        last = Commentary.objects.aggregate(last=Max("comment_id"))["last"] or 0
+        return Commentary.objects.create(
+            author=author,
+            post=cls.post,
+            body="Comment",
+            comment_id=last + 1,
+            reply_to=reply_to,
+        )
+
+    def add_replies(self, parent, count):
+        for _ in range(count):
+            reply = self.comment(self.writer, parent)
+            self.comment(self.owner, reply)
+
+    def comment_count(self):
+        self.post.refresh_from_db()
+        return self.post.comment_count
+
+    def delete_root(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = reverse(
+            "commentary",
+            kwargs={"slug": "cnt", "post_id": 1, "comment_id": self.root.comment_id},
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_deleting_a_thread_shifts_counters_once(self):
+        self.add_replies(self.root, 1)
+        with self.captureOnCommitCallbacks():
+            one_reply = self.delete_root()
+        self.assertEqual(self.comment_count(), 1)
+
+        self.root = self.comment(self.owner)
+        self.add_replies(self.root, 3)
+        with self.captureOnCommitCallbacks():
+            three_replies = self.delete_root()
+        self.assertEqual(self.comment_count(), 1)
+        self.assertEqual(three_replies, one_reply)
+
+    def test_deleting_a_user_updates_surviving_parents(self):
+        self.add_replies(self.kept, 2)
+        self.assertEqual(self.comment_count(), 6)
+
+        client = APIClient()
+        client.force_authenticate(self.writer)
+        response = client.delete(reverse("profile", args=["writer"]))
+
+        self.assertEqual(response.status_code, 200)
+        # ответы пользователя удалены вместе с ответами на них
+        self.assertEqual(self.comment_count(), 2)
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.replies_count, 0)
@@ -0,0 +1,61 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from comments.tree import MAX_DEPTH
+from social_net.models import Blog, Post
+
+
+class CommentDepthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "dp")
+        blog = Blog.objects.create(title="Dp", slug="depth", owner=cls.owner, map="")
+        post = Post.objects.create(
+            author=cls.owner,
+            blog=blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            is_published=True,
+        )
+        parent = None
+        for comment_id in range(1, MAX_DEPTH + 2):
+            parent = Commentary.objects.create(
+                author=cls.owner,
+                post=post,
+                body="Reply",
+                comment_id=comment_id,
+                reply_to=parent,
+            )
+        cls.deepest = parent
+        Blog.objects.filter(pk=blog.pk).update(last_comment_id=MAX_DEPTH + 1)
+
+    def reply(self, comment):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = reverse("create_commentary", kwargs={"slug": "depth", "post_id": 1})
+        return client.post(url, {"body": "Reply", "reply_to": comment.comment_id})
+
+    def test_deepest_path_fits_the_field(self):
+        self.deepest.refresh_from_db()
+        self.assertEqual(self.deepest.depth, MAX_DEPTH)
+        max_length = Commentary._meta.get_field("path").max_length
+        self.assertLessEqual(len(self.deepest.path), max_length)
+
+    def test_reply_below_max_depth_is_rejected(self):
+        count = Commentary.objects.count()
+        response = self.reply(self.deepest)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("reply_to", response.data)
+        self.assertEqual(Commentary.objects.count(), count)
+
+    def test_reply_at_max_depth_is_created(self):
+        parent = Commentary.objects.get(depth=MAX_DEPTH - 1)
+        response = self.reply(parent)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Commentary.objects.filter(depth=MAX_DEPTH).count(), 2)
@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from social_net.models import Blog, Post
+
+
+class CommentRetrieveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "com")
+        cls.writer = UserProfile.objects.create_user(
+            "writer", "writer@example.com", "com"
+        )
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "com"
+        )
+        blog = Blog.objects.create(title="Com", slug="com", owner=cls.owner, map="")
+        cls.post = Post.objects.create(
+            author=cls.owner,
+            blog=blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            is_published=True,
+        )
+        cls.visible = cls.comment(1)
+        cls.hidden = cls.comment(2, is_hidden=True)
+
+    @classmethod
+    def comment(cls, comment_id, **fields):
+        return Commentary.objects.create(
+            author=cls.writer,
+            post=cls.post,
+            body="Comment",
+            comment_id=comment_id,
+            **fields,
+        )
+
+    def status(self, comment, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        url = reverse(
+            "commentary",
+            kwargs={"slug": "com", "post_id": 1, "comment_id": comment.comment_id},
+        )
+        return client.get(url).status_code
+
+    def test_visible_comment_is_public(self):
+        self.assertEqual(self.status(self.visible), 200)
+
+    def test_hidden_comment_only_for_author_and_moderators(self):
+        self.assertEqual(self.status(self.hidden), 404)
+        self.assertEqual(self.status(self.hidden, self.reader), 404)
+        self.assertEqual(self.status(self.hidden, self.writer), 200)
+        self.assertEqual(self.status(self.hidden, self.owner), 200)
+
+    def test_comment_of_draft_is_not_public(self):
+        Post.objects.filter(pk=self.post.pk).update(is_published=False)
+        self.assertEqual(self.status(self.visible), 404)
+        self.assertEqual(self.status(self.visible, self.owner), 200)
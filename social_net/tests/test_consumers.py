@@ -0,0 +1,114 @@
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from authentication.backends import activity
+from authentication.models import UserProfile
+from comments.models import Commentary
+from mediasoft_django_hard.asgi import application
+from notifications.models import Notification
+from social_net.models import Blog, Post
+
+IN_MEMORY = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY)
+class NotificationConsumerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "ws")
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "ws"
+        )
+        cls.token = Token.objects.create(user=cls.reader)
+        cls.blog = Blog.objects.create(title="WS", slug="ws", owner=cls.owner, map="")
+        cls.published = Post.objects.create(
+            author=cls.owner,
+            blog=cls.blog,
+            post_id=1,
+            title="Published",
+            body="Body",
+            is_published=True,
+        )
+        cls.draft = Post.objects.create(
+            author=cls.owner,
+            blog=cls.blog,
+            post_id=2,
+            title="Draft",
+            body="Body",
+            is_published=False,
+        )
+
+    def tearDown(self):
+        # авторизация по токену отмечает активность в буфере
+        activity.flush()
+        super().tearDown()
+
+    async def connect(self, token=None):
+        path = "/ws/notifications/"
+        if token is not None:
+            path = f"{path}?token={token}"
+        communicator = WebsocketCommunicator(application, path)
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    async def test_connects_with_token(self):
+        communicator, connected, _ = await self.connect(self.token.key)
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
+    async def test_rejects_unauthenticated(self):
+        _, connected, code = await self.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rejects_invalid_token(self):
+        _, connected, code = await self.connect("invalid")
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_pushes_new_notification(self):
+        communicator, connected, _ = await self.connect(self.token.key)
+        self.assertTrue(connected)
+        notification = await database_sync_to_async(self.create_notification)()
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["type"], "notification.created")
+        self.assertEqual(message["data"]["id"], notification.pk)
+        await communicator.disconnect()
+
+    async def test_subscribes_to_published_post(self):
+        communicator, _, _ = await self.connect(self.token.key)
+        await communicator.send_json_to(
+            {"action": "subscribe", "post": self.published.pk}
+        )
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_refuses_subscription_to_draft(self):
+        communicator, _, _ = await self.connect(self.token.key)
+        await communicator.send_json_to({"action": "subscribe", "post": self.draft.pk})
+        message = await communicator.receive_json_from()
+        self.assertEqual(message, {"type": "error", "data": "Post not found"})
+        await communicator.disconnect()
+
+    def create_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            parent = Commentary.objects.create(
+                author=self.reader, post=self.published, body="Parent", comment_id=1
+            )
+            reply = Commentary.objects.create(
+                author=self.owner,
+                post=self.published,
+                body="Reply",
+                comment_id=2,
+                reply_to=parent,
+            )
+            return Notification.objects.create(
+                addressee=self.reader,
+                author=self.owner,
+                parent_comment=parent,
+                replied_comment=reply,
+                post=self.published,
+                text="Reply",
+            )
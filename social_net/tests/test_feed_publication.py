@@ -0,0 +1,63 @@
+from django.test import TestCase, override_settings
+
+from authentication.models import UserProfile
+from jobs.models import Job
+from social_net.models import Blog, FeedEntry, Post
+from social_net.tasks import fan_out_post
+
+
+@override_settings(JOBS_EAGER=False)
+class PublishToFeedsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "fd")
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "fd"
+        )
+        cls.blog = Blog.objects.create(title="Fd", slug="feed", owner=cls.owner, map="")
+
+    def create_post(self, **fields):
+        return Post.objects.create(
+            author=self.owner,
+            blog=self.blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            **fields,
+        )
+
+    def fan_outs(self):
+        return Job.objects.filter(name=fan_out_post.task_name).count()
+
+    def test_published_post_fans_out_once(self):
+        post = self.create_post(is_published=True)
+        self.assertEqual(self.fan_outs(), 1)
+
+        # у блога нет подписчиков, лента поста пуста - повторной раскладки нет
+        post = Post.objects.get(pk=post.pk)
+        post.title = "Edited"
+        post.save()
+        post.save(update_fields=("title",))
+        self.assertEqual(self.fan_outs(), 1)
+
+    def test_draft_fans_out_when_published(self):
+        post = self.create_post()
+        post.save()
+        self.assertEqual(self.fan_outs(), 0)
+
+        post = Post.objects.get(pk=post.pk)
+        post.is_published = True
+        post.save()
+        self.assertEqual(self.fan_outs(), 1)
+
+    def test_unpublished_post_leaves_feeds(self):
+        post = self.create_post(is_published=True)
+        FeedEntry.objects.create(
+            user=self.reader, post=post, blog=self.blog, created_at=post.created_at
+        )
+        post = Post.objects.get(pk=post.pk)
+        post.is_published = False
+        post.save(update_fields=("is_published",))
+
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.fan_outs(), 1)
@@ -0,0 +1,82 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from social_net.models import Blog, Post
+
+UNCACHED = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+POST = {"slug": "hidden", "post_id": 1}
+
+
+@override_settings(CACHES=UNCACHED)
+class HiddenCommentsTests(TestCase):
+    """
+    Comment 2 is hidden by a moderator; 3 replies to it and 4 to 3, so both
+    are hidden with it. Comments 1 and its reply 5 stay visible.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "hid")
+        cls.reader = UserProfile.objects.create_user(
+            "reader", "reader@example.com", "hid"
+        )
+        blog = Blog.objects.create(title="Hid", slug="hidden", owner=cls.owner, map="")
+        cls.post = Post.objects.create(
+            author=cls.owner,
+            blog=blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            is_published=True,
+        )
+        first = cls.comment(1)
+        hidden = cls.comment(2)
+        reply = cls.comment(3, hidden)
+        cls.comment(4, reply)
+        cls.comment(5, first)
+        Commentary.objects.filter(pk=hidden.pk).update(is_hidden=True)
+
+    @classmethod
+    def comment(cls, comment_id, reply_to=None):
+        return Commentary.objects.create(
+            author=cls.reader,
+            post=cls.post,
+            body="Secret comment",
+            comment_id=comment_id,
+            reply_to=reply_to,
+        )
+
+    def comment_ids(self, route, kwargs=None, user=None, **params):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        response = client.get(reverse(route, kwargs=kwargs), params)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return sorted(comment["comment_id"] for comment in response.data["results"])
+
+    def test_thread_drops_replies_of_hidden_comments(self):
+        self.assertEqual(self.comment_ids("post_comment_thread", POST), [1, 5])
+
+    def test_replies_list_under_hidden_branch_is_empty(self):
+        ids = self.comment_ids("post_comment_list", POST, parent_id=3)
+        self.assertEqual(ids, [])
+        self.assertEqual(self.comment_ids("post_comment_list", POST, parent_id=1), [5])
+
+    def test_blog_comments_hide_branch_from_readers(self):
+        blog = {"slug": "hidden"}
+        self.assertEqual(self.comment_ids("blog_comments", blog), [1])
+        self.assertEqual(self.comment_ids("blog_comments", blog, self.reader), [1])
+        self.assertEqual(self.comment_ids("blog_comments", blog, parent_id=3), [])
+
+    def test_blog_comments_show_hidden_to_moderators(self):
+        blog = {"slug": "hidden"}
+        self.assertEqual(self.comment_ids("blog_comments", blog, self.owner), [1, 2])
+        ids = self.comment_ids("blog_comments", blog, self.owner, parent_id=3)
+        self.assertEqual(ids, [4])
+
+    def test_search_skips_hidden_comments(self):
+        ids = self.comment_ids("full_text_search", q="secret", type="comments")
+        self.assertEqual(ids, [1, 5])
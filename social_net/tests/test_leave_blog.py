@@ -0,0 +1,32 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from social_net.models import Blog
+
+
+class LeaveBlogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = UserProfile.objects.create_user("owner", "owner@example.com", "lv")
+        cls.ann = UserProfile.objects.create_user("ann", "ann@example.com", "lv")
+        cls.joanna = UserProfile.objects.create_user(
+            "joanna", "joanna@example.com", "lv"
+        )
+        cls.blog = Blog.objects.create(title="Lv", slug="leave", owner=owner, map="")
+        cls.blog.authors.add(cls.joanna)
+
+    def leave(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(reverse("leave_blog", kwargs={"slug": "leave"}))
+
+    def test_author_leaves_blog(self):
+        self.assertEqual(self.leave(self.joanna).data, {"status": "successful"})
+        self.assertFalse(self.blog.authors.exists())
+
+    def test_username_substring_is_not_authorship(self):
+        # "ann" входит в "joanna", но автором блога не является
+        self.assertNotEqual(self.leave(self.ann).data, {"status": "successful"})
+        self.assertQuerySetEqual(self.blog.authors.all(), [self.joanna])
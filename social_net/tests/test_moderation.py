@@ -0,0 +1,73 @@
+from django.test import TestCase
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from social_net import moderation
+from social_net.models import Blog, Post, PostTag
+
+
+class BulkDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "mod")
+        cls.blog = Blog.objects.create(title="Mod", slug="mod", owner=cls.owner, map="")
+        cls.post = Post.objects.create(
+            author=cls.owner,
+            blog=cls.blog,
+            post_id=1,
+            title="Post",
+            body="Body",
+            tags="#mod",
+            is_published=True,
+        )
+        cls.first = cls.comment(1)
+        cls.first_reply = cls.comment(2, reply_to=cls.first)
+        cls.second = cls.comment(3)
+        cls.second_reply = cls.comment(4, reply_to=cls.second)
+
+    @classmethod
+    def comment(cls, comment_id, reply_to=None):
+        return Commentary.objects.create(
+            author=cls.owner,
+            post=cls.post,
+            body="Comment",
+            comment_id=comment_id,
+            reply_to=reply_to,
+        )
+
+    def counters(self):
+        self.post.refresh_from_db()
+        return (
+            self.post.comment_count,
+            Commentary.objects.get(pk=self.second.pk).replies_count,
+        )
+
+    def test_delete_comments_shifts_counters_once(self):
+        results = moderation.delete_comments(self.blog, [1, 4, 99])
+
+        self.assertEqual(
+            results,
+            {1: moderation.DELETED, 4: moderation.DELETED, 99: moderation.NOT_FOUND},
+        )
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_queryset_delete_outside_moderation_keeps_counters(self):
+        Commentary.objects.filter(pk=self.second_reply.pk).delete()
+
+        self.assertEqual(self.counters(), (3, 0))
+
+    def test_delete_posts_refreshes_tags(self):
+        tag = PostTag.objects.get(post=self.post).tag
+
+        moderation.delete_posts(self.blog, [1])
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.post_count, 0)
+
+    def test_queryset_delete_outside_moderation_refreshes_tags(self):
+        tag = PostTag.objects.get(post=self.post).tag
+
+        Post.objects.filter(pk=self.post.pk).delete()
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.post_count, 0)
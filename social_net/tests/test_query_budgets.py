@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.test import SimpleTestCase
+
+from .budgets import (
+    ENDPOINTS,
+    LARGE_SCALE,
+    SMALL_SCALE,
+    SeededTestCase,
+    call,
+    uncovered_routes,
+)
+
+
+class RouteCoverageTests(SimpleTestCase):
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(uncovered_routes(), [])
+
+
+class QueryBudgetTestMixin:
+    """
+    Calls every endpoint of ENDPOINTS on the seeded data and checks that it
+    answers without an error in exactly its budget of queries. Each call
+    runs in a rolled back transaction, so they all see the same data.
+    """
+
+    def test_endpoints_are_within_budget(self):
+        for spec in ENDPOINTS:
+            with self.subTest(route=spec.route, method=spec.method):
+                with transaction.atomic():
+                    with self.assertNumQueries(spec.budget):
+                        response = call(spec, self.context)
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400, response.content[:500])
+
+
+class SmallDataQueryBudgetTests(QueryBudgetTestMixin, SeededTestCase):
+    scale = SMALL_SCALE
+
+
+class LargeDataQueryBudgetTests(QueryBudgetTestMixin, SeededTestCase):
+    scale = LARGE_SCALE
@@ -0,0 +1,108 @@
+import re
+from collections import namedtuple
+
+from django.db import connection, transaction
+
+from comments.models import Commentary
+from invites.models import Invite
+from notifications.models import Notification
+from social_net.models import Blog, Post
+from .budgets import BLOG_SLUG, LARGE_SCALE, SeededTestCase
+
+Plan = namedtuple("Plan", ("name", "queryset", "ordered"))
+
+
+def plan(name, queryset, ordered=False):
+    return Plan(name, queryset, ordered)
+
+
+# Горячие запросы представлений. Каждый должен читать свою таблицу по индексу,
+# а ordered=True - ещё и получать строки в нужном порядке без сортировки.
+# queryset(context) строится по данным budgets.seed()
+PLANS = (
+    plan("blog by slug", lambda context: Blog.objects.filter(slug=BLOG_SLUG)),
+    plan(
+        "blog directory",
+        lambda context: Blog.objects.order_by("-updated_at", "-id")[:10],
+        ordered=True,
+    ),
+    plan(
+        "post by blog and post_id",
+        lambda context: Post.objects.filter(blog_id=BLOG_SLUG, post_id=1),
+    ),
+    plan(
+        "published posts",
+        lambda context: Post.objects.filter(is_published=True).order_by(
+            "-created_at", "-id"
+        )[:5],
+        ordered=True,
+    ),
+    plan(
+        "comment by post and comment_id",
+        lambda context: Commentary.objects.filter(post=context["post"], comment_id=1),
+    ),
+    plan(
+        "top-level comments of a post",
+        lambda context: Commentary.objects.filter(
+            post=context["post"], reply_to=None, is_hidden=False
+        ).order_by("-is_pinned", "created_at")[:5],
+        ordered=True,
+    ),
+    plan(
+        "visible notifications",
+        lambda context: Notification.objects.filter(
+            addressee=context["reader"], is_hidden=False
+        ).order_by("-created_at", "-id")[:5],
+        ordered=True,
+    ),
+    plan(
+        "pending invites of a blog",
+        lambda context: Invite.objects.filter(blog=context["blog"], status=None),
+    ),
+)
+
+
+def explain(queryset):
+    """The query plan of `queryset` as text."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            # на маленькой тестовой базе планировщику дешевле читать таблицу
+            # целиком: запрещаем это, чтобы увидеть, есть ли подходящий индекс
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def problems(spec, text):
+    """What the plan reads without an index: full scans and sorts."""
+    found = []
+    if connection.vendor == "postgresql":
+        if "Seq Scan" in text:
+            found.append("sequential scan")
+        if spec.ordered and re.search(r"\bSort\b", text):
+            found.append("sort")
+    else:
+        for line in text.splitlines():
+            if re.search(r"\bSCAN \w+$", line.strip()):
+                found.append("full scan")
+        if spec.ordered and "TEMP B-TREE" in text:
+            found.append("sort")
+    return found
+
+
+class QueryPlanTests(SeededTestCase):
+    scale = LARGE_SCALE
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.context["blog"] = Blog.objects.get(slug=BLOG_SLUG)
+        cls.context["post"] = Post.objects.get(blog_id=BLOG_SLUG, post_id=1)
+
+    def test_hot_queries_use_indexes(self):
+        for spec in PLANS:
+            with self.subTest(spec.name):
+                # SET LOCAL действует до конца транзакции
+                with transaction.atomic():
+                    text = explain(spec.queryset(self.context))
+                    transaction.set_rollback(True)
+                self.assertEqual(problems(spec, text), [], text)
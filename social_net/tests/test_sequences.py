@@ -0,0 +1,79 @@
+from django.test import TestCase
+
+from authentication.models import UserProfile
+from social_net import sequences
+from comments.models import Commentary
+from social_net.models import Blog, Post
+from social_net.serializers import UpdateBlogSerializer
+
+
+class StaleBlogSaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "seq")
+        cls.blog = Blog.objects.create(title="Seq", slug="seq", owner=cls.owner, map="")
+
+    def allocate_elsewhere(self):
+        sequences.next_post_id(Blog.objects.get(pk=self.blog.pk))
+        sequences.next_comment_id(Blog.objects.get(pk=self.blog.pk))
+
+    def assertSequencesKept(self):
+        self.assertEqual(
+            Blog.objects.values_list(*Blog.SEQUENCE_FIELDS).get(pk=self.blog.pk),
+            (0, 0, 1, 1),
+        )
+
+    def test_full_save_keeps_sequences(self):
+        stale = Blog.objects.get(pk=self.blog.pk)
+        self.allocate_elsewhere()
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertSequencesKept()
+        self.assertEqual(Blog.objects.get(pk=self.blog.pk).title, "Renamed")
+
+    def test_serializer_save_keeps_sequences(self):
+        # так блог обновляет BlogPage.update
+        stale = Blog.objects.get(pk=self.blog.pk)
+        self.allocate_elsewhere()
+        serializer = UpdateBlogSerializer(
+            stale, data={"title": "Renamed"}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertSequencesKept()
+
+
+class DisplayCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = UserProfile.objects.create_user("owner", "owner@example.com", "seq")
+        cls.blog = Blog.objects.create(title="Seq", slug="seq", owner=cls.owner, map="")
+
+    def counters(self):
+        return Blog.objects.values_list(
+            "count_of_posts", "count_of_commentaries", "last_post_id", "last_comment_id"
+        ).get(pk=self.blog.pk)
+
+    def test_unsaved_numbers_are_not_counted(self):
+        sequences.next_post_id(self.blog)
+        sequences.next_comment_id(self.blog)
+        self.assertEqual(self.counters(), (0, 0, 1, 1))
+
+    def test_created_posts_and_comments_are_counted(self):
+        post = Post.objects.create(
+            author=self.owner,
+            blog=self.blog,
+            post_id=sequences.next_post_id(self.blog),
+            title="Post",
+            body="Body",
+        )
+        Commentary.objects.create(
+            author=self.owner,
+            post=post,
+            body="Comment",
+            comment_id=sequences.next_comment_id(self.blog),
+        )
+        post.save()
+        self.assertEqual(self.counters(), (1, 1, 1, 1))
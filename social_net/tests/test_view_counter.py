@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.test import TestCase
+
+from authentication.models import UserProfile
+from social_net.models import Blog, Post
+from social_net.view_counter import ViewCountBuffer
+
+
+class ViewCountBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = UserProfile.objects.create_user("owner", "owner@example.com", "vc")
+        blog = Blog.objects.create(title="Vc", slug="views", owner=owner, map="")
+        cls.posts = [
+            Post.objects.create(
+                author=owner, blog=blog, post_id=post_id, title="Post", body="Body"
+            )
+            for post_id in (1, 2)
+        ]
+
+    def setUp(self):
+        self.buffer = ViewCountBuffer(interval=60, max_pending=2)
+        self.addCleanup(self.buffer.flush)
+
+    def views(self):
+        return list(Post.objects.order_by("post_id").values_list("views", flat=True))
+
+    def view_all(self):
+        for post in self.posts:
+            self.buffer.add(post.pk)
+
+    def test_overflow_flushes_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.view_all()
+            self.assertEqual(self.views(), [0, 0])
+
+        self.assertEqual(self.views(), [1, 1])
+        self.assertEqual(self.buffer.pending(), 0)
+
+    def test_rolled_back_request_keeps_buffered_views(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    self.view_all()
+                    raise RuntimeError("request failed")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.buffer.pending(), 2)
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.views(), [1, 1])
@@ -0,0 +1,109 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+from PIL import ImageFile
+
+UPLOAD_IMAGE_TYPES = getattr(
+    settings, "UPLOAD_IMAGE_TYPES", ("JPEG", "PNG", "GIF", "WEBP")
+)
+UPLOAD_IMAGE_MAX_SIZE = getattr(settings, "UPLOAD_IMAGE_MAX_SIZE", 10 * 1024 * 1024)
+UPLOAD_IMAGE_MAX_PIXELS = getattr(settings, "UPLOAD_IMAGE_MAX_PIXELS", 40_000_000)
+UPLOAD_MAX_FILES = getattr(settings, "UPLOAD_MAX_FILES", 10)
+# заголовок, в котором должны найтись формат и размеры картинки
+UPLOAD_IMAGE_HEADER_SIZE = 1024 * 1024
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """
+    Spools uploaded images straight to a temporary file on disk, checking
+    them as the chunks arrive: size, image format and pixel count (read
+    from the image header) are enforced before the rest of the body is
+    read. The SHA-256 of the content is computed on the way, so the
+    content-addressed storage can move the file into place without
+    reading it again. A violation fails the request with 400.
+    """
+
+    def __init__(self, request=None, max_sizes=None):
+        super().__init__(request)
+        self.max_sizes = max_sizes or {}
+        self.files = 0
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.files += 1
+        if self.files > UPLOAD_MAX_FILES:
+            raise MultiPartParserError(
+                f"Можно загрузить не больше {UPLOAD_MAX_FILES} файлов."
+            )
+        self.max_size = self.max_sizes.get(field_name, UPLOAD_IMAGE_MAX_SIZE)
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.parser = ImageFile.Parser()
+        self.checked = False
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            raise MultiPartParserError(
+                f"Размер файла не должен превышать {self.max_size // 1024 ** 2} МБ."
+            )
+        if not self.checked:
+            self.check_header(raw_data)
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def check_header(self, raw_data):
+        # парсер Pillow разбирает только заголовок, пикселей не декодирует
+        try:
+            self.parser.feed(raw_data)
+        except Exception:
+            self.reject()
+        image = self.parser.image
+        if image is None:
+            if self.size > UPLOAD_IMAGE_HEADER_SIZE:
+                self.reject()
+            return
+        if image.format not in UPLOAD_IMAGE_TYPES:
+            self.reject()
+        if image.width * image.height > UPLOAD_IMAGE_MAX_PIXELS:
+            raise MultiPartParserError(
+                "Изображение слишком большое: "
+                f"не больше {UPLOAD_IMAGE_MAX_PIXELS} пикселей."
+            )
+        self.checked = True
+        self.parser = None
+
+    def reject(self):
+        raise MultiPartParserError(
+            "Загрузите изображение в формате "
+            f"{', '.join(UPLOAD_IMAGE_TYPES)}: {self.file_name}"
+        )
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            self.reject()
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.sha256.hexdigest()
+        return self.file
+
+
+class StreamingUploadMixin:
+    """
+    Installs StreamingImageUploadHandler for the view's requests.
+    upload_max_sizes maps file field names to size limits in bytes.
+    """
+
+    upload_max_sizes = {}
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            StreamingImageUploadHandler(request, self.upload_max_sizes)
+        ]
+        return super().initialize_request(request, *args, **kwargs)
@@ -0,0 +1,113 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    """
+    Accumulates post view increments in process memory and writes them out
+    in batched UPDATE ... SET views = views + n statements.
+    """
+
+    def __init__(self, interval=10, max_pending=1000):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._timer = None
+        self.flushed_total = 0
+
+    def add(self, post_id, count=1):
+        if self.interval <= 0:
+            Post.objects.filter(pk=post_id).update(views=F("views") + count)
+            with self._lock:
+                self.flushed_total += count
+            return count
+        with self._lock:
+            self._pending[post_id] += count
+            pending = self._pending[post_id]
+            overflow = len(self._pending) >= self.max_pending
+            self._schedule()
+        if overflow:
+            # в транзакции запроса сброс стал бы её частью, и откат запроса
+            # потерял бы просмотры всех остальных; при откате пачка остаётся
+            # в буфере до следующего сброса
+            transaction.on_commit(self.flush)
+        return pending
+
+    def pending(self, post_id=None):
+        with self._lock:
+            if post_id is not None:
+                return self._pending.get(post_id, 0)
+            return sum(self._pending.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending_posts": len(self._pending),
+                "pending_views": sum(self._pending.values()),
+                "flushed_views": self.flushed_total,
+            }
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+
+        by_count = defaultdict(list)
+        for post_id, count in pending.items():
+            by_count[count].append(post_id)
+        try:
+            # все UPDATE в одной транзакции: при ошибке ни один из них не
+            # записан, и вернуть в буфер можно всю пачку целиком
+            with transaction.atomic():
+                for count, post_ids in by_count.items():
+                    Post.objects.filter(pk__in=post_ids).update(
+                        views=F("views") + count
+                    )
+        except Exception:
+            logger.exception("Failed to flush %s buffered post views", len(pending))
+            with self._lock:
+                for post_id, count in pending.items():
+                    self._pending[post_id] += count
+                self._schedule()
+            return 0
+
+        flushed = sum(pending.values())
+        with self._lock:
+            self.flushed_total += flushed
+        return flushed
+
+    def _schedule(self):
+        if self._timer is None and self._pending:
+            self._timer = threading.Timer(self.interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+view_counter = ViewCountBuffer(
+    interval=getattr(settings, "POST_VIEWS_FLUSH_INTERVAL", 10),
+    max_pending=getattr(settings, "POST_VIEWS_MAX_PENDING", 1000),
+)
+atexit.register(view_counter.flush)
@@ -0,0 +1,100 @@
+from django.db.models import CharField, Value
+
+from authentication.models import UserProfile
+from comments.models import Commentary
+from .models import Post
+
+Subscription = UserProfile.subscriptions.through
+
+POST_TABLES = {
+    "like": Post.liked_users.through,
+    "dislike": Post.disliked_users.through,
+    "bookmark": UserProfile.bookmarks.through,
+}
+COMMENT_TABLES = {
+    "like": Commentary.liked_users.through,
+    "dislike": Commentary.disliked_users.through,
+}
+
+
+def _flags(tables, field, ids, user):
+    """
+    {id: {kind, ...}} of the user's rows in several M2M tables keyed by the
+    same column, read with one UNION query.
+    """
+    kind = CharField()
+    rows = None
+    for name, through in tables.items():
+        part = (
+            through.objects.filter(userprofile_id=user.pk, **{f"{field}__in": ids})
+            .annotate(kind=Value(name, output_field=kind))
+            .values_list(field, "kind")
+        )
+        rows = part if rows is None else rows.union(part, all=True)
+    flags = {}
+    for pk, name in rows:
+        flags.setdefault(pk, set()).add(name)
+    return flags
+
+
+def _subscribed(user, slugs):
+    if not slugs:
+        return set()
+    return set(
+        Subscription.objects.filter(
+            userprofile_id=user.pk, blog__slug__in=slugs
+        ).values_list("blog__slug", flat=True)
+    )
+
+
+def resolve_post_state(posts, user):
+    """
+    Attach isLiked / isDisliked / isBookmarked / isSubscribed for `user` to a
+    page of posts: two indexed IN queries regardless of the page size.
+    """
+    posts = list(posts or ())
+    for post in posts:
+        post.isLiked = post.isDisliked = False
+        post.isBookmarked = post.isSubscribed = False
+    if not posts or not user.is_authenticated:
+        return posts
+
+    flags = _flags(POST_TABLES, "post_id", [post.pk for post in posts], user)
+    subscribed = _subscribed(user, {post.blog_id for post in posts})
+    for post in posts:
+        kinds = flags.get(post.pk, ())
+        post.isLiked = "like" in kinds
+        post.isDisliked = "dislike" in kinds
+        post.isBookmarked = "bookmark" in kinds
+        post.isSubscribed = post.blog_id in subscribed
+    return posts
+
+
+def resolve_comment_state(comments, user):
+    comments = list(comments or ())
+    for comment in comments:
+        comment.isLiked = comment.isDisliked = False
+    if not comments or not user.is_authenticated:
+        return comments
+
+    flags = _flags(
+        COMMENT_TABLES, "commentary_id", [comment.pk for comment in comments], user
+    )
+    for comment in comments:
+        kinds = flags.get(comment.pk, ())
+        comment.isLiked = "like" in kinds
+        comment.isDisliked = "dislike" in kinds
+    return comments
+
+
+def resolve_blog_state(blogs, user):
+    blogs = list(blogs or ())
+    for blog in blogs:
+        blog.isSubscribed = False
+    if not blogs or not user.is_authenticated:
+        return blogs
+
+    subscribed = _subscribed(user, {blog.slug for blog in blogs})
+    for blog in blogs:
+        blog.isSubscribed = blog.slug in subscribed
+    return blogs
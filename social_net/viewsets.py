@@ -4,23 +4,31 @@ from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import status, permissions, viewsets
 from django.shortcuts import get_object_or_404
-from django.db.models import (
-    Q,
-    Count,
-    Case,
-    When,
-    Value,
-    BooleanField,
-    Sum,
-    Exists,
-    OuterRef,
-)
+from django.db.models import Count, OuterRef, Subquery, Sum
 from django.http import Http404
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from authentication.models import UserProfile
-from .models import Blog, Post, PostImage
+from .models import Blog, Post, PostImage, Tag
+from .counters import toggle_reaction, toggle_bookmark
+from .view_counter import view_counter
+from .pagination import KeysetPagination
+from .feed import feed_posts, feed_slice
+from .response_cache import cache_anonymous_response
+from .viewer_state import (
+    Subscription,
+    resolve_blog_state,
+    resolve_comment_state,
+    resolve_post_state,
+)
+from .querysets import with_blog_relations, with_post_relations
+from .tags import normalize_tag
+from .tasks import build_image_variants
+from .uploads import StreamingUploadMixin
+from . import conditional, moderation, roles, sequences, storage
 from comments.models import Commentary
+from comments.tree import without_hidden
+from search.backends import search_filter
 
 from .serializers import (
     BlogSerializer,
@@ -40,6 +48,8 @@ from .serializers import (
     BlogMiniListSerializer,
     BlogCommentListDeleteSerializer,
     BlogDeletePostListSerializer,
+    BlogModerateCommentListSerializer,
+    BlogModeratePostListSerializer,
     InviteGetUsersSerializer,
 )
 
@@ -50,65 +60,81 @@ class BlogPermissions(permissions.BasePermission):
             return True
         if request.method == "POST":
             return request.user and request.user.is_authenticated
-        else:
-            isBlogExistsAndIsUserOwner = Blog.objects.filter(
-                slug=view.kwargs["slug"], owner=request.user.id
-            )
-            isAdmin = (
-                request.user and request.user.is_authenticated and request.user.is_admin
-            )
-            return bool(isBlogExistsAndIsUserOwner or isAdmin)
+        role = roles.resolve_blog(request, view.kwargs["slug"])
+        if role is None:
+            # несуществующий блог: администратор получит 404 от представления
+            return bool(request.user.is_authenticated and request.user.is_admin)
+        return role.can_manage
 
 
 class PostPermissions(permissions.BasePermission):
     def has_permission(self, request, view):
-        isAdmin = (
-            request.user and request.user.is_authenticated and request.user.is_admin
-        )
         if request.method in permissions.SAFE_METHODS:
             return True
+        if not request.user.is_authenticated:
+            return False
         if request.method == "POST":
-            isBlogOwnerOrOneOfAuthors = Blog.objects.filter(
-                Q(slug=view.kwargs["slug"])
-                & (
-                    Q(owner=request.user.id)
-                    | Q(authors__username__contains=request.user)
-                )
-            )
-            return bool((isBlogOwnerOrOneOfAuthors or isAdmin) and IsAuthenticated)
+            role = roles.resolve_blog(request, view.kwargs["slug"])
         else:
-            isPostOwnerOrOneOfAuthors = Post.objects.filter(
-                Q(post_id=view.kwargs["post_id"])
-                & Q(blog__slug=view.kwargs["slug"])
-                & (
-                    Q(blog__authors__username__contains=request.user)
-                    | Q(blog__owner=request.user.id)
-                )
+            post = roles.resolve_post(
+                request, view.kwargs["slug"], view.kwargs["post_id"]
             )
-            return bool((isPostOwnerOrOneOfAuthors or isAdmin) and IsAuthenticated)
+            role = post and roles.resolve_blog(request, view.kwargs["slug"])
+        if role is None:
+            return request.user.is_admin
+        return role.can_write
 
     def has_object_permission(self, request, view, obj):
-        isAdmin = (
-            request.user and request.user.is_authenticated and request.user.is_admin
-        )
-        isBlogOwner = obj.blog.owner == request.user
-        isBlogAuthor = obj.blog.authors.filter(username__contains=request.user)
         if request.method in permissions.SAFE_METHODS:
             if bool(obj.is_published):
                 return True
-            if not (isBlogOwner or isBlogAuthor or isAdmin) and IsAuthenticated:
+            role = roles.resolve_blog(request, obj.blog_id)
+            if not role.can_write:
                 raise Http404
         return True
 
 
-class ListSetPagination(PageNumberPagination):
+class ListSetPagination(KeysetPagination):
     page_size = 5
 
 
-class BlogListPagination(PageNumberPagination):
+class BlogListPagination(KeysetPagination):
     page_size = 10
 
 
+class FeedPagination(KeysetPagination):
+    """
+    Pagination over a user's subscription feed. Page numbers with a count by
+    default; with ?cursor= the positions come from feed.feed_slice and the
+    queryset passed in only supplies the annotated posts for them.
+    """
+
+    page_size = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(
+                feed_posts(request.user, queryset), request, view
+            )
+
+        self.cursor_mode = True
+        self.request = request
+        self.keys = ["-created_at", "-id"]
+
+        after = None
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            after = self.decode_cursor(queryset.model, cursor)
+
+        page_size = self.get_page_size(request)
+        rows = feed_slice(request.user, page_size + 1, after)
+        self.has_next = len(rows) > page_size
+        post_ids = [post_id for _, post_id in rows[:page_size]]
+        posts = queryset.in_bulk(post_ids)
+        self.page_rows = [posts[pk] for pk in post_ids if pk in posts]
+        return self.page_rows
+
+
 class ListSetPaginationSecond(PageNumberPagination):
     page_size = 2
 
@@ -119,6 +145,8 @@ class BlogList(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
     permission_classes = [AllowAny]
 
+    # посты сдвигают Blog.updated_at и версию "blogs", см. signals.touch_blogs
+    @cache_anonymous_response("blogs")
     def list(self, request, *args, **kwargs):
         queryset = self.queryset
         query_dict = {}
@@ -129,7 +157,7 @@ class BlogList(viewsets.ModelViewSet):
         after = self.request.query_params.get("after", None)
 
         if search:
-            queryset = queryset.filter(title__icontains=search)
+            queryset = search_filter(queryset, "blogs", search)
 
         if after:
             query_dict["updated_at__gt"] = after
@@ -148,39 +176,55 @@ class BlogList(viewsets.ModelViewSet):
 
         queryset = queryset.filter(**query_dict)
 
-        if request.user.is_authenticated:
-            queryset = queryset.annotate(
-                subscriberList=Count("subscribers"),
-                views=Coalesce(Sum("posts__views"), 0),
-                isSubscribed=Case(
-                    When(subscribers=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
+        # подзапросы вместо JOIN + GROUP BY: страница читается по индексу
+        # blog_updated_at_idx, а счётчики не перемножаются друг с другом
+        queryset = queryset.annotate(
+            subscriberList=Coalesce(
+                Subquery(
+                    Subscription.objects.filter(blog_id=OuterRef("pk"))
+                    .values("blog_id")
+                    .annotate(count=Count("pk"))
+                    .values("count")
                 ),
-                # isBlogAuthor=Exists(is_author_subquery)
-            )
-        else:
-            queryset = queryset.annotate(
-                subscriberList=Count("subscribers"),
-                views=Coalesce(Sum("posts__views"), 0),
-                isSubscribed=Value(False, output_field=BooleanField()),
-            )
+                0,
+            ),
+            views=Coalesce(
+                Subquery(
+                    Post.objects.filter(blog_id=OuterRef("slug"))
+                    .values("blog_id")
+                    .annotate(total=Sum("views"))
+                    .values("total")
+                ),
+                0,
+            ),
+        )
 
-        paginated_result = self.paginate_queryset(queryset)
+        paginated_result = self.paginate_queryset(with_blog_relations(queryset))
         if paginated_result is not None:
+            version = conditional.page_version(
+                request,
+                paginated_result,
+                conditional.BLOG_LIST_FIELDS,
+                ("blogs",),
+            )
+            not_modified = version.not_modified(request)
+            if not_modified:
+                return not_modified
+            paginated_result = resolve_blog_state(paginated_result, request.user)
             serializer = self.serializer_class(paginated_result, many=True)
             result = self.get_paginated_response(serializer.data)
-            return Response(result.data, status=status.HTTP_200_OK)
+            return version.apply(Response(result.data, status=status.HTTP_200_OK))
         else:
             return Response(
                 {"status": "unsuccessful"}, status=status.HTTP_404_NOT_FOUND
             )
 
 
-class BlogPage(viewsets.ModelViewSet):
+class BlogPage(StreamingUploadMixin, viewsets.ModelViewSet):
     queryset = Blog.objects.all()
     permission_classes = [BlogPermissions]
     parser_class = (MultiPartParser, FormParser)
+    upload_max_sizes = {"avatar": 4 * 1024 * 1024, "avatar_small": 2 * 1024 * 1024}
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -197,7 +241,7 @@ class BlogPage(viewsets.ModelViewSet):
         description = serializer.validated_data.get("description", "")
         avatar = request.FILES.get("avatar", None)
         avatar_small = request.FILES.get("avatar_small", None)
-        owner = get_object_or_404(UserProfile, username=request.user)
+        owner = request.user
 
         blog = Blog(
             title=title,
@@ -211,21 +255,26 @@ class BlogPage(viewsets.ModelViewSet):
         blog.save()
         return Response({"status": "successful"}, status=status.HTTP_201_CREATED)
 
+    @cache_anonymous_response("blogs")
     def retrieve(self, request, *args, **kwargs):
+        version = conditional.blog_version(self.kwargs["slug"], request.user)
+        if version is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        not_modified = version.not_modified(request)
+        if not_modified:
+            return not_modified
         try:
             blog = self.queryset.get(slug=self.kwargs["slug"])
-            blog.isSubscribed = blog.subscribers.filter(
-                username=request.user.username
-            ).exists()
+            resolve_blog_state([blog], request.user)
             blog.subscriberList = blog.subscribers.count()
             blog.views = blog.posts.aggregate(views=Sum("views"))["views"] or 0
             serial = BlogSerializer(blog)
-            return Response(serial.data)
+            return version.apply(Response(serial.data))
         except Blog.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
     def update(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
+        blog = roles.blog_role_or_404(request, self.kwargs["slug"]).blog
         serializer = UpdateBlogSerializer(
             instance=blog, data=request.data, partial=True
         )
@@ -234,7 +283,7 @@ class BlogPage(viewsets.ModelViewSet):
         return Response({"status": "successful"}, status=status.HTTP_200_OK)
 
     def destroy(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
+        blog = roles.blog_role_or_404(request, self.kwargs["slug"]).blog
         blog.delete()
         return Response({"status: successful"}, status=status.HTTP_200_OK)
 
@@ -245,14 +294,38 @@ class PostList(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
     permission_classes = [AllowAny]
 
+    @cache_anonymous_response("posts", "blogs", "comments")
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset
+        queryset = self.filter_by_params(self.queryset, request.query_params)
+
+        paginated_result = self.paginate_queryset(with_post_relations(queryset))
+        if paginated_result is not None:
+            version = conditional.page_version(
+                request,
+                paginated_result,
+                conditional.POST_LIST_FIELDS,
+                ("posts", "blogs", "comments"),
+            )
+            not_modified = version.not_modified(request)
+            if not_modified:
+                return not_modified
+            paginated_result = resolve_post_state(paginated_result, request.user)
+            serializer = self.serializer_class(paginated_result, many=True)
+            result = self.get_paginated_response(serializer.data)
+            return version.apply(Response(result.data, status=status.HTTP_200_OK))
+        else:
+            return Response(
+                {"status": "unsuccessful"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+    @staticmethod
+    def filter_by_params(queryset, query_params):
         query_dict = {}
 
-        before = self.request.query_params.get("before", None)
-        after = self.request.query_params.get("after", None)
-        search = self.request.query_params.get("search", None)
-        sort_by = self.request.query_params.get("sort_by", None)
+        before = query_params.get("before", None)
+        after = query_params.get("after", None)
+        search = query_params.get("search", None)
+        sort_by = query_params.get("sort_by", None)
 
         if after:
             query_dict["created_at__gte"] = after
@@ -260,7 +333,7 @@ class PostList(viewsets.ModelViewSet):
             query_dict["created_at__lte"] = before
 
         if search:
-            queryset = queryset.filter(Q(title__icontains=search))
+            queryset = search_filter(queryset, "posts", search)
 
         if sort_by:
             if sort_by == "date":
@@ -272,40 +345,7 @@ class PostList(viewsets.ModelViewSet):
             if sort_by == "title_desc":
                 queryset = queryset.order_by("-title")
 
-        queryset = queryset.filter(**query_dict)
-
-        if request.user.is_authenticated:
-            queryset = queryset.annotate(
-                isLiked=Exists(
-                    Post.objects.filter(liked_users=request.user, id=OuterRef("pk"))
-                ),
-                isDisliked=Exists(
-                    Post.objects.filter(disliked_users=request.user, id=OuterRef("pk"))
-                ),
-                isBookmarked=Exists(
-                    UserProfile.objects.filter(
-                        bookmarks=OuterRef("pk"), id=request.user.id
-                    )
-                ),
-                comments=Count("comment"),
-            )
-        else:
-            queryset = queryset.annotate(
-                isLiked=Value(False, output_field=BooleanField()),
-                isDisliked=Value(False, output_field=BooleanField()),
-                isBookmarked=Value(False, output_field=BooleanField()),
-                comments=Count("comment"),
-            )
-
-        paginated_result = self.paginate_queryset(queryset)
-        if paginated_result is not None:
-            serializer = self.serializer_class(paginated_result, many=True)
-            result = self.get_paginated_response(serializer.data)
-            return Response(result.data, status=status.HTTP_200_OK)
-        else:
-            return Response(
-                {"status": "unsuccessful"}, status=status.HTTP_404_NOT_FOUND
-            )
+        return queryset.filter(**query_dict)
 
 
 class MyPosts(viewsets.ModelViewSet):
@@ -316,16 +356,9 @@ class MyPosts(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.queryset.filter(author=request.user)
-        queryset = queryset.annotate(
-            isLiked=Case(
-                When(liked_users=request.user, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-            comments=Count("comment"),
-        )
-        paginated_result = self.paginate_queryset(queryset)
+        paginated_result = self.paginate_queryset(with_post_relations(queryset))
         if paginated_result is not None:
+            paginated_result = resolve_post_state(paginated_result, request.user)
             serializer = self.serializer_class(paginated_result, many=True)
             result = self.get_paginated_response(serializer.data)
             return Response(result.data, status=status.HTTP_200_OK)
@@ -341,6 +374,7 @@ class BlogPosts(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
     permission_classes = [AllowAny]
 
+    @cache_anonymous_response("posts", "blogs", "comments")
     def list(self, request, *args, **kwargs):
         queryset = self.queryset
         # pinned_post = get_object_or_404(Post, blog__slug=self.kwargs['slug'])
@@ -359,39 +393,18 @@ class BlogPosts(viewsets.ModelViewSet):
                 queryset = queryset.order_by("-title")
 
         if search:
-            queryset = queryset.filter(title__icontains=search)
-
-        queryset = (
-            queryset.filter(blog__slug=self.kwargs["slug"])
-            .distinct()
-            .annotate(
-                comment_count=Count("comment"),
-                likedUsersCount=Count("liked_users"),
-                isLiked=Case(
-                    When(liked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isDisliked=Case(
-                    When(disliked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isBookmarked=Case(
-                    When(bookmarks=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-            )
-        )
-        paginated_result = self.paginate_queryset(queryset)
+            queryset = search_filter(queryset, "posts", search)
+
+        queryset = queryset.filter(blog__slug=self.kwargs["slug"])
+        paginated_result = self.paginate_queryset(with_post_relations(queryset))
         if paginated_result is not None:
+            paginated_result = resolve_post_state(paginated_result, request.user)
             serializer = self.serializer_class(paginated_result, many=True)
             result = self.get_paginated_response(serializer.data)
         return Response(result.data, status=status.HTTP_200_OK)
 
 
-class PostPage(viewsets.ModelViewSet):
+class PostPage(StreamingUploadMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     parser_class = (MultiPartParser, FormParser)
     permission_classes = [PostPermissions]
@@ -402,39 +415,39 @@ class PostPage(viewsets.ModelViewSet):
         return PostSerializer
 
     def retrieve(self, request, *args, **kwargs):
+        version = conditional.post_version(
+            self.kwargs["slug"], self.kwargs["post_id"], request.user
+        )
+        if version is None:
+            raise Http404
+        not_modified = version.not_modified(request)
+        if not_modified:
+            # просмотр засчитывается, даже если тело поста не отдаётся
+            view_counter.add(version.pk)
+            return not_modified
         try:
-            blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-            post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
+            post = get_object_or_404(Post.objects.select_related("blog"), pk=version.pk)
             post_images = post.images.all()
 
-            post.isSubscribed = blog.subscribers.filter(
-                username=request.user.username
-            ).exists()
-            post.isLiked = request.user in post.liked_users.all()
-            post.isDisliked = request.user in post.disliked_users.all()
-            post.isBookmarked = request.user in post.bookmarks.all()
+            resolve_post_state([post], request.user)
 
-            post.comment_count = post.comment.count()
             post.subscribers = post.blog.subscribers.count()
 
             post.images1 = post_images
 
+            post.views += view_counter.add(post.pk)
             serial = PostSerializer(post)
-            post.views += 1
-            post.save(update_fields=("views",))
-            return Response(serial.data)
+            return version.apply(Response(serial.data))
         except Post.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
     def destroy(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
+        post = roles.post_or_404(request, self.kwargs["slug"], self.kwargs["post_id"])
         post.delete()
         return Response({"status: success"}, status=status.HTTP_200_OK)
 
     def update(self, request, *args, **kwargs):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        post = get_object_or_404(Post, post_id=self.kwargs["post_id"], blog=blog)
+        post = roles.post_or_404(request, self.kwargs["slug"], self.kwargs["post_id"])
         serializer = UpdatePostSerializer(
             instance=post, data=request.data, partial=True
         )
@@ -449,17 +462,15 @@ class PostPage(viewsets.ModelViewSet):
         title = serializer.data["title"]
         body = serializer.data["body"]
         is_published = serializer.data["is_published"]
-        author = get_object_or_404(UserProfile, username=request.user)
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
+        author = request.user
+        blog = roles.blog_role_or_404(request, self.kwargs["slug"]).blog
         tags = serializer.data["tags"]
         map_type = serializer.data["map_type"]
         map_1 = serializer.data["map"]
         author_is_hidden = serializer.data["author_is_hidden"]
         comments_allowed = serializer.data["comments_allowed"]
         images = request.FILES.getlist("images")
-        blog.count_of_posts += 1
-        blog.save(update_fields=("count_of_posts",))
-        post_id = blog.count_of_posts
+        post_id = sequences.next_post_id(blog)
 
         post = Post(
             title=title,
@@ -476,9 +487,19 @@ class PostPage(viewsets.ModelViewSet):
         )
         post.save()
 
-        for image in images:
-            post_image = PostImage(post=post, image=image)
-            post_image.save()
+        # файлы уже на диске (uploads.StreamingImageUploadHandler) и
+        # переносятся в хранилище при вставке; bulk_create не отправляет
+        # post_save, поэтому ссылки на файлы и уменьшенные копии - здесь
+        post_images = PostImage.objects.bulk_create(
+            [PostImage(post=post, image=image) for image in images]
+        )
+        storage.retain([post_image.image.name for post_image in post_images])
+        build_image_variants.enqueue_many(
+            [
+                {"model": "social_net.PostImage", "pk": post_image.pk, "field": "image"}
+                for post_image in post_images
+            ]
+        )
 
         post_serializer = PostSerializer(post)
         return Response(data=post_serializer.data, status=status.HTTP_201_CREATED)
@@ -502,35 +523,13 @@ class PostLikeDislikeViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def set_or_remove_like(self, request, slug, post_id):
-        user = get_object_or_404(UserProfile, username=request.user)
-        blog = get_object_or_404(Blog, slug=slug)
-        post = get_object_or_404(Post, post_id=post_id, blog=blog)
-        if post.disliked_users.contains(user):
-            post.disliked_users.remove(user)
-            post.dislikes -= 1
-        if not post.liked_users.contains(user):
-            post.liked_users.add(user)
-            post.likes += 1
-        else:
-            post.liked_users.remove(user)
-            post.likes -= 1
-        post.save(update_fields=("likes", "dislikes"))
+        post = get_object_or_404(Post, post_id=post_id, blog__slug=slug)
+        toggle_reaction(post, request.user, "like")
         return Response({"status": "successful"}, status=status.HTTP_200_OK)
 
     def set_or_remove_dislike(self, request, slug, post_id):
-        user = get_object_or_404(UserProfile, username=request.user)
-        blog = get_object_or_404(Blog, slug=slug)
-        post = get_object_or_404(Post, post_id=post_id, blog=blog)
-        if post.liked_users.contains(user):
-            post.liked_users.remove(user)
-            post.likes -= 1
-        if not post.disliked_users.contains(user):
-            post.disliked_users.add(user)
-            post.dislikes += 1
-        else:
-            post.disliked_users.remove(user)
-            post.dislikes -= 1
-        post.save(update_fields=("likes", "dislikes"))
+        post = get_object_or_404(Post, post_id=post_id, blog__slug=slug)
+        toggle_reaction(post, request.user, "dislike")
         return Response({"status": "successful"}, status=status.HTTP_200_OK)
 
 
@@ -538,10 +537,9 @@ class LeaveBlogView(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def leave_blog(self, request, slug):
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        user = get_object_or_404(UserProfile, username=request.user)
-        if blog.authors.filter(username__contains=user.username).exists():
-            blog.authors.remove(user)
+        role = roles.blog_role_or_404(request, self.kwargs["slug"])
+        if role.is_author:
+            role.blog.authors.remove(request.user)
             return Response({"status": "successful"}, status.HTTP_200_OK)
         else:
             return Response(status.HTTP_403_FORBIDDEN)
@@ -623,34 +621,21 @@ class PostSearchView(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         queryset = self.queryset
 
-        result = queryset.filter(tags__icontains=self.kwargs["hashtag"])
+        tag = Tag.objects.filter(name=normalize_tag(self.kwargs["hashtag"])).first()
+        if tag is None:
+            result = queryset.none()
+            count_of_posts = count_of_blogs = 0
+        else:
+            result = queryset.filter(tag_links__tag=tag).order_by("-created_at")
+            count_of_posts = tag.post_count
+            count_of_blogs = tag.blog_count
 
-        count_of_posts = queryset.filter(tags__icontains=self.kwargs["hashtag"]).count()
-        count_of_blogs = Blog.objects.filter(
-            posts__tags__icontains=self.kwargs["hashtag"]
-        ).count()
-
-        queryset = result.annotate(
-            isLiked=Case(
-                When(liked_users=request.user, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-            isDisliked=Case(
-                When(disliked_users=request.user, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-            isBookmarked=Case(
-                When(bookmarks=request.user, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-            comments=Count("comment"),
-        )
+        queryset = result
 
         if queryset is not None:
-            paginate_queryset = self.paginate_queryset(queryset)
+            paginate_queryset = resolve_post_state(
+                self.paginate_queryset(with_post_relations(queryset)), request.user
+            )
             serializer = self.serializer_class(paginate_queryset, many=True)
 
             tmp = serializer.data
@@ -672,19 +657,20 @@ class BlogPublicationsView(viewsets.ModelViewSet):
     pagination_class = ListSetPagination
 
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset
+        role = roles.blog_role_or_404(request, self.kwargs["slug"])
+        queryset = self.queryset.filter(blog=role.blog).order_by("-created_at", "-id")
         state = self.request.query_params.get("state", None)
 
-        if state == "published":
-            queryset = queryset.filter(published=True)
-            paginatedResult = self.paginate_queryset(queryset.distinct())
-            serializer = PostSerializer(paginatedResult, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        if state == "pending":
-            queryset = queryset.filter(published=False)
-            paginatedResult = self.paginate_queryset(queryset.distinct())
-            serializer = PostSerializer(paginatedResult, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        # неопубликованные посты видят только те, кто может их писать
+        if state == "published" or not role.can_write:
+            queryset = queryset.filter(is_published=True)
+        elif state == "pending":
+            queryset = queryset.filter(is_published=False)
+        paginatedResult = resolve_post_state(
+            self.paginate_queryset(with_post_relations(queryset)), request.user
+        )
+        serializer = PostSerializer(paginatedResult, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class BookmarkView(viewsets.ModelViewSet):
@@ -694,11 +680,7 @@ class BookmarkView(viewsets.ModelViewSet):
         post = get_object_or_404(
             Post, blog__slug=self.kwargs["slug"], post_id=self.kwargs["post_id"]
         )
-        user = get_object_or_404(UserProfile, username=request.user.username)
-        if user.bookmarks.contains(post):
-            user.bookmarks.remove(post)
-        else:
-            user.bookmarks.add(post)
+        toggle_bookmark(post, request.user)
         return Response({"status: successful"}, status=status.HTTP_200_OK)
 
 
@@ -710,7 +692,7 @@ class PinPostViewSet(viewsets.ModelViewSet):
         post = get_object_or_404(Post, post_id=post_id, blog=blog)
         if not post.is_pinned:
             post.is_pinned = True
-            post.save(update_fields=("is_pinned",))
+            post.save(update_fields=("is_pinned", "updated_at"))
             return Response({"status: success"}, status=status.HTTP_200_OK)
         else:
             return Response({"status: unsuccessful"}, status=status.HTTP_404_NOT_FOUND)
@@ -720,7 +702,7 @@ class PinPostViewSet(viewsets.ModelViewSet):
         post = get_object_or_404(Post, post_id=post_id, blog=blog)
         if post.is_pinned:
             post.is_pinned = False
-            post.save(update_fields=("is_pinned",))
+            post.save(update_fields=("is_pinned", "updated_at"))
             return Response({"status: success"}, status=status.HTTP_200_OK)
         else:
             return Response({"status: unsuccessful"}, status=status.HTTP_404_NOT_FOUND)
@@ -756,16 +738,6 @@ class BlogEditorPostsView(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         queryset = self.queryset
 
-        queryset = queryset.annotate(
-            isLiked=Exists(
-                Post.objects.filter(liked_users=request.user, id=OuterRef("pk"))
-            ),
-            isDisliked=Exists(
-                Post.objects.filter(disliked_users=request.user, id=OuterRef("pk"))
-            ),
-            comments=Count("comment"),
-        )
-
         title = self.request.query_params.get("title", None)
         state = self.request.query_params.get("state", None)
         column_type = self.request.query_params.get("columnType", None)
@@ -784,7 +756,7 @@ class BlogEditorPostsView(viewsets.ModelViewSet):
             queryset = queryset.filter(blog=blog, is_published=True)
 
         if title:
-            queryset = queryset.filter(title__icontains=title)
+            queryset = search_filter(queryset, "posts", title)
 
         if column_type and sort_order:
             if column_type == "date":
@@ -799,12 +771,14 @@ class BlogEditorPostsView(viewsets.ModelViewSet):
                     queryset = queryset.order_by("-views")
             if column_type == "comments":
                 if sort_order == "ascending":
-                    queryset = queryset.order_by("comments")
+                    queryset = queryset.order_by("comment_count")
                 if sort_order == "descending":
-                    queryset = queryset.order_by("-comments")
+                    queryset = queryset.order_by("-comment_count")
 
         if queryset is not None:
-            paginate_queryset = self.paginate_queryset(queryset)
+            paginate_queryset = resolve_post_state(
+                self.paginate_queryset(with_post_relations(queryset)), request.user
+            )
             serializer = self.serializer_class(paginate_queryset, many=True)
 
             tmp = serializer.data
@@ -828,7 +802,9 @@ class BlogsWhereUserIsOwner(viewsets.ModelViewSet):
         user = get_object_or_404(UserProfile, username=request.user.username)
         blogs_where_user_is_owner = self.queryset.filter(owner=user)
 
-        paginatedResult = self.paginate_queryset(blogs_where_user_is_owner)
+        paginatedResult = self.paginate_queryset(
+            with_blog_relations(blogs_where_user_is_owner)
+        )
         if paginatedResult is not None:
             serializer = self.serializer_class(paginatedResult, many=True)
             result = self.get_paginated_response(serializer.data)
@@ -848,7 +824,9 @@ class BlogsWhereUserIsAuthor(viewsets.ModelViewSet):
         user = get_object_or_404(UserProfile, username=request.user.username)
         blogs_where_user_is_author = self.queryset.filter(authors=user)
 
-        paginatedResult = self.paginate_queryset(blogs_where_user_is_author)
+        paginatedResult = self.paginate_queryset(
+            with_blog_relations(blogs_where_user_is_author)
+        )
         if paginatedResult is not None:
             serializer = self.serializer_class(paginatedResult, many=True)
             result = self.get_paginated_response(serializer.data)
@@ -865,10 +843,13 @@ class BlogComments(viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     pagination_class = ListSetPagination
 
+    @cache_anonymous_response("comments", "posts")
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        queryset = queryset.filter(post__blog=blog)
+        role = roles.blog_role_or_404(request, self.kwargs["slug"])
+        queryset = self.queryset.filter(post__blog=role.blog)
+        # скрытые модератором ветки видят только те, кто модерирует блог
+        if not role.can_manage:
+            queryset = without_hidden(queryset)
 
         parent_id = self.request.query_params.get("parent_id", None)
         sort_by = self.request.query_params.get("sort_by", None)
@@ -881,7 +862,7 @@ class BlogComments(viewsets.ModelViewSet):
                 queryset = queryset.order_by("created_at")
 
         if search_query:
-            queryset = queryset.filter(Q(title__icontains=search_query))
+            queryset = search_filter(queryset, "comments", search_query)
 
         if parent_id:
             pass
@@ -891,19 +872,12 @@ class BlogComments(viewsets.ModelViewSet):
             queryset = queryset.filter(reply_to=None)
 
         if queryset is not None:
-            queryset = queryset.annotate(
-                isLiked=Case(
-                    When(liked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isDisliked=Case(
-                    When(disliked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
+            paginate_queryset = resolve_comment_state(
+                self.paginate_queryset(
+                    with_post_relations(queryset.select_related("author"), "post__")
                 ),
+                request.user,
             )
-            paginate_queryset = self.paginate_queryset(queryset)
             serializer = self.serializer_class(paginate_queryset, many=True)
             response = self.get_paginated_response(serializer.data)
             return Response(data=response.data, status=status.HTTP_200_OK)
@@ -934,7 +908,7 @@ class LikedPostListView(viewsets.ModelViewSet):
             query_dict["created_at__lte"] = before
 
         if search:
-            queryset = queryset.filter(Q(title__icontains=search))
+            queryset = search_filter(queryset, "posts", search)
 
         if sort_by:
             if sort_by == "date":
@@ -951,25 +925,9 @@ class LikedPostListView(viewsets.ModelViewSet):
         user = get_object_or_404(UserProfile, username=request.user)
         if user:
             queryset = queryset.filter(liked_users=user)
-            result = queryset.annotate(
-                isLiked=Case(
-                    When(liked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isDisliked=Case(
-                    When(disliked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isBookmarked=Case(
-                    When(bookmarks=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                comments=Count("comment"),
+            paginate_queryset = resolve_post_state(
+                self.paginate_queryset(with_post_relations(queryset)), request.user
             )
-            paginate_queryset = self.paginate_queryset(result)
             if paginate_queryset:
                 serializer = self.serializer_class(paginate_queryset, many=True)
                 result = self.get_paginated_response(serializer.data)
@@ -985,46 +943,22 @@ class LikedPostListView(viewsets.ModelViewSet):
 class SubscriptionListView(viewsets.ModelViewSet):
     queryset = Blog.objects.all()
     serializer_class = PostSerializer
-    pagination_class = BlogListPagination
+    pagination_class = FeedPagination
     permission_classes = [IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
-        user = get_object_or_404(UserProfile, username=request.user)
-        blog_slug_list = self.queryset.filter(subscribers=user).values_list("slug")
-        post_list = Post.objects.filter(blog__slug__in=blog_slug_list).order_by(
-            "-created_at"
+        paginate_queryset = resolve_post_state(
+            self.paginate_queryset(with_post_relations(Post.objects.all())),
+            request.user,
         )
-
-        if user:
-            result = post_list.annotate(
-                isLiked=Case(
-                    When(liked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isDisliked=Case(
-                    When(disliked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isBookmarked=Case(
-                    When(bookmarks=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                comments=Count("comment"),
-            )
-            paginate_queryset = self.paginate_queryset(result)
-            if paginate_queryset:
-                serializer = self.serializer_class(paginate_queryset, many=True)
-                result = self.get_paginated_response(serializer.data)
-                return Response(data=result.data, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {"status": "unsuccessful"}, status=status.HTTP_404_NOT_FOUND
-                )
+        if paginate_queryset:
+            serializer = self.serializer_class(paginate_queryset, many=True)
+            result = self.get_paginated_response(serializer.data)
+            return Response(data=result.data, status=status.HTTP_200_OK)
         else:
-            return Response({"status": "unsuccessful"}, status=status.HTTP_200_OK)
+            return Response(
+                {"status": "unsuccessful"}, status=status.HTTP_404_NOT_FOUND
+            )
 
 
 class BookmarksListView(viewsets.ModelViewSet):
@@ -1048,7 +982,7 @@ class BookmarksListView(viewsets.ModelViewSet):
             query_dict["created_at__lte"] = before
 
         if search:
-            queryset = queryset.filter(Q(title__icontains=search))
+            queryset = search_filter(queryset, "posts", search)
 
         if sort_by:
             if sort_by == "date":
@@ -1065,28 +999,9 @@ class BookmarksListView(viewsets.ModelViewSet):
         user = get_object_or_404(UserProfile, username=request.user)
         if user:
             queryset = queryset.filter(bookmarks=user)
-            result = queryset.annotate(
-                isLiked=Case(
-                    When(liked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isDisliked=Case(
-                    When(disliked_users=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                isBookmarked=Case(
-                    When(bookmarks=request.user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-                comments=Count("comment"),
-            ).distinct()
-
-            print(queryset)
-
-            paginate_queryset = self.paginate_queryset(result)
+            paginate_queryset = resolve_post_state(
+                self.paginate_queryset(with_post_relations(queryset)), request.user
+            )
             if paginate_queryset:
                 serializer = self.serializer_class(paginate_queryset, many=True)
                 result = self.get_paginated_response(serializer.data)
@@ -1133,30 +1048,87 @@ class BlogAuthorList(viewsets.ModelViewSet):
             return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
+def _moderation_response(number_field, results):
+    return Response(
+        {
+            "results": [
+                {number_field: number, "status": result}
+                for number, result in results.items()
+            ]
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def _forbidden():
+    return Response({"status": "unsuccessful"}, status=status.HTTP_403_FORBIDDEN)
+
+
 class BlogDeletePostsView(viewsets.ModelViewSet):
     serializer_class = BlogDeletePostListSerializer
     permission_classes = [IsAuthenticated]
 
-    def delete_posts(self, request, slug):
-        serializer = self.serializer_class(data=request.data)
+    def selection(self, request, slug, serializer_class):
+        serializer = serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        blog = get_object_or_404(Blog, slug=slug)
-        selected_posts = serializer.data["selectedPosts"]
-        for selected_post in selected_posts:
-            post = get_object_or_404(Post, post_id=selected_post["post_id"], blog=blog)
-            post.delete()
-        return Response({"status: successful"}, status=status.HTTP_200_OK)
+        role = roles.blog_role_or_404(request, slug)
+        post_ids = [post["post_id"] for post in serializer.data["selectedPosts"]]
+        return role, post_ids, serializer.data
+
+    def delete_posts(self, request, slug):
+        role, post_ids, _ = self.selection(request, slug, self.serializer_class)
+        if not role.can_write:
+            return _forbidden()
+        results = moderation.delete_posts(role.blog, post_ids)
+        return _moderation_response("post_id", results)
+
+    def moderate_posts(self, request, slug):
+        role, post_ids, data = self.selection(
+            request, slug, BlogModeratePostListSerializer
+        )
+        if not role.can_write:
+            return _forbidden()
+        results = moderation.moderate_posts(role.blog, post_ids, data["action"])
+        return _moderation_response("post_id", results)
 
 
 class BlogCommentsDeleteView(viewsets.ModelViewSet):
     serializer_class = BlogCommentListDeleteSerializer
     permission_classes = [IsAuthenticated]
 
-    def delete_comments(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+    def selection(self, request, slug, serializer_class):
+        serializer = serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        comment_list = serializer.data["comment_list"]
-        blog = get_object_or_404(Blog, slug=self.kwargs["slug"])
-        print(comment_list)
-        # for comment in comment_list:
-        return Response({"status: successful"}, status=status.HTTP_200_OK)
+        role = roles.blog_role_or_404(request, slug)
+        comment_ids = [
+            comment["comment_id"] for comment in serializer.data["comment_list"]
+        ]
+        return role, comment_ids, serializer.data
+
+    # чужие комментарии модерируют только владелец блога и администраторы
+    def delete_comments(self, request, slug):
+        role, comment_ids, _ = self.selection(request, slug, self.serializer_class)
+        if not role.can_manage:
+            return _forbidden()
+        results = moderation.delete_comments(role.blog, comment_ids)
+        return _moderation_response("comment_id", results)
+
+    def moderate_comments(self, request, slug):
+        role, comment_ids, data = self.selection(
+            request, slug, BlogModerateCommentListSerializer
+        )
+        if not role.can_manage:
+            return _forbidden()
+        results = moderation.moderate_comments(role.blog, comment_ids, data["action"])
+        return _moderation_response("comment_id", results)
+
+
+class ViewCounterStatsView(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def stats(self, request):
+        if not request.user.is_admin:
+            return Response(
+                {"status": "unsuccessful"}, status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(view_counter.stats(), status=status.HTTP_200_OK)